@@ -1,39 +1,84 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.security import check_password_hash, generate_password_hash
 from flask_login import login_user, logout_user, login_required, current_user
 from functools import wraps
 import os
+import sys
+import uuid
+import click
 from config import Config
-from utils.db import PostcardDB, TagDB
-from utils.user_db import UserDB
-from utils.image_handler import save_image, delete_image, verify_storage_settings
+from utils.backend import PostcardDB, TagDB, UserDB, ImageDB
+from utils.image_handler import (
+    save_image, delete_image, verify_storage_settings, start_storage_check, get_storage, UploadRejected
+)
 from utils.template_filters import register_filters
 from utils.auth import User, init_login_manager, requires_admin
 from utils.supabase_auth import SupabaseAuth
+from utils.pagination import build_page, encode_rank_cursor
+from utils.stats import get_catalog_stats
+from utils.cache import postcard_cache
+from utils.supabase_clients import pool_stats
+from utils.tracing import init_tracing
+from utils.fanout import gather
+from utils.image_queue import submitted_images, enqueue_image, queue_stats
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Create upload folder if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
 # Initialize Flask-Login
 login_manager = init_login_manager(app)
 
 # Register custom template filters
 register_filters(app)
 
-# Verify storage settings on startup - don't use before_first_request
-with app.app_context():
-    verify_storage_settings()
+# Trace data-access calls per request (Server-Timing header, N+1 warnings)
+init_tracing(app)
+
+# Storage settings are verified off the import path: in a background thread after
+# the first request (STORAGE_CHECK=background) or with `flask verify-storage`
+if Config.STORAGE_CHECK == 'background':
+    start_storage_check(app)
+
+def attach_tags(postcards):
+    """Add a 'tags' list to each postcard using one batched tag query"""
+    tags_by_postcard = TagDB.get_tags_for_postcards([postcard['id'] for postcard in postcards])
+    for postcard in postcards:
+        postcard['tags'] = tags_by_postcard.get(postcard['id'], [])
+    return postcards
+
+def store_submitted_image(image_file):
+    """Upload a submitted image; returns its URL, or None if nothing was submitted or the upload failed"""
+    if not image_file or not image_file.filename:
+        return None
+    return save_image(image_file)
+
+def release_images(*image_urls):
+    """Release images a postcard no longer points at"""
+    for image_url in image_urls:
+        if image_url:
+            delete_image(image_url)
+
+def queue_images(postcard_id, uploads):
+    """Spool submitted images for `flask image-worker`; returns the postcard's image_status"""
+    queued = False
+    for side, image_file in uploads.items():
+        try:
+            enqueue_image(postcard_id, side, image_file)
+            queued = True
+        except UploadRejected as e:
+            flash(f"The {side} image was not saved: {str(e)}", 'error')
+        except Exception as e:
+            app.logger.error(f"Error queueing images for {postcard_id}: {str(e)}")
+            return 'failed'
+    return 'processing' if queued else None
 
 # Routes for public access
 @app.route('/')
 def index():
     """Homepage with featured postcards"""
     # Get the latest postcards
-    postcards = PostcardDB.get_all_postcards(limit=8)
+    postcards = attach_tags(PostcardDB.get_all_postcards(limit=8, fields='card'))
     return render_template('index.html', postcards=postcards)
 
 @app.route('/user/settings', methods=['GET', 'POST'])
@@ -49,15 +94,14 @@ def user_settings():
     # Use current_user directly instead of trying to fetch from Supabase again
     return render_template('auth/settings.html', user=current_user)
 
-@app.route('/postcards')
-def list_postcards():
-    """List all postcards with optional filtering"""
+def parse_postcard_filters(args):
+    """Build the postcard filter dict from query-string arguments"""
     # Get filter parameters
-    era = request.args.get('era')
-    postcard_type = request.args.get('type')
-    manufacturer = request.args.get('manufacturer')
-    is_posted = request.args.get('is_posted', type=bool)
-    is_written = request.args.get('is_written', type=bool)
+    era = args.get('era')
+    postcard_type = args.get('type')
+    manufacturer = args.get('manufacturer')
+    is_posted = args.get('is_posted', type=bool)
+    is_written = args.get('is_written', type=bool)
     
     # Prepare filters
     filters = {}
@@ -72,13 +116,37 @@ def list_postcards():
     if is_written is not None:
         filters['is_written'] = is_written
     
-    # Pagination
+    return filters
+
+@app.route('/postcards')
+def list_postcards():
+    """List all postcards with optional filtering"""
+    filters = parse_postcard_filters(request.args)
+    
+    # Pagination: cursor tokens, with ?page= kept as a fallback for old links
+    after = request.args.get('after')
+    before = request.args.get('before')
     page = request.args.get('page', 1, type=int)
     per_page = 20
-    offset = (page - 1) * per_page
+    offset = 0 if (after or before) else (page - 1) * per_page
     
-    # Get postcards
-    postcards = PostcardDB.get_all_postcards(limit=per_page, offset=offset, filters=filters)
+    def load_page():
+        # Get postcards (one extra row tells us whether another page exists)
+        rows = PostcardDB.get_all_postcards(
+            limit=per_page + 1, offset=offset, filters=filters, after=after, before=before, fields='card'
+        )
+        pagination = build_page(rows, per_page, after=after, before=before, page=page)
+        attach_tags(pagination.items)
+        return pagination
+    
+    # The page and the result counts for each filter option are fetched concurrently
+    pagination, facets = gather(load_page, lambda: PostcardDB.get_postcard_facets(filters),
+                                return_exceptions=True)
+    if isinstance(pagination, Exception):
+        raise pagination
+    if isinstance(facets, Exception):
+        app.logger.error(f"Error loading facet counts: {str(facets)}")
+        facets = None
     
     # Get filter options for dropdowns
     eras = PostcardDB.get_postcard_eras()
@@ -86,18 +154,48 @@ def list_postcards():
     
     return render_template(
         'postcards/list.html', 
-        postcards=postcards,
+        postcards=pagination.items,
+        pagination=pagination,
         eras=eras,
         types=types,
-        current_filters=filters,
-        page=page
+        facets=facets,
+        current_filters=filters
+    )
+
+@app.route('/postcards/search')
+def search_postcards():
+    """Ranked full-text search over postcards, combinable with the browse filters"""
+    query = request.args.get('q', '').strip()
+    filters = parse_postcard_filters(request.args)
+    after = request.args.get('after')
+    per_page = 20
+    
+    results = []
+    next_cursor = None
+    
+    if query:
+        # One extra row tells us whether another page exists
+        rows = PostcardDB.search_postcards(query, filters=filters, limit=per_page + 1, after=after)
+        results = attach_tags(rows[:per_page])
+        if len(rows) > per_page:
+            next_cursor = encode_rank_cursor(results[-1])
+    
+    return render_template(
+        'postcards/search.html',
+        query=query,
+        postcards=results,
+        next_cursor=next_cursor,
+        eras=PostcardDB.get_postcard_eras(),
+        types=PostcardDB.get_postcard_types(),
+        current_filters=filters
     )
 
 # Modify existing view_postcard route to handle different statuses
 @app.route('/postcards/<uuid:postcard_id>')
 def view_postcard(postcard_id):
     """View a single postcard"""
-    postcard = PostcardDB.get_postcard(str(postcard_id))
+    # Postcard, tags and uploader in a single round trip
+    postcard = PostcardDB.get_postcard_with_tags(str(postcard_id))
     
     if not postcard:
         flash('Postcard not found', 'error')
@@ -114,13 +212,10 @@ def view_postcard(postcard_id):
         flash('This postcard is not available for viewing', 'error')
         return redirect(url_for('list_postcards'))
     
-    # Get tags for this postcard
-    tags = TagDB.get_postcard_tags(str(postcard_id))
-    
     # Pass additional context about user's permissions
     context = {
         'postcard': postcard, 
-        'tags': tags,
+        'tags': postcard['tags'],
         'can_submit': is_owner and postcard['status'] == 'draft',
         'can_review': is_admin and postcard['status'] == 'staged'
     }
@@ -193,15 +288,16 @@ def register():
             flash('Passwords do not match', 'error')
             return redirect(url_for('register'))
         
-        # Check if username already exists
-        existing_user = UserDB.get_user_by_username(username)
-        if existing_user:
+        # Check whether the username or email already exists (both lookups at once)
+        existing_username, existing_email = gather(
+            lambda: UserDB.get_user_by_username(username),
+            lambda: UserDB.get_user_by_email(email)
+        )
+        if existing_username:
             flash('Username is already in use', 'error')
             return redirect(url_for('register'))
         
-        # Check if email already exists
-        existing_user = UserDB.get_user_by_email(email)
-        if existing_user:
+        if existing_email:
             flash('Email is already in use', 'error')
             return redirect(url_for('register'))
         
@@ -267,7 +363,7 @@ def logout():
 def user_profile():
     """User profile page"""
     # Get user postcards
-    user_postcards = PostcardDB.get_user_postcards(current_user.id)
+    user_postcards = attach_tags(PostcardDB.get_user_postcards(current_user.id, fields='card'))
     
     return render_template('auth/profile.html', postcards=user_postcards)
 
@@ -360,13 +456,16 @@ def change_password():
 @requires_admin
 def admin_users():
     """Admin page to view all users"""
+    after = request.args.get('after')
+    before = request.args.get('before')
     page = request.args.get('page', 1, type=int)
     per_page = 20
-    offset = (page - 1) * per_page
+    offset = 0 if (after or before) else (page - 1) * per_page
     
-    users = UserDB.get_all_users(limit=per_page, offset=offset)
+    rows = UserDB.get_all_users(limit=per_page + 1, offset=offset, after=after, before=before)
+    pagination = build_page(rows, per_page, after=after, before=before, page=page)
     
-    return render_template('admin/users.html', users=users, page=page)
+    return render_template('admin/users.html', users=pagination.items, pagination=pagination)
 
 @app.route('/admin/users/<uuid:user_id>', methods=['GET', 'POST'])
 @login_required
@@ -407,14 +506,50 @@ def admin_edit_user(user_id):
 @requires_admin
 def admin_dashboard():
     """Admin dashboard with links to all admin functions"""
-    # Get some basic stats for the dashboard
-    stats = {
-        'total_users': len(UserDB.get_all_users(limit=1000)),
-        'total_postcards': len(PostcardDB.get_all_postcards(limit=1000)),
-        'total_tags': len(TagDB.get_all_tags())
-    }
+    # Exact counts aggregated in the database (cached briefly)
+    stats = get_catalog_stats(force_refresh=request.args.get('refresh') == '1')
     
-    return render_template('admin/dashboard.html', stats=stats)
+    # The queue database only exists when uploads are queued (IMAGE_PROCESSING=queue)
+    image_queue = None
+    if Config.IMAGE_PROCESSING == 'queue':
+        try:
+            image_queue = queue_stats()
+        except Exception as e:
+            app.logger.error(f"Error reading image queue stats: {str(e)}")
+    
+    return render_template(
+        'admin/dashboard.html', stats=stats, cache_stats=postcard_cache.stats(), pool_stats=pool_stats(),
+        image_queue=image_queue
+    )
+
+@app.route('/admin/export')
+@login_required
+@requires_admin
+def admin_export():
+    """Stream the catalog as NDJSON or CSV (?format=, ?gzip=1, plus the browse filters and ?status=)"""
+    from utils.exporter import export_stream, export_filename, CONTENT_TYPES, EXPORT_FORMATS
+    from utils.enums import POSTCARD_STATUSES
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    status = request.args.get('status')
+    if status and status not in POSTCARD_STATUSES:
+        return jsonify({'error': f"status must be one of {', '.join(POSTCARD_STATUSES)}"}), 400
+    
+    use_gzip = request.args.get('gzip') == '1'
+    stream = export_stream(
+        PostcardDB, TagDB, export_format,
+        filters=parse_postcard_filters(request.args), status=status, gzip=use_gzip
+    )
+    
+    # No Content-Length, so the response is sent with chunked transfer encoding
+    response = Response(stream_with_context(stream), mimetype=CONTENT_TYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(export_format, use_gzip)}"'
+    if use_gzip:
+        response.mimetype = 'application/gzip'
+    return response
 
 @app.route('/admin/tags')
 @login_required
@@ -437,7 +572,7 @@ def add_postcard():
         postcard_type = request.form.get('type')
         is_posted = 'is_posted' in request.form
         is_written = 'is_written' in request.form
-        tags = request.form.get('tags', '').split(',')
+        tags = request.form.get('tags', '')
         
         # Determine action (draft or submit)
         action = request.form.get('action', 'draft')
@@ -447,19 +582,16 @@ def add_postcard():
             flash('Title is required', 'error')
             return redirect(url_for('add_postcard'))
         
-        # Handle image uploads
-        front_image_url = None
-        back_image_url = None
-        
-        if 'front_image' in request.files:
-            front_image = request.files['front_image']
-            if front_image.filename:
-                front_image_url = save_image(front_image)
-        
-        if 'back_image' in request.files:
-            back_image = request.files['back_image']
-            if back_image.filename:
-                back_image_url = save_image(back_image)
+        # Images are processed here, or by `flask image-worker` when IMAGE_PROCESSING=queue
+        uploads = submitted_images(request.files) if Config.IMAGE_PROCESSING == 'queue' else {}
+        if uploads:
+            front_image_url = back_image_url = None
+        else:
+            # Front and back upload concurrently
+            front_image_url, back_image_url = gather(
+                lambda: store_submitted_image(request.files.get('front_image')),
+                lambda: store_submitted_image(request.files.get('back_image'))
+            )
         
         # Create postcard data
         postcard_data = {
@@ -472,6 +604,7 @@ def add_postcard():
             'is_written': is_written,
             'front_image_url': front_image_url,
             'back_image_url': back_image_url,
+            'image_status': 'processing' if uploads else 'ready',
             'user_id': current_user.id,  # Add user ID to track ownership
             'status': 'draft' if action == 'draft' else 'staged'
         }
@@ -480,19 +613,14 @@ def add_postcard():
         postcard = PostcardDB.create_postcard(postcard_data)
         
         if postcard:
-            # Handle tags
-            for tag_name in tags:
-                tag_name = tag_name.strip()
-                if tag_name:
-                    # Create tag if it doesn't exist
-                    existing_tags = TagDB.get_all_tags()
-                    tag = next((t for t in existing_tags if t['name'].lower() == tag_name.lower()), None)
-                    
-                    if not tag:
-                        tag = TagDB.create_tag(tag_name)
-                    
-                    if tag:
-                        TagDB.link_tag_to_postcard(postcard['id'], tag['id'])
+            image_status = queue_images(postcard['id'], uploads)
+            if uploads and image_status != 'processing':
+                PostcardDB.update_postcard(postcard['id'], {'image_status': image_status or 'ready'})
+                if image_status == 'failed':
+                    flash('Your images could not be queued for processing; please upload them again', 'error')
+            
+            # Resolve/create all tags and link them in batch
+            TagDB.set_postcard_tags(postcard['id'], tags)
             
             # Determine flash message based on action
             if action == 'draft':
@@ -502,6 +630,7 @@ def add_postcard():
                 flash('Postcard submitted for review', 'success')
                 return redirect(url_for('view_postcard', postcard_id=postcard['id']))
         else:
+            release_images(front_image_url, back_image_url)
             flash('Failed to add postcard', 'error')
     
     # GET request - show form
@@ -514,7 +643,7 @@ def add_postcard():
 @login_required
 def submit_postcard(postcard_id):
     """Submit a draft postcard for review"""
-    postcard = PostcardDB.get_postcard(str(postcard_id))
+    postcard = PostcardDB.get_postcard(str(postcard_id), cached=False)
     
     if not postcard:
         flash('Postcard not found', 'error')
@@ -545,14 +674,75 @@ def submit_postcard(postcard_id):
 @requires_admin
 def admin_staged_postcards():
     """View all staged postcards for admin review"""
+    filters = parse_postcard_filters(request.args)
+    after = request.args.get('after')
+    before = request.args.get('before')
     page = request.args.get('page', 1, type=int)
     per_page = 20
-    offset = (page - 1) * per_page
+    offset = 0 if (after or before) else (page - 1) * per_page
     
     # Fetch staged postcards
-    staged_postcards = PostcardDB.get_staged_postcards(limit=per_page, offset=offset)
+    rows = PostcardDB.get_staged_postcards(
+        limit=per_page + 1, offset=offset, after=after, before=before, fields='admin_review', filters=filters
+    )
+    pagination = build_page(rows, per_page, after=after, before=before, page=page)
     
-    return render_template('admin/staged_postcards.html', postcards=staged_postcards, page=page)
+    return render_template(
+        'admin/staged_postcards.html',
+        postcards=pagination.items,
+        pagination=pagination,
+        eras=PostcardDB.get_postcard_eras(),
+        types=PostcardDB.get_postcard_types(),
+        current_filters=filters
+    )
+
+@app.route('/admin/postcards/staged/review', methods=['POST'])
+@login_required
+@requires_admin
+def bulk_review_postcards():
+    """Approve or reject many staged postcards at once"""
+    action = request.form.get('action')
+    review_notes = request.form.get('review_notes', '').strip() or None
+    filters = parse_postcard_filters(request.form)
+    
+    if action not in ['approve', 'reject']:
+        flash('Invalid review action', 'error')
+        return redirect(url_for('admin_staged_postcards', **filters))
+    
+    status = 'approved' if action == 'approve' else 'rejected'
+    
+    try:
+        if request.form.get('scope') == 'matching':
+            # Every staged postcard matching the queue filters
+            changed = PostcardDB.review_staged_postcards(status, filters, review_notes)
+        else:
+            postcard_ids = []
+            for postcard_id in request.form.getlist('postcard_ids'):
+                try:
+                    postcard_ids.append(str(uuid.UUID(postcard_id)))
+                except ValueError:
+                    continue
+            # Per-card notes, written in the same UPDATE
+            notes = [request.form.get(f'notes-{postcard_id}', '').strip() or None for postcard_id in postcard_ids]
+            changed = PostcardDB.review_postcards(postcard_ids, status, notes, review_notes)
+    except Exception as e:
+        app.logger.error(f"Bulk review error: {str(e)}")
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({'error': 'Bulk review failed'}), 500
+        flash('Failed to process bulk review', 'error')
+        return redirect(url_for('admin_staged_postcards', **filters))
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'status': status, 'updated': len(changed), 'ids': changed})
+    
+    if changed:
+        verb = 'Approved' if status == 'approved' else 'Rejected'
+        flash(f"{verb} {len(changed)} postcard{'s' if len(changed) != 1 else ''}",
+              'success' if status == 'approved' else 'warning')
+    else:
+        flash('No staged postcards were selected', 'error')
+    
+    return redirect(url_for('admin_staged_postcards', **filters))
 
 @app.route('/admin/postcards/<uuid:postcard_id>/review', methods=['POST'])
 @login_required
@@ -593,7 +783,8 @@ def review_postcard(postcard_id):
 @login_required
 def edit_postcard(postcard_id):
     """Edit an existing postcard"""
-    postcard = PostcardDB.get_postcard(str(postcard_id))
+    # A save acts on the row as it is now, not on another worker's cached copy
+    postcard = PostcardDB.get_postcard_with_tags(str(postcard_id), cached=request.method == 'GET')
     
     if not postcard:
         flash('Postcard not found', 'error')
@@ -613,35 +804,23 @@ def edit_postcard(postcard_id):
         postcard_type = request.form.get('type')
         is_posted = 'is_posted' in request.form
         is_written = 'is_written' in request.form
+        tags = request.form.get('tags', '')
         
         # Validate required fields
         if not title:
             flash('Title is required', 'error')
             return redirect(url_for('edit_postcard', postcard_id=postcard_id))
         
-        # Handle image uploads
-        front_image_url = postcard.get('front_image_url')
-        back_image_url = postcard.get('back_image_url')
-        
-        if 'front_image' in request.files:
-            front_image = request.files['front_image']
-            if front_image.filename:
-                # Delete old image if it exists
-                if front_image_url:
-                    delete_image(front_image_url)
-                
-                # Upload new image
-                front_image_url = save_image(front_image)
-        
-        if 'back_image' in request.files:
-            back_image = request.files['back_image']
-            if back_image.filename:
-                # Delete old image if it exists
-                if back_image_url:
-                    delete_image(back_image_url)
-                
-                # Upload new image
-                back_image_url = save_image(back_image)
+        # Queued images replace the current ones once `flask image-worker` has processed them
+        uploads = submitted_images(request.files) if Config.IMAGE_PROCESSING == 'queue' else {}
+        if uploads:
+            front_image_url = back_image_url = None
+        else:
+            # Front and back are uploaded concurrently
+            front_image_url, back_image_url = gather(
+                lambda: store_submitted_image(request.files.get('front_image')),
+                lambda: store_submitted_image(request.files.get('back_image'))
+            )
         
         # Update postcard data
         postcard_data = {
@@ -651,15 +830,33 @@ def edit_postcard(postcard_id):
             'manufacturer': manufacturer,
             'type': postcard_type,
             'is_posted': is_posted,
-            'is_written': is_written,
-            'front_image_url': front_image_url,
-            'back_image_url': back_image_url
+            'is_written': is_written
         }
+        # Image columns are written only when this request uploaded a new image: the image
+        # worker may have attached one since the postcard was read
+        for column, image_url in (('front_image_url', front_image_url), ('back_image_url', back_image_url)):
+            if image_url:
+                postcard_data[column] = image_url
+        image_status = queue_images(str(postcard_id), uploads)
+        if image_status:
+            postcard_data['image_status'] = image_status
+            if image_status == 'failed':
+                flash('Your new images could not be queued for processing; please upload them again', 'error')
         
         # Save to database
         updated_postcard = PostcardDB.update_postcard(str(postcard_id), postcard_data)
         
+        # The replaced images are released only once the row no longer points at them (a
+        # re-upload of the same scan drops its extra reference); if the update failed, the
+        # new ones are released instead
+        replaced = [(postcard.get(column), postcard_data[column])
+                    for column in ('front_image_url', 'back_image_url') if column in postcard_data]
+        release_images(*[old_url if updated_postcard else new_url for old_url, new_url in replaced])
+        
         if updated_postcard:
+            # Apply only the tag changes (added and removed links)
+            TagDB.set_postcard_tags(str(postcard_id), tags, current_tags=postcard['tags'])
+            
             flash('Postcard updated successfully', 'success')
             return redirect(url_for('view_postcard', postcard_id=postcard_id))
         else:
@@ -668,21 +865,20 @@ def edit_postcard(postcard_id):
     # GET request - show form with current data
     eras = PostcardDB.get_postcard_eras()
     types = PostcardDB.get_postcard_types()
-    tags = TagDB.get_postcard_tags(str(postcard_id))
     
     return render_template(
         'postcards/edit.html', 
         postcard=postcard, 
         eras=eras, 
         types=types,
-        tags=tags
+        tags=postcard['tags']
     )
 
 @app.route('/postcards/<uuid:postcard_id>/delete', methods=['POST'])
 @login_required
 def delete_postcard(postcard_id):
     """Delete a postcard"""
-    postcard = PostcardDB.get_postcard(str(postcard_id))
+    postcard = PostcardDB.get_postcard(str(postcard_id), cached=False)
     
     if not postcard:
         flash('Postcard not found', 'error')
@@ -693,19 +889,26 @@ def delete_postcard(postcard_id):
         flash('You do not have permission to delete this postcard', 'error')
         return redirect(url_for('list_postcards'))
     
-    # Delete associated images
-    if postcard.get('front_image_url'):
-        delete_image(postcard['front_image_url'])
-    
-    if postcard.get('back_image_url'):
-        delete_image(postcard['back_image_url'])
+    # Delete from database, then release the images of the row actually deleted
+    deleted = PostcardDB.delete_postcard(str(postcard_id))
+    if not deleted:
+        flash('Failed to delete postcard', 'error')
+        return redirect(url_for('view_postcard', postcard_id=postcard_id))
     
-    # Delete from database
-    PostcardDB.delete_postcard(str(postcard_id))
+    for row in deleted:
+        release_images(row.get('front_image_url'), row.get('back_image_url'))
     
     flash('Postcard deleted successfully', 'success')
     return redirect(url_for('list_postcards'))
 
+@app.route(f"{Config.LOCAL_IMAGE_URL.rstrip('/')}/<path:key>")
+def serve_image(key):
+    """Images kept by the local storage backend (IMAGE_STORAGE=local)"""
+    storage = get_storage()
+    if storage.name != 'local':
+        return page_not_found(None)
+    return storage.serve(key)
+
 @app.errorhandler(404)
 def page_not_found(e):
     return render_template('error.html', error='Page not found'), 404
@@ -714,5 +917,237 @@ def page_not_found(e):
 def internal_server_error(e):
     return render_template('error.html', error='Internal server error'), 500
 
+# CLI commands
+@app.cli.command('benchmark-backends')
+@click.option('--iterations', default=50, show_default=True, help='Timed requests per page')
+@click.option('--backend', 'backends', multiple=True, help='Backend(s) to benchmark (default: all configured)')
+def benchmark_backends(iterations, backends):
+    """Compare list and detail page latency on each data-access backend"""
+    from utils.benchmark import BACKEND_NAMES, load_backend, benchmark_pages, format_results
+    
+    if not backends:
+        backends = [name for name in BACKEND_NAMES if name != 'postgres' or Config.DATABASE_URL]
+    
+    for name in backends:
+        try:
+            results = benchmark_pages(app, sys.modules[__name__], load_backend(name), iterations)
+        except Exception as e:
+            click.echo(f"{name:<10} failed: {e}", err=True)
+            continue
+        
+        for line in format_results(name, results):
+            click.echo(line)
+
+@app.cli.command('benchmark-search')
+@click.option('--seed', 'seed_count', default=0, show_default=True, help='Synthetic approved postcards to insert first')
+@click.option('--iterations', default=30, show_default=True, help='Timed calls per query')
+@click.option('--cleanup', is_flag=True, help='Delete the synthetic postcards afterwards')
+def benchmark_search(seed_count, iterations, cleanup):
+    """Measure full-text search latency on the configured backend"""
+    from utils.benchmark import seed_search_corpus, clear_search_corpus, benchmark_search as run_search_benchmark, format_results
+    
+    backend = Config.DB_BACKEND
+    
+    if seed_count:
+        rate = seed_search_corpus(backend, seed_count)
+        click.echo(f"Seeded {seed_count} postcards ({rate:.0f} rows/sec)")
+    
+    try:
+        for line in format_results(backend, run_search_benchmark(PostcardDB, iterations)):
+            click.echo(line)
+    finally:
+        if cleanup:
+            click.echo(f"Removed {clear_search_corpus(backend)} synthetic postcards")
+
+@app.cli.command('import-postcards')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--images', 'image_dir', type=click.Path(exists=True, file_okay=False),
+              help='Directory the manifest image paths are relative to (default: the manifest\'s directory)')
+@click.option('--status', type=click.Choice(['draft', 'staged', 'approved']), default='staged', show_default=True,
+              help='Status given to imported postcards')
+@click.option('--owner', help='Username or email of the user the postcards belong to')
+@click.option('--batch-size', default=200, show_default=True, help='Rows per multi-row insert')
+@click.option('--workers', default=8, show_default=True, help='Concurrent image uploads')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Progress file (default: MANIFEST.checkpoint.json)')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint and start from the first row')
+def import_postcards_command(manifest, image_dir, status, owner, batch_size, workers, checkpoint, restart):
+    """Bulk import postcards and their scans from a CSV or NDJSON manifest"""
+    from utils.importer import import_postcards
+    
+    user_id = None
+    if owner:
+        user = UserDB.get_user_by_email(owner) if '@' in owner else UserDB.get_user_by_username(owner)
+        if not user:
+            raise click.ClickException(f"No user found for {owner!r}")
+        user_id = user['id']
+    
+    stats = import_postcards(
+        manifest,
+        image_dir or os.path.dirname(os.path.abspath(manifest)),
+        PostcardDB,
+        TagDB,
+        status=status,
+        user_id=user_id,
+        batch_size=batch_size,
+        workers=workers,
+        checkpoint_path=checkpoint or f"{manifest}.checkpoint.json",
+        restart=restart,
+        echo=click.echo
+    )
+    
+    for line, error in stats.errors:
+        click.echo(f"Line {line}: {error}", err=True)
+    click.echo(stats.report())
+
+@app.cli.command('export-postcards')
+@click.option('--format', 'export_format', type=click.Choice(['ndjson', 'csv']), default='ndjson', show_default=True)
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), help='Output file (default: stdout)')
+@click.option('--gzip', 'use_gzip', is_flag=True, help='Compress the output')
+@click.option('--status', type=click.Choice(['draft', 'staged', 'approved', 'rejected']), default='approved',
+              show_default=True)
+@click.option('--era', help='Only postcards from this era')
+@click.option('--type', 'postcard_type', help='Only postcards of this type')
+@click.option('--manufacturer', help='Only postcards by this manufacturer')
+@click.option('--posted', 'is_posted', is_flag=True, default=None, help='Only posted postcards')
+@click.option('--written', 'is_written', is_flag=True, default=None, help='Only written postcards')
+@click.option('--batch-size', default=500, show_default=True, help='Rows fetched per keyset page')
+def export_postcards_command(export_format, output, use_gzip, status, era, postcard_type, manufacturer,
+                             is_posted, is_written, batch_size):
+    """Stream every matching postcard, with tags and uploader, as NDJSON or CSV"""
+    from utils.exporter import export_stream
+    
+    filters = {'era': era, 'type': postcard_type, 'manufacturer': manufacturer,
+               'is_posted': is_posted, 'is_written': is_written}
+    filters = {field: value for field, value in filters.items() if value}
+    
+    stream = export_stream(PostcardDB, TagDB, export_format, filters=filters, status=status, gzip=use_gzip,
+                           batch_size=batch_size)
+    
+    out = open(output, 'wb') if output else click.get_binary_stream('stdout')
+    try:
+        for chunk in stream:
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
+
+@app.cli.command('benchmark-routes')
+@click.option('--iterations', default=100, show_default=True, help='Timed requests per route')
+@click.option('--latency-ms', default=0.0, show_default=True, help='Simulated round-trip time per Supabase call')
+@click.option('--jitter-ms', default=0.0, show_default=True, help='Random extra delay per Supabase call')
+@click.option('--seed', 'seed_count', default=500, show_default=True, help='Approved postcards in the in-memory catalog')
+@click.option('--max-p99-ms', type=float, help='Exit with an error if any route\'s p99 exceeds this')
+def benchmark_routes_command(iterations, latency_ms, jitter_ms, seed_count, max_p99_ms):
+    """Measure route throughput and latency against an in-memory Supabase"""
+    from utils.benchmark import benchmark_routes, format_results
+
+    results = benchmark_routes(app, sys.modules[__name__], iterations, latency_ms, jitter_ms, seed_count)
+    for line in format_results('fake', results):
+        click.echo(line)
+
+    if max_p99_ms is not None:
+        slow = [name for name, stats in results.items() if stats['p99_ms'] > max_p99_ms]
+        if slow:
+            raise click.ClickException(f"p99 above {max_p99_ms}ms: {', '.join(slow)}")
+
+@app.cli.command('benchmark-uploads')
+@click.option('--size-mb', default=16.0, show_default=True, help='Size of each uploaded scan')
+@click.option('--concurrency', default=4, show_default=True, help='Uploads in progress at once')
+@click.option('--rounds', default=2, show_default=True, help='Batches of concurrent uploads')
+@click.option('--max-peak-mb', type=float, help='Exit with an error if peak Python allocations exceed this')
+def benchmark_uploads_command(size_mb, concurrency, rounds, max_peak_mb):
+    """Measure memory used by concurrent image uploads (against an in-memory Supabase)"""
+    from utils.benchmark import measure_upload_memory
+
+    result = measure_upload_memory(size_mb, concurrency, rounds)
+    click.echo(f"{result['uploads']} uploads of {size_mb:.0f}MB, {concurrency} at a time, "
+               f"in {result['seconds']:.1f}s ({result['failed']} failed)")
+    click.echo(f"peak Python allocations: {result['python_peak_mb']:.1f}MB "
+               f"(whole files in memory would hold {result['buffered_mb']:.0f}MB)")
+    if result['rss_growth_mb'] is not None:
+        click.echo(f"peak RSS growth: {result['rss_growth_mb']:.1f}MB")
+
+    if result['failed']:
+        raise click.ClickException(f"{result['failed']} uploads failed; see the log above")
+    if max_peak_mb is not None and result['python_peak_mb'] > max_peak_mb:
+        raise click.ClickException(
+            f"Peak allocations {result['python_peak_mb']:.1f}MB exceed the {max_peak_mb:.0f}MB limit"
+        )
+
+@app.cli.command('verify-storage')
+def verify_storage_command():
+    """Check (and create or make public) the postcard image bucket, or the local image directory"""
+    if not verify_storage_settings():
+        raise click.ClickException('Storage verification failed; see the log above')
+    click.echo('Storage settings verified')
+
+@app.cli.command('image-worker')
+@click.option('--processes', type=int, help='Worker processes (default IMAGE_WORKER_PROCESSES; 0 runs jobs in this process)')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds between checks of an empty queue')
+@click.option('--once', is_flag=True, help='Exit when no job is ready to run instead of waiting for more')
+def image_worker_command(processes, poll_interval, once):
+    """Process queued image uploads (derivatives, storage upload and postcard update) and image deletions"""
+    import logging
+    from utils.image_queue import run_worker
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    try:
+        finished = run_worker(processes, poll_interval, once)
+    except KeyboardInterrupt:
+        return
+    click.echo(f"Processed {finished} image job{'s' if finished != 1 else ''}")
+
+@app.cli.command('image-queue')
+def image_queue_command():
+    """Show image queue depth and job latency"""
+    from utils.image_queue import queue_stats
+
+    stats = queue_stats()
+    click.echo(f"queued {stats['queued']}  running {stats['running']}  failed {stats['failed']}  "
+               f"oldest queued {stats['oldest_queued_age']:.1f}s")
+    click.echo(f"last hour: {stats['completed']} done, wait p50 {stats['wait_p50']:.1f}s p95 {stats['wait_p95']:.1f}s, "
+               f"upload to ready p50 {stats['latency_p50']:.1f}s p95 {stats['latency_p95']:.1f}s")
+    click.echo(f"images waiting for deletion: {ImageDB.pending_deletions()}")
+
+@app.cli.command('sweep-deletions')
+def sweep_deletions_command():
+    """Remove queued image deletions from storage now (the image worker does this every IMAGE_DELETE_INTERVAL)"""
+    from utils.image_gc import sweep_deletions
+
+    removed = sweep_deletions()
+    click.echo(f"Removed {removed} images; {ImageDB.pending_deletions()} still queued")
+
+@app.cli.command('gc-images')
+@click.option('--min-age-hours', default=24.0, show_default=True, help='Only remove objects older than this')
+@click.option('--rate', default=50.0, show_default=True, help='Most objects removed per second')
+@click.option('--batch-size', default=100, show_default=True, help='Objects per storage remove request')
+@click.option('--page-size', default=1000, show_default=True, help='Rows or listing entries read per request')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed without removing it')
+def gc_images_command(min_age_hours, rate, batch_size, page_size, dry_run):
+    """Remove stored images that no postcard refers to"""
+    from utils.image_gc import collect_garbage
+
+    counts = collect_garbage(min_age=min_age_hours * 3600, batch_size=batch_size, rate=rate,
+                             page_size=page_size, dry_run=dry_run)
+    click.echo(f"scanned {counts['scanned']} entries: {counts['orphaned']} unreferenced, "
+               f"{counts['recent']} too recent to remove")
+    click.echo(f"{'would remove' if dry_run else 'removed'} {counts['removed']} objects")
+
+@app.cli.command('import-budget')
+@click.option('--max-ms', type=float, default=1500, show_default=True, help='Fail if importing app takes longer')
+@click.option('--runs', default=3, show_default=True, help='Fresh interpreters to time (the fastest counts)')
+@click.option('--top', default=10, show_default=True, help='Slowest modules to list')
+def import_budget_command(max_ms, runs, top):
+    """Time a cold `import app` in a fresh interpreter against a budget"""
+    from utils.benchmark import time_cold_import
+
+    elapsed_ms, slowest = time_cold_import('app', runs)
+    click.echo(f"import app: {elapsed_ms:.0f}ms (budget {max_ms:.0f}ms)")
+    for module, cumulative_ms in slowest[:top]:
+        click.echo(f"  {cumulative_ms:8.1f}ms  {module}")
+
+    if elapsed_ms > max_ms:
+        raise click.ClickException(f"Cold import took {elapsed_ms:.0f}ms, over the {max_ms:.0f}ms budget")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -14,7 +14,71 @@ class Config:
     SUPABASE_KEY = os.environ.get('SUPABASE_KEY')  # anon/public key
     SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')  # service role key
     
+    # Shared keep-alive connection pool for every Supabase HTTP client in a worker
+    SUPABASE_POOL_MAX = int(os.environ.get('SUPABASE_POOL_MAX', 20))  # concurrent connections
+    SUPABASE_POOL_KEEPALIVE = int(os.environ.get('SUPABASE_POOL_KEEPALIVE', 10))  # idle connections kept open
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY', 30))  # seconds idle before closing
+    
+    # Data-access backend: 'supabase' (PostgREST over HTTPS) or 'postgres' (direct psycopg2)
+    DB_BACKEND = os.environ.get('DB_BACKEND', 'supabase')
+    DATABASE_URL = os.environ.get('DATABASE_URL')  # Postgres DSN for the postgres backend
+    DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+    DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    
+    # Seconds the admin dashboard statistics are cached in each worker
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 60))
+    
+    # Per-worker read-through cache of single postcards (set either to 0 to disable)
+    POSTCARD_CACHE_SIZE = int(os.environ.get('POSTCARD_CACHE_SIZE', 1024))
+    POSTCARD_CACHE_TTL = int(os.environ.get('POSTCARD_CACHE_TTL', 30))
+    
+    # Per-request data-access tracing (Server-Timing header and N+1 warnings)
+    QUERY_TRACING = os.environ.get('QUERY_TRACING', 'true').lower() in ('1', 'true', 'yes')
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))  # warn above this many repeats
+    QUERY_TRACE_PANEL = os.environ.get('QUERY_TRACE_PANEL', str(DEBUG)).lower() in ('1', 'true', 'yes')
+    
+    # Shared thread pool for running a request's independent data calls concurrently
+    FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', 16))  # 0 or 1 runs them one after another
+    FANOUT_TIMEOUT = float(os.environ.get('FANOUT_TIMEOUT', 30))  # seconds to wait for a fan-out
+    
+    # Seconds between checks of tags_version by the in-process tag dictionary
+    TAG_VERSION_CHECK_INTERVAL = float(os.environ.get('TAG_VERSION_CHECK_INTERVAL', 5))
+    
+    # When to check the storage bucket: 'background' (once per worker, after its first
+    # request) or 'off' (run `flask verify-storage` on deploy instead)
+    STORAGE_CHECK = os.environ.get('STORAGE_CHECK', 'background').lower()
+    
+    # Formats resized image derivatives are encoded in, besides the JPEG fallback
+    # ('webp', 'avif'; AVIF is much slower to encode)
+    IMAGE_FORMATS = [fmt.strip().lower() for fmt in os.environ.get('IMAGE_FORMATS', 'webp').split(',') if fmt.strip()]
+    
+    # Where images are stored: 'supabase' (the postcard-images bucket) or 'local' (LOCAL_IMAGE_DIR,
+    # served at LOCAL_IMAGE_URL by this app, or by the proxy when LOCAL_IMAGE_SERVE is
+    # 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd))
+    IMAGE_STORAGE = os.environ.get('IMAGE_STORAGE', 'supabase').lower()
+    LOCAL_IMAGE_DIR = os.environ.get('LOCAL_IMAGE_DIR', os.path.join('instance', 'images'))
+    LOCAL_IMAGE_URL = os.environ.get('LOCAL_IMAGE_URL', '/images')
+    LOCAL_IMAGE_SERVE = os.environ.get('LOCAL_IMAGE_SERVE', 'send_file').lower()
+    LOCAL_IMAGE_ACCEL_PREFIX = os.environ.get('LOCAL_IMAGE_ACCEL_PREFIX', '/protected-images')
+    
+    # Image processing: 'inline' (decoded, resized and uploaded during the request) or
+    # 'queue' (uploads are spooled and processed by `flask image-worker`, which must be running)
+    IMAGE_PROCESSING = os.environ.get('IMAGE_PROCESSING', 'inline').lower()
+    IMAGE_QUEUE_DIR = os.environ.get('IMAGE_QUEUE_DIR', os.path.join('instance', 'image_queue'))
+    IMAGE_WORKER_PROCESSES = int(os.environ.get('IMAGE_WORKER_PROCESSES', os.cpu_count() or 2))
+    IMAGE_JOB_ATTEMPTS = int(os.environ.get('IMAGE_JOB_ATTEMPTS', 3))
+    IMAGE_JOB_TIMEOUT = float(os.environ.get('IMAGE_JOB_TIMEOUT', 600))  # seconds before a running job is retried
+    IMAGE_JOB_RETENTION = float(os.environ.get('IMAGE_JOB_RETENTION', 86400))  # seconds finished jobs are kept
+    
+    # Deleted images are queued and removed from storage by the image worker
+    IMAGE_DELETE_DELAY = float(os.environ.get('IMAGE_DELETE_DELAY', 300))  # seconds before a deleted image is removed
+    IMAGE_DELETE_BATCH = int(os.environ.get('IMAGE_DELETE_BATCH', 50))  # images per storage remove request
+    IMAGE_DELETE_INTERVAL = float(os.environ.get('IMAGE_DELETE_INTERVAL', 30))  # seconds between sweeps
+    IMAGE_DELETE_LEASE = float(os.environ.get('IMAGE_DELETE_LEASE', 300))  # seconds a claimed batch is retried after
+    
     # Image upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    UPLOAD_FOLDER = os.path.join('static', 'uploads')
+    MAX_IMAGE_BYTES = int(os.environ.get('MAX_IMAGE_BYTES', MAX_CONTENT_LENGTH))  # per image
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 64 * 1024))  # bytes read at a time while spooling
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
\ No newline at end of file
@@ -4,6 +4,9 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Reset database script - removes all existing data, tables, types, and policies
+DROP TABLE IF EXISTS image_deletions CASCADE;
+DROP TABLE IF EXISTS image_objects CASCADE;
+DROP TABLE IF EXISTS tags_version CASCADE;
 DROP TABLE IF EXISTS postcard_tags CASCADE;
 DROP TABLE IF EXISTS tags CASCADE;
 DROP TABLE IF EXISTS postcards CASCADE;
@@ -13,6 +16,7 @@ DROP TABLE IF EXISTS users CASCADE;
 DROP TYPE IF EXISTS postcard_type CASCADE;
 DROP TYPE IF EXISTS postcard_era CASCADE;
 DROP TYPE IF EXISTS postcard_status CASCADE;
+DROP TYPE IF EXISTS image_status CASCADE;
 DROP TYPE IF EXISTS user_role CASCADE;
 
 -- Create enum for postcard types
@@ -54,6 +58,13 @@ CREATE TYPE postcard_status AS ENUM (
   'draft'      -- Saved by user but not submitted
 );
 
+-- Create enum for the state of a postcard's uploaded images
+CREATE TYPE image_status AS ENUM (
+  'processing',  -- Upload queued for `flask image-worker`
+  'ready',       -- Images (and their resized copies) are in storage
+  'failed'       -- Processing gave up; the previous image, if any, is kept
+);
+
 -- Create enum for user roles
 CREATE TYPE user_role AS ENUM (
   'admin',
@@ -83,9 +94,11 @@ CREATE TABLE postcards (
   type postcard_type,
   front_image_url TEXT,
   back_image_url TEXT,
+  image_status image_status NOT NULL DEFAULT 'ready',
   user_id UUID REFERENCES users(id) ON DELETE SET NULL,
   status postcard_status NOT NULL DEFAULT 'draft',
   review_notes TEXT,
+  search_vector TSVECTOR,  -- maintained by triggers below; title, tags, manufacturer, description
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -109,11 +122,18 @@ CREATE INDEX idx_postcards_type ON postcards(type);
 CREATE INDEX idx_postcards_manufacturer ON postcards(manufacturer);
 CREATE INDEX idx_postcards_user_id ON postcards(user_id);
 CREATE INDEX idx_postcards_status ON postcards(status);
+CREATE INDEX idx_postcards_search_vector ON postcards USING GIN (search_vector);
 CREATE INDEX idx_tags_name ON tags(name);
+CREATE INDEX idx_tags_lower_name ON tags(lower(name));
 CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_role ON users(role);
 
+-- Composite indexes backing keyset (cursor) pagination on (created_at, id)
+CREATE INDEX idx_postcards_status_created_id ON postcards(status, created_at DESC, id DESC);
+CREATE INDEX idx_postcards_user_created_id ON postcards(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_users_created_id ON users(created_at DESC, id DESC);
+
 -- Create a function to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_modified_column()
 RETURNS TRIGGER AS $$
@@ -134,11 +154,400 @@ BEFORE UPDATE ON users
 FOR EACH ROW
 EXECUTE FUNCTION update_modified_column();
 
+-- Full-text search document for a postcard, weighted title > tags > manufacturer > description
+CREATE OR REPLACE FUNCTION postcard_search_document(
+  p_id UUID, p_title TEXT, p_description TEXT, p_manufacturer TEXT
+)
+RETURNS TSVECTOR AS $$
+  SELECT setweight(to_tsvector('english', COALESCE(p_title, '')), 'A') ||
+         setweight(to_tsvector('english', COALESCE((
+           SELECT string_agg(t.name, ' ')
+           FROM postcard_tags pt JOIN tags t ON t.id = pt.tag_id
+           WHERE pt.postcard_id = p_id
+         ), '')), 'B') ||
+         setweight(to_tsvector('english', COALESCE(p_manufacturer, '')), 'C') ||
+         setweight(to_tsvector('english', COALESCE(p_description, '')), 'D');
+$$ LANGUAGE sql STABLE;
+
+-- Keep postcards.search_vector current when the postcard's own text changes
+CREATE OR REPLACE FUNCTION update_postcard_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+   NEW.search_vector = postcard_search_document(NEW.id, NEW.title, NEW.description, NEW.manufacturer);
+   RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_postcards_search_vector
+BEFORE INSERT OR UPDATE OF title, description, manufacturer ON postcards
+FOR EACH ROW
+EXECUTE FUNCTION update_postcard_search_vector();
+
+-- ...and when tags are linked, unlinked or renamed (statement-level, one UPDATE per batch)
+CREATE OR REPLACE FUNCTION refresh_tagged_postcard_search_vectors()
+RETURNS TRIGGER AS $$
+BEGIN
+   UPDATE postcards p
+   SET search_vector = postcard_search_document(p.id, p.title, p.description, p.manufacturer)
+   WHERE p.id IN (SELECT postcard_id FROM changed_links);
+   RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_search_on_tag_link
+AFTER INSERT ON postcard_tags
+REFERENCING NEW TABLE AS changed_links
+FOR EACH STATEMENT
+EXECUTE FUNCTION refresh_tagged_postcard_search_vectors();
+
+CREATE TRIGGER refresh_search_on_tag_unlink
+AFTER DELETE ON postcard_tags
+REFERENCING OLD TABLE AS changed_links
+FOR EACH STATEMENT
+EXECUTE FUNCTION refresh_tagged_postcard_search_vectors();
+
+CREATE OR REPLACE FUNCTION refresh_renamed_tag_search_vectors()
+RETURNS TRIGGER AS $$
+BEGIN
+   UPDATE postcards p
+   SET search_vector = postcard_search_document(p.id, p.title, p.description, p.manufacturer)
+   WHERE p.id IN (SELECT pt.postcard_id FROM postcard_tags pt JOIN renamed_tags r ON r.id = pt.tag_id);
+   RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_search_on_tag_rename
+AFTER UPDATE ON tags
+REFERENCING NEW TABLE AS renamed_tags
+FOR EACH STATEMENT
+EXECUTE FUNCTION refresh_renamed_tag_search_vectors();
+
+-- Single-row counter bumped by every write to tags, so application processes can
+-- cheaply check whether their in-memory tag dictionary is out of date
+CREATE TABLE tags_version (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO tags_version DEFAULT VALUES;
+
+CREATE OR REPLACE FUNCTION bump_tags_version()
+RETURNS TRIGGER AS $$
+BEGIN
+   UPDATE tags_version SET version = version + 1;
+   RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bump_tags_version_on_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tags
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_tags_version();
+
+-- Ranked full-text search over approved postcards. Filters use the same keys as the
+-- browse page (era, type, manufacturer, is_posted, is_written). Pages are keyset on
+-- (rank, id); pass the last row's rank and id to get the next page. Headline matches
+-- are wrapped in U+27E6/U+27E7 so the app can escape the text before adding <mark>.
+CREATE OR REPLACE FUNCTION search_postcards(
+  search_query TEXT,
+  filters JSONB DEFAULT '{}'::jsonb,
+  after_rank REAL DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+  id UUID,
+  title VARCHAR,
+  era postcard_era,
+  type postcard_type,
+  is_posted BOOLEAN,
+  is_written BOOLEAN,
+  front_image_url TEXT,
+  created_at TIMESTAMP WITH TIME ZONE,
+  rank REAL,
+  headline TEXT
+) AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english', search_query) AS query
+  ),
+  page AS (
+    SELECT m.* FROM (
+      SELECT p.id, p.title, p.era, p.type, p.is_posted, p.is_written, p.front_image_url,
+             p.created_at, p.description, ts_rank_cd(p.search_vector, q.query) AS rank
+      FROM postcards p, q
+      WHERE p.search_vector @@ q.query
+        AND p.status = 'approved'
+        AND (filters->>'era' IS NULL OR p.era::text = filters->>'era')
+        AND (filters->>'type' IS NULL OR p.type::text = filters->>'type')
+        AND (filters->>'manufacturer' IS NULL OR p.manufacturer = filters->>'manufacturer')
+        AND (filters->>'is_posted' IS NULL OR p.is_posted = (filters->>'is_posted')::boolean)
+        AND (filters->>'is_written' IS NULL OR p.is_written = (filters->>'is_written')::boolean)
+    ) m
+    WHERE after_rank IS NULL OR (m.rank, m.id) < (after_rank, after_id)
+    ORDER BY m.rank DESC, m.id DESC
+    LIMIT page_size
+  )
+  SELECT page.id, page.title, page.era, page.type, page.is_posted, page.is_written,
+         page.front_image_url, page.created_at, page.rank,
+         ts_headline('english', page.title || ' ' || COALESCE(page.description, ''), q.query,
+                     'StartSel=⟦, StopSel=⟧, MaxFragments=2, MaxWords=25, MinWords=8')
+  FROM page, q
+  ORDER BY page.rank DESC, page.id DESC;
+$$ LANGUAGE sql STABLE;
+
+-- Facet counts for the browse page in a single scan. Each facet is counted under
+-- every active filter except its own, so the era dropdown shows what picking a
+-- different era would return rather than only the era already selected.
+CREATE OR REPLACE FUNCTION get_postcard_facets(
+  filters JSONB DEFAULT '{}'::jsonb,
+  manufacturer_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (facets JSONB) AS $$
+  WITH matched AS (
+    SELECT p.era::text AS era, p.type::text AS type, p.manufacturer, p.is_posted, p.is_written,
+           (filters->>'era' IS NULL OR p.era::text = filters->>'era') AS m_era,
+           (filters->>'type' IS NULL OR p.type::text = filters->>'type') AS m_type,
+           (filters->>'manufacturer' IS NULL OR p.manufacturer = filters->>'manufacturer') AS m_manufacturer,
+           (filters->>'is_posted' IS NULL OR p.is_posted = (filters->>'is_posted')::boolean) AS m_posted,
+           (filters->>'is_written' IS NULL OR p.is_written = (filters->>'is_written')::boolean) AS m_written
+    FROM postcards p
+    WHERE p.status = 'approved'
+  ),
+  counts AS (
+    SELECT GROUPING(era, type, manufacturer, is_posted, is_written) AS grouping_id,
+           era, type, manufacturer, is_posted, is_written,
+           count(*) FILTER (WHERE m_type AND m_manufacturer AND m_posted AND m_written) AS era_n,
+           count(*) FILTER (WHERE m_era AND m_manufacturer AND m_posted AND m_written) AS type_n,
+           count(*) FILTER (WHERE m_era AND m_type AND m_posted AND m_written) AS manufacturer_n,
+           count(*) FILTER (WHERE m_era AND m_type AND m_manufacturer AND m_written) AS posted_n,
+           count(*) FILTER (WHERE m_era AND m_type AND m_manufacturer AND m_posted) AS written_n,
+           count(*) FILTER (WHERE m_era AND m_type AND m_manufacturer AND m_posted AND m_written) AS total_n
+    FROM matched
+    GROUP BY GROUPING SETS ((era), (type), (manufacturer), (is_posted), (is_written), ())
+  )
+  -- GROUPING() bits: era 16, type 8, manufacturer 4, is_posted 2, is_written 1
+  SELECT jsonb_build_object(
+    'total', (SELECT total_n FROM counts WHERE grouping_id = 31),
+    'era', (
+      SELECT COALESCE(jsonb_object_agg(era, era_n), '{}'::jsonb)
+      FROM counts WHERE grouping_id = 15 AND era IS NOT NULL
+    ),
+    'type', (
+      SELECT COALESCE(jsonb_object_agg(type, type_n), '{}'::jsonb)
+      FROM counts WHERE grouping_id = 23 AND type IS NOT NULL
+    ),
+    'manufacturer', (
+      SELECT COALESCE(jsonb_agg(jsonb_build_array(manufacturer, manufacturer_n)
+                                ORDER BY manufacturer_n DESC, manufacturer), '[]'::jsonb)
+      FROM (
+        SELECT manufacturer, manufacturer_n FROM counts
+        WHERE grouping_id = 27 AND manufacturer <> '' AND manufacturer_n > 0
+        ORDER BY manufacturer_n DESC, manufacturer
+        LIMIT manufacturer_limit
+      ) m
+    ),
+    'is_posted', (SELECT COALESCE(sum(posted_n), 0) FROM counts WHERE grouping_id = 29 AND is_posted),
+    'is_written', (SELECT COALESCE(sum(written_n), 0) FROM counts WHERE grouping_id = 30 AND is_written)
+  );
+$$ LANGUAGE sql STABLE;
+
+-- Bulk moderation: give many staged postcards one status in a single UPDATE.
+-- notes[i] is written to postcard_ids[i]; cards without a note of their own get
+-- shared_notes, or keep their existing notes when both are NULL.
+CREATE OR REPLACE FUNCTION review_postcards(
+  postcard_ids UUID[],
+  new_status postcard_status,
+  notes TEXT[] DEFAULT NULL,
+  shared_notes TEXT DEFAULT NULL
+)
+RETURNS TABLE (id UUID) AS $$
+  UPDATE postcards p
+  SET status = new_status,
+      review_notes = COALESCE(n.note, shared_notes, p.review_notes)
+  FROM unnest(postcard_ids, COALESCE(notes, '{}'::text[])) AS n(postcard_id, note)
+  WHERE p.id = n.postcard_id
+    AND p.status = 'staged'
+    AND new_status IN ('approved', 'rejected')
+  RETURNING p.id;
+$$ LANGUAGE sql VOLATILE;
+
+-- Bulk moderation of every staged postcard matching the browse-page filters
+CREATE OR REPLACE FUNCTION review_staged_postcards(
+  new_status postcard_status,
+  filters JSONB DEFAULT '{}'::jsonb,
+  shared_notes TEXT DEFAULT NULL
+)
+RETURNS TABLE (id UUID) AS $$
+  UPDATE postcards p
+  SET status = new_status,
+      review_notes = COALESCE(shared_notes, p.review_notes)
+  WHERE p.status = 'staged'
+    AND new_status IN ('approved', 'rejected')
+    AND (filters->>'era' IS NULL OR p.era::text = filters->>'era')
+    AND (filters->>'type' IS NULL OR p.type::text = filters->>'type')
+    AND (filters->>'manufacturer' IS NULL OR p.manufacturer = filters->>'manufacturer')
+    AND (filters->>'is_posted' IS NULL OR p.is_posted = (filters->>'is_posted')::boolean)
+    AND (filters->>'is_written' IS NULL OR p.is_written = (filters->>'is_written')::boolean)
+  RETURNING p.id;
+$$ LANGUAGE sql VOLATILE;
+
+-- Aggregate catalog statistics for the admin dashboard, computed in the database
+-- so no rows are transferred just to be counted. Runs with the caller's rights and
+-- only the service role (the admin path) may call it: the counts cover every user.
+CREATE OR REPLACE FUNCTION get_catalog_stats(upload_days INTEGER DEFAULT 30)
+RETURNS TABLE (stats JSONB) AS $$
+  SELECT jsonb_build_object(
+    'postcards_by_status', (
+      SELECT COALESCE(jsonb_object_agg(status, n), '{}'::jsonb)
+      FROM (SELECT status::text AS status, count(*) AS n FROM postcards GROUP BY 1) s
+    ),
+    'postcards_by_era', (
+      SELECT COALESCE(jsonb_object_agg(era, n), '{}'::jsonb)
+      FROM (SELECT COALESCE(era::text, 'Unknown') AS era, count(*) AS n FROM postcards GROUP BY 1) e
+    ),
+    'postcards_by_type', (
+      SELECT COALESCE(jsonb_object_agg(type, n), '{}'::jsonb)
+      FROM (SELECT COALESCE(type::text, 'Unknown') AS type, count(*) AS n FROM postcards GROUP BY 1) t
+    ),
+    'users_by_role', (
+      SELECT COALESCE(jsonb_object_agg(role, n), '{}'::jsonb)
+      FROM (SELECT role::text AS role, count(*) AS n FROM users GROUP BY 1) r
+    ),
+    'total_tags', (SELECT count(*) FROM tags),
+    'uploads_per_day', (
+      SELECT COALESCE(jsonb_agg(jsonb_build_object('day', day, 'count', n) ORDER BY day), '[]'::jsonb)
+      FROM (
+        SELECT created_at::date AS day, count(*) AS n
+        FROM postcards
+        WHERE created_at >= CURRENT_DATE - upload_days
+        GROUP BY 1
+      ) d
+    )
+  );
+$$ LANGUAGE sql STABLE;
+
+REVOKE EXECUTE ON FUNCTION get_catalog_stats(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_catalog_stats(INTEGER) TO service_role;
+
+-- Resolve a batch of tag names to tag rows in one call, creating any that are
+-- missing. Matching is case-insensitive, so 'Beach' reuses an existing 'beach'.
+CREATE OR REPLACE FUNCTION upsert_tags(tag_names TEXT[])
+RETURNS SETOF tags AS $$
+  INSERT INTO tags (name)
+  SELECT DISTINCT ON (lower(n)) n
+  FROM unnest(tag_names) AS n
+  WHERE NOT EXISTS (SELECT 1 FROM tags t WHERE lower(t.name) = lower(n))
+  ON CONFLICT (name) DO NOTHING;
+
+  SELECT * FROM tags
+  WHERE lower(name) IN (SELECT lower(n) FROM unnest(tag_names) AS n);
+$$ LANGUAGE sql VOLATILE;
+
+-- Content-addressed image uploads: objects stored as <sha256>/original.<ext> (plus their
+-- resized copies) and how many postcard image slots point at each, so identical scans
+-- are stored once and only removed from storage when the last reference goes
+CREATE TABLE image_objects (
+  sha256 CHAR(64) PRIMARY KEY,
+  file_ext VARCHAR(10) NOT NULL,
+  byte_size BIGINT,
+  ref_count INTEGER NOT NULL DEFAULT 0 CHECK (ref_count >= 0),
+  stored BOOLEAN NOT NULL DEFAULT FALSE,  -- every object written; until then each acquirer uploads
+  formats TEXT[] NOT NULL DEFAULT '{}',   -- derivative formats stored (see utils/image_variants.py)
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Storage objects waiting to be removed, written when an image's last reference goes (or
+-- an image stored before content addressing is replaced) and removed in batches by the
+-- image worker. available_at hides a row while it is being removed and until its retry.
+CREATE TABLE image_deletions (
+  id BIGSERIAL PRIMARY KEY,
+  sha256 CHAR(64),  -- NULL for UUID-keyed uploads
+  object_keys TEXT[] NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  queued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_image_deletions_available ON image_deletions(available_at, id);
+CREATE INDEX idx_image_deletions_sha256 ON image_deletions(sha256);
+
+-- Take a reference to an image. Unless stored is true the caller uploads it (another
+-- upload of the same bytes may still be in progress, or may fail) and then calls
+-- mark_image_stored; file_ext is the extension it was first stored under and formats the
+-- derivative formats stored with it. Also cancels a pending
+-- deletion of the image that no sweeper has claimed, so a scan uploaded again soon
+-- after its last postcard let go keeps its objects.
+CREATE OR REPLACE FUNCTION acquire_image(p_sha256 TEXT, p_file_ext TEXT, p_byte_size BIGINT)
+RETURNS TABLE (ref_count INTEGER, file_ext TEXT, stored BOOLEAN, formats TEXT[]) AS $$
+  WITH cancelled AS (
+    DELETE FROM image_deletions WHERE sha256 = p_sha256 AND available_at <= NOW()
+  )
+  INSERT INTO image_objects AS o (sha256, file_ext, byte_size, ref_count)
+  VALUES (p_sha256, p_file_ext, p_byte_size, 1)
+  ON CONFLICT (sha256) DO UPDATE SET ref_count = o.ref_count + 1
+  RETURNING o.ref_count, o.file_ext::TEXT, o.stored, o.formats;
+$$ LANGUAGE sql VOLATILE;
+
+-- Record that an image's objects have all been written, its derivatives in p_formats. False while a sweeper that
+-- claimed a deletion of the image may still remove them: the caller uploads again
+-- once that deletion is gone.
+CREATE OR REPLACE FUNCTION mark_image_stored(p_sha256 TEXT, p_formats TEXT[])
+RETURNS BOOLEAN AS $$
+BEGIN
+  DELETE FROM image_deletions WHERE sha256 = p_sha256 AND available_at <= NOW();
+  IF EXISTS (SELECT 1 FROM image_deletions WHERE sha256 = p_sha256) THEN
+    RETURN FALSE;
+  END IF;
+
+  UPDATE image_objects SET stored = TRUE, formats = p_formats WHERE sha256 = p_sha256;
+  RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
+
+-- Drop a reference; returns the references left. At 0 the image's objects
+-- (p_object_keys) are queued in image_deletions in the same transaction.
+CREATE OR REPLACE FUNCTION release_image(p_sha256 TEXT, p_object_keys TEXT[])
+RETURNS INTEGER AS $$
+DECLARE
+  remaining INTEGER;
+BEGIN
+  UPDATE image_objects SET ref_count = ref_count - 1
+  WHERE sha256 = p_sha256
+  RETURNING ref_count INTO remaining;
+
+  IF remaining = 0 THEN
+    DELETE FROM image_objects WHERE sha256 = p_sha256;
+    INSERT INTO image_deletions (sha256, object_keys) VALUES (p_sha256, p_object_keys);
+  END IF;
+  RETURN COALESCE(remaining, 0);
+END;
+$$ LANGUAGE plpgsql VOLATILE;
+
+-- Claim up to p_limit deletions queued at least p_min_age seconds ago, hiding them for
+-- p_lease seconds; rows are deleted once their objects are gone, or retried after the lease
+CREATE OR REPLACE FUNCTION claim_image_deletions(p_limit INTEGER, p_min_age INTEGER, p_lease INTEGER)
+RETURNS TABLE (id BIGINT, sha256 TEXT, object_keys TEXT[], attempts INTEGER) AS $$
+  UPDATE image_deletions d
+  SET available_at = NOW() + make_interval(secs => p_lease), attempts = d.attempts + 1
+  WHERE d.id IN (
+    SELECT q.id FROM image_deletions q
+    WHERE q.available_at <= NOW() AND q.queued_at <= NOW() - make_interval(secs => p_min_age)
+    ORDER BY q.available_at, q.id
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING d.id, d.sha256::TEXT, d.object_keys, d.attempts;
+$$ LANGUAGE sql VOLATILE;
+
 -- Enable Row Level Security
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE postcards ENABLE ROW LEVEL SECURITY;
 ALTER TABLE tags ENABLE ROW LEVEL SECURITY;
 ALTER TABLE postcard_tags ENABLE ROW LEVEL SECURITY;
+ALTER TABLE tags_version ENABLE ROW LEVEL SECURITY;
+ALTER TABLE image_objects ENABLE ROW LEVEL SECURITY;  -- service role only
+ALTER TABLE image_deletions ENABLE ROW LEVEL SECURITY;  -- service role only
 
 -- User table policies
 -- Allow users to view and update their own data
@@ -196,6 +605,9 @@ CREATE POLICY "Admins can manage all postcards" ON postcards
 CREATE POLICY "Users can view tags" ON tags
     FOR SELECT USING (auth.role() = 'authenticated');
 
+CREATE POLICY "Users can view the tags version" ON tags_version
+    FOR SELECT USING (auth.role() = 'authenticated');
+
 -- Postcard tag policies
 CREATE POLICY "Users can view postcard tags" ON postcard_tags
     FOR SELECT USING (
@@ -0,0 +1,144 @@
+# tests/test_cache.py
+# The per-worker postcard cache (utils/cache.py): TTL/LRU behaviour, the
+# generation guard against re-caching stale reads, and invalidation by every
+# write made through the wrapped Supabase PostcardDB/TagDB.
+import uuid
+import pytest
+from utils import cache
+from utils.cache import TTLCache, with_postcard_cache
+
+
+def test_get_set_and_expiry(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: clock[0])
+    ttl_cache = TTLCache(maxsize=4, ttl=30)
+
+    assert ttl_cache.get('a') == (False, None)
+    ttl_cache.set('a', 1)
+    assert ttl_cache.get('a') == (True, 1)
+
+    clock[0] += 30
+    assert ttl_cache.get('a') == (False, None)
+    assert ttl_cache.stats()['expirations'] == 1 and ttl_cache.stats()['size'] == 0
+
+
+def test_lru_eviction():
+    ttl_cache = TTLCache(maxsize=2, ttl=30)
+    ttl_cache.set('a', 1)
+    ttl_cache.set('b', 2)
+    ttl_cache.get('a')  # 'b' is now the least recently used
+    ttl_cache.set('c', 3)
+
+    assert ttl_cache.get('b') == (False, None)
+    assert ttl_cache.get('a') == (True, 1) and ttl_cache.get('c') == (True, 3)
+    assert ttl_cache.stats()['evictions'] == 1
+
+
+def test_stale_load_is_not_stored():
+    ttl_cache = TTLCache(maxsize=4, ttl=30)
+    generation = ttl_cache.generation
+    ttl_cache.delete('a')  # a write lands while the read is in flight
+    ttl_cache.set('a', 'old row', generation)
+    assert ttl_cache.get('a') == (False, None)
+
+
+def test_get_or_load_hands_out_copies():
+    ttl_cache = TTLCache(maxsize=4, ttl=30)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {'title': 'Harbour'}
+
+    ttl_cache.get_or_load('a', loader)['title'] = 'changed'
+    assert ttl_cache.get_or_load('a', loader) == {'title': 'Harbour'}
+    assert len(loads) == 1
+
+    # Missing rows are looked up again next time
+    assert ttl_cache.get_or_load('b', lambda: None) is None
+    assert ttl_cache.get('b') == (False, None)
+
+
+def test_disabled_cache_always_loads():
+    ttl_cache = TTLCache(maxsize=0, ttl=30)
+    assert not ttl_cache.enabled
+    assert ttl_cache.get_or_load('a', lambda: 1) == 1
+    assert ttl_cache.stats()['size'] == 0
+
+
+@pytest.fixture
+def dbs(fake):
+    from utils import db
+    return with_postcard_cache(db.PostcardDB, db.TagDB)
+
+
+def _postcard(fake, status='draft'):
+    row = {'id': str(uuid.uuid4()), 'title': 'Harbour', 'status': status}
+    fake._write('postcards', row)
+    return row['id']
+
+
+def test_reads_are_cached(fake, dbs):
+    postcard_db, _ = dbs
+    postcard_id = _postcard(fake)
+
+    assert postcard_db.get_postcard(postcard_id)['title'] == 'Harbour'
+    assert postcard_db.get_postcard_with_tags(postcard_id)['tags'] == []
+    requests = fake.requests
+    postcard_db.get_postcard(postcard_id)
+    postcard_db.get_postcard_with_tags(postcard_id)
+    assert fake.requests == requests
+
+
+def test_uncached_read_goes_to_the_database(fake, dbs):
+    postcard_db, _ = dbs
+    postcard_id = _postcard(fake)
+    postcard_db.get_postcard(postcard_id)
+
+    # Changed behind the cache, e.g. by another worker
+    fake._rows('postcards')[0]['title'] = 'Lighthouse'
+    assert postcard_db.get_postcard(postcard_id)['title'] == 'Harbour'
+    assert postcard_db.get_postcard(postcard_id, cached=False)['title'] == 'Lighthouse'
+    assert postcard_db.get_postcard_with_tags(postcard_id, cached=False)['title'] == 'Lighthouse'
+
+
+@pytest.mark.parametrize('write', [
+    lambda postcard_db, postcard_id: postcard_db.update_postcard(postcard_id, {'title': 'Lighthouse'}),
+    lambda postcard_db, postcard_id: postcard_db.stage_postcard(postcard_id),
+    lambda postcard_db, postcard_id: postcard_db.review_postcard(postcard_id, 'approved'),
+    lambda postcard_db, postcard_id: postcard_db.delete_postcard(postcard_id),
+])
+def test_postcard_writes_invalidate(fake, dbs, write):
+    postcard_db, _ = dbs
+    postcard_id = _postcard(fake)
+    before = postcard_db.get_postcard(postcard_id)
+    postcard_db.get_postcard_with_tags(postcard_id)
+
+    write(postcard_db, postcard_id)
+
+    assert postcard_db.get_postcard(postcard_id) != before
+    assert postcard_db.get_postcard_with_tags(postcard_id) == postcard_db.get_postcard_with_tags(postcard_id, cached=False)
+
+
+def test_tag_links_invalidate(fake, dbs):
+    postcard_db, tag_db = dbs
+    postcard_id = _postcard(fake)
+    tag = fake._write('tags', {'name': 'Harbour'})[0]
+    assert postcard_db.get_postcard_with_tags(postcard_id)['tags'] == []
+
+    tag_db.link_tags_to_postcard(postcard_id, [tag['id']])
+    assert [t['name'] for t in postcard_db.get_postcard_with_tags(postcard_id)['tags']] == ['Harbour']
+
+    tag_db.unlink_tags_from_postcard(postcard_id, [tag['id']])
+    assert postcard_db.get_postcard_with_tags(postcard_id)['tags'] == []
+
+
+def test_stage_only_moves_drafts(fake, dbs):
+    postcard_db, _ = dbs
+    draft_id = _postcard(fake)
+    approved_id = _postcard(fake, status='approved')
+
+    assert postcard_db.stage_postcard(draft_id)['status'] == 'staged'
+    assert postcard_db.stage_postcard(draft_id) is None
+    assert postcard_db.stage_postcard(approved_id) is None
+    assert postcard_db.get_postcard(approved_id)['status'] == 'approved'
@@ -0,0 +1,80 @@
+# tests/test_image_refcount.py
+# Reference counting of content-addressed images (acquire_image / release_image
+# in database_scheme.sql, mirrored by the in-memory fake) and deduplicated uploads
+# through save_image.
+import io
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+SHA = 'ab' * 32
+KEYS = [f'{SHA}/original.jpg', f'{SHA}/thumb.webp']
+
+
+@pytest.fixture
+def image_db(fake):
+    from utils.db import ImageDB
+    return ImageDB
+
+
+def test_acquire_counts_references(image_db):
+    assert image_db.acquire_image(SHA, 'jpg', 1234) == (1, 'jpg', False, [])
+    assert image_db.mark_image_stored(SHA, ['webp', 'jpeg'])
+    # The first upload's extension wins
+    assert image_db.acquire_image(SHA, 'png', 1234) == (2, 'jpg', True, ['webp', 'jpeg'])
+
+
+def test_last_release_queues_deletion(fake, image_db):
+    image_db.acquire_image(SHA, 'jpg')
+    image_db.acquire_image(SHA, 'jpg')
+
+    assert image_db.release_image(SHA, KEYS) == 1
+    assert fake._rows('image_deletions') == []
+
+    assert image_db.release_image(SHA, KEYS) == 0
+    assert fake._rows('image_objects') == []
+    assert [row['object_keys'] for row in fake._rows('image_deletions')] == [KEYS]
+
+
+def test_reacquire_cancels_unclaimed_deletion(fake, image_db):
+    image_db.acquire_image(SHA, 'jpg')
+    image_db.mark_image_stored(SHA, [])
+    image_db.release_image(SHA, KEYS)
+
+    assert image_db.acquire_image(SHA, 'jpg') == (1, 'jpg', False, [])
+    assert fake._rows('image_deletions') == []
+    assert image_db.mark_image_stored(SHA, [])
+
+
+def test_claimed_deletion_blocks_mark_stored(fake, image_db):
+    image_db.acquire_image(SHA, 'jpg')
+    image_db.release_image(SHA, KEYS)
+    assert len(image_db.claim_deletions(10, 0, 60)) == 1
+
+    # A sweeper may still remove the objects, so the new upload is not recorded as stored
+    assert image_db.acquire_image(SHA, 'jpg')[0] == 1
+    assert len(fake._rows('image_deletions')) == 1
+    assert not image_db.mark_image_stored(SHA, [])
+
+
+def _scan(name):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 24), (200, 120, 40)).save(buffer, 'PNG')
+    buffer.seek(0)
+    return FileStorage(buffer, filename=name, content_type='image/png')
+
+
+def test_same_bytes_are_stored_once(fake):
+    from utils.image_handler import save_image, delete_image
+
+    first = save_image(_scan('front.png'))
+    second = save_image(_scan('copy.png'))
+    assert first is not None and first == second
+
+    objects = fake._rows('image_objects')
+    assert len(objects) == 1 and objects[0]['ref_count'] == 2 and objects[0]['stored']
+
+    assert delete_image(first)
+    assert objects[0]['ref_count'] == 1 and fake._rows('image_deletions') == []
+    assert delete_image(second)
+    assert fake._rows('image_objects') == [] and len(fake._rows('image_deletions')) == 1
@@ -0,0 +1,22 @@
+# tests/test_import_budget.py
+# Worker start-up (see `flask import-budget`): importing the app must stay fast and
+# must not reach Supabase, whose placeholder URL in conftest.py is unreachable.
+import sys
+from utils.benchmark import time_cold_import
+
+IMPORT_BUDGET_MS = 1500
+
+# Loaded on first use, never by `import app`
+DEFERRED_MODULES = ('PIL.Image', 'utils.image_gc', 'utils.importer', 'utils.exporter')
+
+
+def test_cold_import_within_budget():
+    elapsed_ms, slowest = time_cold_import('app', runs=3)
+    top = ', '.join(f'{module} {ms:.0f}ms' for module, ms in slowest[:5])
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"import app took {elapsed_ms:.0f}ms ({top})"
+
+
+def test_cold_import_defers_heavy_modules():
+    _, modules = time_cold_import('app', runs=1)
+    imported = {module for module, _ in modules}
+    assert not imported.intersection(DEFERRED_MODULES)
@@ -0,0 +1,121 @@
+# tests/test_pagination.py
+# Keyset cursors (utils/pagination.py) and paging through the Supabase backend,
+# including rows that share a created_at and are ordered by id alone.
+import uuid
+from datetime import datetime, timezone
+import pytest
+from utils.pagination import (
+    encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor, keyset_sql, build_page
+)
+
+ROW_ID = '0b6a3c52-5f0e-4a57-9a8e-0c2b7d9e1f43'
+
+
+def test_cursor_round_trip():
+    row = {'created_at': '2024-05-01T12:00:00+00:00', 'id': ROW_ID}
+    token = encode_cursor(row)
+    assert '=' not in token
+    assert decode_cursor(token) == ('2024-05-01T12:00:00+00:00', ROW_ID)
+
+
+def test_cursor_accepts_datetimes():
+    created_at = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor({'created_at': created_at, 'id': uuid.UUID(ROW_ID)})) == \
+        (created_at.isoformat(), ROW_ID)
+
+
+@pytest.mark.parametrize('token', [
+    None, '', 'not base64!', 'e30',  # '{}'
+    encode_cursor({'created_at': 'yesterday', 'id': ROW_ID}),
+    encode_cursor({'created_at': '2024-05-01T12:00:00+00:00', 'id': "1); DROP TABLE postcards; --"}),
+])
+def test_malformed_cursor_is_ignored(token):
+    assert decode_cursor(token) is None
+
+
+def test_rank_cursor_round_trip():
+    assert decode_rank_cursor(encode_rank_cursor({'rank': 0.25, 'id': ROW_ID})) == (0.25, ROW_ID)
+    assert decode_rank_cursor(encode_cursor({'created_at': 'x', 'id': 'y'})) is None
+
+
+def test_keyset_sql():
+    token = encode_cursor({'created_at': '2024-05-01T12:00:00+00:00', 'id': ROW_ID})
+    assert keyset_sql() == (None, [], 'created_at DESC, id DESC')
+    assert keyset_sql(after=token) == (
+        '(created_at, id) < (%s::timestamptz, %s::uuid)', ['2024-05-01T12:00:00+00:00', ROW_ID],
+        'created_at DESC, id DESC'
+    )
+    condition, _, order_by = keyset_sql(before=token)
+    assert condition.startswith('(created_at, id) >') and order_by == 'created_at ASC, id ASC'
+    # 'after' wins when both are given
+    assert keyset_sql(after=token, before=token)[2] == 'created_at DESC, id DESC'
+
+
+def _rows(count):
+    return [{'created_at': f'2024-05-01T12:00:{59 - i:02d}+00:00', 'id': str(uuid.UUID(int=count - i))}
+            for i in range(count)]
+
+
+def test_build_page_forward():
+    rows = _rows(4)
+    first = build_page(rows, per_page=3)
+    assert len(first) == 3 and first.prev_cursor is None
+    assert decode_cursor(first.next_cursor) == (rows[2]['created_at'], rows[2]['id'])
+
+    last = build_page(rows[3:], per_page=3, after=first.next_cursor)
+    assert last.next_cursor is None and last.prev_cursor is not None
+
+
+def test_build_page_backwards():
+    rows = _rows(4)
+    token = encode_cursor(rows[-1])
+    # Fetched for 'before', already put back newest-first: the surplus row is the newest
+    page = build_page(rows, per_page=3, before=token)
+    assert page.items == rows[1:]
+    assert page.prev_cursor is not None and page.next_cursor is not None
+
+
+def _seed_postcards(fake, count, ties):
+    """count approved postcards; the newest `ties` share one created_at"""
+    rows = []
+    for i in range(count):
+        second = 0 if i < ties else i
+        rows.append({'id': str(uuid.uuid4()), 'title': f'Postcard {i}', 'status': 'approved',
+                     'created_at': f'2024-05-01T12:{59 - second // 60:02d}:{59 - second % 60:02d}+00:00'})
+    fake._write('postcards', rows)
+    return sorted(rows, key=lambda row: (row['created_at'], row['id']), reverse=True)
+
+
+def _walk(postcard_db, per_page, direction='after', start=None, max_pages=20):
+    pages = []
+    cursor = start
+    for _ in range(max_pages):
+        rows = postcard_db.get_all_postcards(limit=per_page + 1, fields='card', **{direction: cursor})
+        page = build_page(rows, per_page, **{direction: cursor})
+        pages.append([row['id'] for row in page])
+        cursor = page.next_cursor if direction == 'after' else page.prev_cursor
+        if cursor is None:
+            return pages
+    raise AssertionError(f'paging did not end after {max_pages} pages: {pages}')
+
+
+def test_pages_cover_tied_rows_once(fake):
+    from utils.db import PostcardDB
+
+    expected = [row['id'] for row in _seed_postcards(fake, 23, ties=8)]
+    pages = _walk(PostcardDB, per_page=5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [postcard_id for page in pages for postcard_id in page] == expected
+
+
+def test_pages_back_from_the_end(fake):
+    from utils.db import PostcardDB
+
+    rows = _seed_postcards(fake, 12, ties=6)
+    forward = _walk(PostcardDB, per_page=5)
+
+    # 'before' the first row of the last page leads back through the same pages
+    last_first = next(row for row in rows if row['id'] == forward[-1][0])
+    backward = _walk(PostcardDB, per_page=5, direction='before', start=encode_cursor(last_first))
+    assert backward == forward[-2::-1]
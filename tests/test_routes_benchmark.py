@@ -0,0 +1,43 @@
+# tests/test_routes_benchmark.py
+# The main routes against the in-memory Supabase (see `flask benchmark-routes`).
+# Latency budgets are loose enough for a shared CI runner; the Supabase calls per
+# request are exact, so an added query (an N+1 in a template, say) fails here.
+import pytest
+from utils.benchmark import benchmark_routes
+
+ITERATIONS = 20
+LATENCY_MS = 2.0
+
+EXPECTED = {
+    # route: (status, most Supabase calls per request)
+    'index': (200, 4),
+    'list': (200, 4),
+    'list filter': (200, 4),
+    'detail': (200, 2),
+    'add': (302, 22),  # two scans stored inline: original, derivatives, references
+    'add queued': (302, 4),
+    'review': (302, 2),
+    'bulk review': (302, 2),
+}
+
+
+@pytest.fixture(scope='module')
+def results(app_module):
+    return benchmark_routes(app_module.app, app_module, iterations=ITERATIONS, latency_ms=LATENCY_MS, postcards=200)
+
+
+@pytest.mark.parametrize('route', sorted(EXPECTED))
+def test_route_status(results, route):
+    assert results[route]['status'] == EXPECTED[route][0]
+
+
+@pytest.mark.parametrize('route', sorted(EXPECTED))
+def test_route_supabase_calls(results, route):
+    assert results[route]['calls'] <= EXPECTED[route][1]
+
+
+@pytest.mark.parametrize('route', sorted(EXPECTED))
+def test_route_p99(results, route):
+    # Each call waits LATENCY_MS; allow that plus 250ms of rendering on a slow runner
+    budget_ms = EXPECTED[route][1] * LATENCY_MS + 250
+    assert results[route]['p99_ms'] < budget_ms, f"{route} p99 {results[route]['p99_ms']:.1f}ms"
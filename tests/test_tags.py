@@ -0,0 +1,111 @@
+# tests/test_tags.py
+# Tag name normalization (utils/tags.py) and the process-local tag dictionary
+# (utils/tag_dictionary.py) reloading when tags_version moves.
+import uuid
+import pytest
+from utils.tags import normalize_tag_names, diff_tag_ids, MAX_TAG_LENGTH
+from utils.tag_dictionary import TagDictionary, with_tag_dictionary
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('harbour, Lighthouse ,,  ', ['harbour', 'Lighthouse']),
+    ('  sea   side\t view ', ['sea side view']),
+    ('Paris, paris, PARIS, Lyon', ['Paris', 'Lyon']),
+    (['Alps', ' alps ', 42], ['Alps', '42']),
+    (None, []),
+    ('', []),
+])
+def test_normalize_tag_names(raw, expected):
+    assert normalize_tag_names(raw) == expected
+
+
+def test_normalize_truncates_to_column_width():
+    long_name = 'x' * (MAX_TAG_LENGTH - 1) + ' y' + 'z' * 10
+    assert normalize_tag_names([long_name]) == ['x' * (MAX_TAG_LENGTH - 1)]
+    # Names that only differ past the limit are the same tag
+    assert normalize_tag_names(['a' * 60, 'A' * 55]) == ['a' * MAX_TAG_LENGTH]
+
+
+def test_diff_tag_ids():
+    current = [{'id': 1}, {'id': 2}]
+    desired = [{'id': 2}, {'id': 3}]
+    assert diff_tag_ids(current, desired) == ([3], [1])
+    assert diff_tag_ids(None, desired) == ([2, 3], [])
+    assert diff_tag_ids(current, []) == ([], [1, 2])
+
+
+@pytest.fixture
+def tag_db(fake):
+    from utils import db
+    fake._write('tags', [{'name': 'Harbour'}, {'name': 'Lighthouse'}])
+    return db.TagDB
+
+
+def test_dictionary_lookups(tag_db):
+    dictionary = TagDictionary(tag_db, check_interval=0)
+    harbour = dictionary.get('  HARBOUR ')
+    assert harbour['name'] == 'Harbour'
+    assert dictionary.get_by_id(harbour['id']) == harbour
+    assert [tag['name'] for tag in dictionary.all()] == ['Harbour', 'Lighthouse']
+
+    known, missing = dictionary.resolve('lighthouse, Pier, pier')
+    assert [tag['name'] for tag in known] == ['Lighthouse'] and missing == ['Pier']
+
+
+def test_dictionary_reloads_when_version_moves(fake, tag_db):
+    dictionary = TagDictionary(tag_db, check_interval=0)
+    assert dictionary.get('Pier') is None
+
+    requests = fake.requests
+    dictionary.refresh()
+    assert fake.requests == requests + 1  # only the version is read
+
+    fake._write('tags', {'name': 'Pier'})
+    assert dictionary.get('pier')['name'] == 'Pier'
+
+
+def test_dictionary_waits_for_check_interval(fake, tag_db):
+    dictionary = TagDictionary(tag_db, check_interval=3600)
+    dictionary.refresh()
+
+    fake._write('tags', {'name': 'Pier'})
+    requests = fake.requests
+    assert dictionary.get('Pier') is None
+    assert fake.requests == requests
+
+    dictionary.refresh(force=True)
+    assert dictionary.get('Pier')['name'] == 'Pier'
+
+
+def test_upsert_known_names_makes_no_request(fake, tag_db):
+    dictionary_tag_db = with_tag_dictionary(tag_db)
+    dictionary_tag_db.tag_dictionary.refresh(force=True)
+
+    requests = fake.requests
+    tags = dictionary_tag_db.upsert_tags(['harbour', 'Lighthouse'])
+    assert [tag['name'] for tag in tags] == ['Harbour', 'Lighthouse']
+    assert fake.requests == requests
+
+
+def test_upsert_creates_only_missing_names(fake, tag_db):
+    dictionary_tag_db = with_tag_dictionary(tag_db)
+    dictionary_tag_db.tag_dictionary.refresh(force=True)
+
+    tags = dictionary_tag_db.upsert_tags('Harbour, Pier')
+    assert [tag['name'] for tag in tags] == ['Harbour', 'Pier']
+    assert len(fake._rows('tags')) == 3
+    # Known to this process straight away, without a reload
+    assert dictionary_tag_db.tag_dictionary.get('pier') == tags[1]
+
+
+def test_set_postcard_tags(fake, tag_db):
+    dictionary_tag_db = with_tag_dictionary(tag_db)
+    postcard_id = str(uuid.uuid4())
+    fake._write('postcards', {'id': postcard_id, 'title': 'Harbour', 'status': 'draft'})
+
+    current = dictionary_tag_db.set_postcard_tags(postcard_id, 'Harbour, Lighthouse')
+    dictionary_tag_db.set_postcard_tags(postcard_id, 'lighthouse, Pier', current_tags=current)
+
+    linked = {link['tag_id'] for link in fake._rows('postcard_tags') if link['postcard_id'] == postcard_id}
+    assert sorted(dictionary_tag_db.tag_dictionary.get_by_id(tag_id)['name'] for tag_id in linked) == \
+        ['Lighthouse', 'Pier']
@@ -0,0 +1,31 @@
+# tests/test_upload_memory.py
+# Concurrent uploads through save_image against the in-memory Supabase (see
+# `flask benchmark-uploads`). Streaming keeps memory to a few chunks per upload, so
+# a change that reads a whole scan into memory again exceeds these limits.
+import pytest
+from utils.benchmark import measure_upload_memory
+
+SIZE_MB = 16
+CONCURRENCY = 4
+
+
+@pytest.fixture(scope='module')
+def result(app_module):
+    # One warm-up round, so imports and thread stacks are not counted as upload memory
+    measure_upload_memory(1, CONCURRENCY, 1)
+    return measure_upload_memory(SIZE_MB, CONCURRENCY, rounds=2)
+
+
+def test_uploads_succeed(result):
+    assert result['uploads'] == CONCURRENCY * 2
+    assert result['failed'] == 0
+
+
+def test_python_allocations_below_one_scan(result):
+    assert result['python_peak_mb'] < SIZE_MB / 2, f"peak {result['python_peak_mb']:.1f}MB"
+
+
+def test_rss_growth_below_buffered_uploads(result):
+    if result['rss_growth_mb'] is None:
+        pytest.skip('RSS is only sampled on Linux')
+    assert result['rss_growth_mb'] < result['buffered_mb'] / 2, f"RSS grew {result['rss_growth_mb']:.1f}MB"
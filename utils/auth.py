@@ -2,10 +2,10 @@
 from functools import wraps
 from flask import redirect, url_for, flash, session, request, current_app
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user
-from utils.user_db import UserDB
+from utils.backend import UserDB
 from utils.supabase_auth import SupabaseAuth, supabase
+from utils.supabase_clients import auth_api_error
 import traceback
-import gotrue
 
 # User class for Flask-Login
 class User(UserMixin):
@@ -79,7 +79,7 @@ def init_login_manager(app):
                                 existing_user = UserDB.create_user_from_auth(user_data)
                             
                             return User(existing_user)
-                    except gotrue.errors.AuthApiError as auth_error:
+                    except auth_api_error() as auth_error:
                         # If we get "User from sub claim in JWT does not exist", clear the session
                         if "User from sub claim in JWT does not exist" in str(auth_error):
                             current_app.logger.warning("Invalid session detected, clearing session")
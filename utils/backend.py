@@ -0,0 +1,24 @@
+# utils/backend.py
+# Selects the data-access backend named by Config.DB_BACKEND. Callers should import
+# the *DB classes from here rather than from a specific backend module.
+from config import Config
+
+if Config.DB_BACKEND == 'postgres':
+    # Direct psycopg2 connection pool with prepared statements
+    from utils.pg_db import PostcardDB, TagDB, StatsDB, UserDB, ImageDB
+elif Config.DB_BACKEND == 'supabase':
+    # Supabase PostgREST over HTTPS
+    from utils.db import PostcardDB, TagDB, StatsDB, ImageDB
+    from utils.user_db import UserDB
+else:
+    raise ValueError(f"Unknown DB_BACKEND: {Config.DB_BACKEND!r} (expected 'supabase' or 'postgres')")
+
+# Tag lookups come from an in-process dictionary refreshed when tags_version changes
+from utils.tag_dictionary import with_tag_dictionary
+TagDB = with_tag_dictionary(TagDB)
+
+# Single-postcard reads go through a per-worker cache invalidated on writes
+from utils.cache import with_postcard_cache
+PostcardDB, TagDB = with_postcard_cache(PostcardDB, TagDB)
+
+__all__ = ['PostcardDB', 'TagDB', 'StatsDB', 'UserDB', 'ImageDB']
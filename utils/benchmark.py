@@ -0,0 +1,448 @@
+# utils/benchmark.py
+import time
+import uuid
+from contextlib import contextmanager
+from utils.percentile import percentile
+
+BACKEND_NAMES = ['supabase', 'postgres']
+
+
+def load_backend(name):
+    """Import the data-access classes of a backend by name"""
+    if name == 'postgres':
+        from utils import pg_db
+        return {'PostcardDB': pg_db.PostcardDB, 'TagDB': pg_db.TagDB, 'StatsDB': pg_db.StatsDB, 'UserDB': pg_db.UserDB,
+                'ImageDB': pg_db.ImageDB}
+    if name == 'supabase':
+        from utils import db, user_db
+        return {'PostcardDB': db.PostcardDB, 'TagDB': db.TagDB, 'StatsDB': db.StatsDB, 'UserDB': user_db.UserDB,
+                'ImageDB': db.ImageDB}
+    raise ValueError(f"Unknown backend: {name!r}")
+
+
+@contextmanager
+def using_backend(module, classes):
+    """Temporarily rebind a module's data-access classes (routes look them up at call time)"""
+    saved = {attr: getattr(module, attr) for attr in classes if hasattr(module, attr)}
+    try:
+        for attr in saved:
+            setattr(module, attr, classes[attr])
+        yield
+    finally:
+        for attr, value in saved.items():
+            setattr(module, attr, value)
+
+
+def summarize(samples):
+    """Summarize latency samples (milliseconds)"""
+    return {
+        'n': len(samples),
+        'mean_ms': sum(samples) / len(samples) if samples else 0.0,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99),
+        'max_ms': max(samples) if samples else 0.0
+    }
+
+
+def time_request(client, path, iterations, warmup=2):
+    """Issue GET requests against a test client and return latency stats"""
+    status = None
+    for _ in range(warmup):
+        status = client.get(path).status_code
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        samples.append((time.perf_counter() - start) * 1000)
+
+    stats = summarize(samples)
+    stats['status'] = status
+    return stats
+
+
+def benchmark_pages(app, module, classes, iterations=50):
+    """Time the list and detail pages with the given backend classes bound into the app module"""
+    results = {}
+
+    with using_backend(module, classes):
+        client = app.test_client()
+        results['list'] = time_request(client, '/postcards', iterations)
+
+        sample = classes['PostcardDB'].get_all_postcards(limit=1, fields='card')
+        if sample:
+            results['detail'] = time_request(client, f"/postcards/{sample[0]['id']}", iterations)
+
+    return results
+
+
+def format_results(backend, results):
+    """Render benchmark results as aligned text lines"""
+    lines = []
+    for page, stats in results.items():
+        status = f" status={stats['status']}" if 'status' in stats else ''
+        extra = ''
+        if 'rps' in stats:
+            extra += f" rps={stats['rps']:8.1f}"
+        if 'calls' in stats:
+            extra += f" calls={stats['calls']:5.1f}"
+        lines.append(
+            f"{backend:<10} {page:<12} n={stats['n']:<5}{status} "
+            f"mean={stats['mean_ms']:8.2f}ms p50={stats['p50_ms']:8.2f}ms "
+            f"p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms max={stats['max_ms']:8.2f}ms{extra}"
+        )
+    return lines
+
+
+# Synthetic corpus for the search benchmark, tagged by manufacturer so it can be removed
+SEED_MANUFACTURER = 'benchmark-seed'
+
+SEED_WORDS = [
+    'canyon', 'river', 'harbor', 'lighthouse', 'mountain', 'valley', 'bridge', 'station',
+    'hotel', 'beach', 'boardwalk', 'cathedral', 'courthouse', 'main', 'street', 'park',
+    'lake', 'falls', 'mission', 'fort', 'capitol', 'pier', 'garden', 'college', 'mill',
+    'desert', 'forest', 'island', 'railroad', 'depot', 'greetings', 'souvenir', 'view',
+    'evening', 'winter', 'summer', 'panorama', 'aerial', 'birdseye', 'monument'
+]
+
+
+def _synthetic_postcards(count, rng):
+    from utils.enums import POSTCARD_ERAS, POSTCARD_TYPES
+
+    for _ in range(count):
+        title = ' '.join(rng.choice(SEED_WORDS) for _ in range(3)).title()
+        description = ' '.join(rng.choice(SEED_WORDS) for _ in range(rng.randint(10, 40)))
+        yield {
+            'id': str(uuid.uuid4()),
+            'title': title,
+            'description': description,
+            'manufacturer': SEED_MANUFACTURER,
+            'era': rng.choice(POSTCARD_ERAS),
+            'type': rng.choice(POSTCARD_TYPES),
+            'is_posted': rng.random() < 0.5,
+            'is_written': rng.random() < 0.5,
+            'status': 'approved'
+        }
+
+
+def seed_search_corpus(backend, count, batch_size=1000, seed=42):
+    """Insert `count` synthetic approved postcards in batches; returns rows/second"""
+    import random
+    rng = random.Random(seed)
+    postcard_db = load_backend(backend)['PostcardDB']
+
+    start = time.perf_counter()
+    batch = []
+    for row in _synthetic_postcards(count, rng):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            postcard_db.create_postcards(batch)
+            batch = []
+    if batch:
+        postcard_db.create_postcards(batch)
+
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else 0.0
+
+
+def clear_search_corpus(backend):
+    """Delete every synthetic postcard inserted by seed_search_corpus"""
+    if backend == 'postgres':
+        from utils.pg_engine import get_engine
+        return get_engine().execute('DELETE FROM postcards WHERE manufacturer = %s', [SEED_MANUFACTURER])
+
+    from utils.db import admin_supabase
+    result = admin_supabase.table('postcards').delete().eq('manufacturer', SEED_MANUFACTURER).execute()
+    return len(result.data)
+
+
+def time_calls(func, iterations, warmup=2):
+    """Call func repeatedly and return latency stats"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return summarize(samples)
+
+
+def benchmark_search(postcard_db, iterations=30, per_page=20):
+    """Time representative search queries, including a deep cursor page"""
+    from utils.pagination import encode_rank_cursor
+
+    cases = {
+        'one term': ('canyon', {}),
+        'two terms': ('lighthouse harbor', {}),
+        'phrase': ('"main street"', {}),
+        'filtered': ('river', {'era': '1930s', 'type': 'Linen'}),
+        'no match': ('zeppelin', {})
+    }
+
+    results = {}
+    for name, (query, filters) in cases.items():
+        results[name] = time_calls(
+            lambda: postcard_db.search_postcards(query, filters=filters, limit=per_page + 1), iterations
+        )
+
+    # Walk to page 5 once, then time fetching it from its cursor
+    after = None
+    for _ in range(4):
+        rows = postcard_db.search_postcards('canyon', limit=per_page, after=after)
+        if not rows:
+            break
+        after = encode_rank_cursor(rows[-1])
+    results['page 5'] = time_calls(
+        lambda: postcard_db.search_postcards('canyon', limit=per_page + 1, after=after), iterations
+    )
+
+    return results
+
+
+# 1x1 PNG uploaded with each benchmarked add_postcard request
+_TINY_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de'
+    '0000000c49444154789c6338516103000388017dec2bb09e0000000049454e44ae426082'
+)
+
+
+def time_requests(send, iterations, warmup=2):
+    """
+    Call send(i) (which issues one test-client request) repeatedly
+
+    :return: Latency stats plus requests/second and the last status code
+    """
+    status = None
+    for i in range(warmup):
+        status = send(i).status_code
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        began = time.perf_counter()
+        status = send(i).status_code
+        samples.append((time.perf_counter() - began) * 1000)
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(samples)
+    stats['status'] = status
+    stats['rps'] = iterations / elapsed if elapsed else 0.0
+    return stats
+
+
+def _in_fresh_app_context(app, send):
+    # Under `flask` the CLI's app context would otherwise be shared by every
+    # request, carrying g (and the logged-in user) from one request to the next
+    def wrapped(i):
+        with app.app_context():
+            return send(i)
+    return wrapped
+
+
+def benchmark_routes(app, module, iterations=100, latency_ms=0.0, jitter_ms=0.0, postcards=500, warmup=2):
+    """
+    Time the main routes against an in-memory Supabase (utils/supabase_fake.py)
+
+    The Supabase backend classes are wrapped exactly as utils/backend.py wraps
+    them and bound into the app module, so the numbers cover routing, data-access
+    code, caching and template rendering with `latency_ms` standing in for each
+    network round trip. 'add' processes its uploads inline (the default
+    IMAGE_PROCESSING); 'add queued' only spools them to a temporary image queue.
+    """
+    import io
+    import tempfile
+    from config import Config
+    from utils import auth
+    from utils.cache import postcard_cache, with_postcard_cache
+    from utils.tag_dictionary import with_tag_dictionary
+    from utils.supabase_fake import FakeSupabase, install_fake_supabase, seed_fake
+
+    reviews = warmup + iterations
+    fake = FakeSupabase(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=42)
+    admin = seed_fake(fake, postcards=postcards, staged=reviews * 3)
+    with fake._lock:
+        staged = [row['id'] for row in fake.tables['postcards'] if row['status'] == 'staged']
+        approved = [row['id'] for row in fake.tables['postcards'] if row['status'] == 'approved']
+
+    classes = dict(load_backend('supabase'))
+    classes['TagDB'] = with_tag_dictionary(classes['TagDB'])
+    classes['PostcardDB'], classes['TagDB'] = with_postcard_cache(classes['PostcardDB'], classes['TagDB'])
+
+    def add(mode):
+        def send(i):
+            # Bytes after the PNG's end make every scan distinct, so none is skipped as already stored
+            scans = [_TINY_PNG + f'{mode}-{i}-{side}'.encode() for side in ('front', 'back')]
+            with using_backend(Config, {'IMAGE_PROCESSING': mode}):
+                return client.post('/postcards/add', data={
+                    'title': f'Benchmark postcard {i}',
+                    'description': 'Added by benchmark-routes',
+                    'era': '1930s',
+                    'tags': f'benchmark, canyon, batch-{i % 10}',
+                    'action': 'submit',
+                    'front_image': (io.BytesIO(scans[0]), 'front.png', 'image/png'),
+                    'back_image': (io.BytesIO(scans[1]), 'back.png', 'image/png')
+                }, content_type='multipart/form-data')
+        return send
+
+    def bulk_review(i):
+        # Two staged postcards per request
+        ids = staged[reviews + 2 * i:reviews + 2 * i + 2]
+        return client.post('/admin/postcards/staged/review', data={
+            'action': 'approve', 'postcard_ids': ids, 'review_notes': 'benchmark'
+        })
+
+    cases = {
+        'index': lambda i: client.get('/'),
+        'list': lambda i: client.get('/postcards'),
+        'list filter': lambda i: client.get('/postcards?era=1930s&type=Linen'),
+        'detail': lambda i: client.get(f'/postcards/{approved[i % len(approved)]}'),
+        'add': add('inline'),
+        'add queued': add('queue'),
+        'review': lambda i: client.post(f'/admin/postcards/{staged[i]}/review', data={'action': 'approve'}),
+        'bulk review': bulk_review
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as queue_dir, using_backend(Config, {'IMAGE_QUEUE_DIR': queue_dir}), \
+            install_fake_supabase(fake), using_backend(module, classes), using_backend(auth, classes):
+        postcard_cache.clear()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = admin['id']
+            session['_fresh'] = True
+
+        for name, send in cases.items():
+            requests_before = fake.requests
+            results[name] = time_requests(_in_fresh_app_context(app, send), iterations, warmup)
+            results[name]['calls'] = (fake.requests - requests_before) / (iterations + warmup)
+
+    postcard_cache.clear()
+    return results
+
+
+def time_cold_import(module, runs=3):
+    """
+    Import a module in fresh interpreters
+
+    :return: (fastest wall time in ms, [(module, cumulative ms)] slowest first from that run)
+    """
+    import os
+    import subprocess
+    import sys
+
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        if best is None or elapsed < best[0]:
+            best = (elapsed, result.stderr)
+
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in best[1].splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append((parts[2].strip(), int(parts[1]) / 1000))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return best[0], modules
+
+
+def _rss_bytes():
+    """Resident set size of this process (Linux /proc), or None elsewhere"""
+    import os
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def measure_upload_memory(size_mb=16.0, concurrency=4, rounds=2):
+    """
+    Peak memory while `concurrency` uploads of `size_mb` each go through save_image at once
+
+    Runs against an in-memory Supabase that discards uploaded bytes, so the numbers
+    cover spooling, hashing, derivatives and the streamed storage upload. Every
+    scan has distinct content, so none is skipped as a duplicate.
+
+    :return: Dict of peak traced Python allocations and peak RSS growth (MB), plus
+             what holding every file in memory at once would take
+    """
+    import io
+    import os
+    import tempfile
+    import threading
+    import tracemalloc
+    from concurrent.futures import ThreadPoolExecutor
+    from PIL import Image
+    from werkzeug.datastructures import FileStorage
+    from utils.image_handler import save_image
+    from utils.supabase_fake import FakeSupabase, install_fake_supabase
+
+    size = int(size_mb * 1024 * 1024)
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 40), (120, 90, 60)).save(buffer, 'JPEG')
+    scan = buffer.getvalue()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A small JPEG padded with random bytes after its end marker: decodes quickly, hashes uniquely
+        paths = []
+        for i in range(concurrency * rounds):
+            path = os.path.join(directory, f'scan-{i}.jpg')
+            with open(path, 'wb') as f:
+                f.write(scan)
+                remaining = size - len(scan)
+                while remaining > 0:
+                    f.write(os.urandom(min(remaining, 1024 * 1024)))
+                    remaining -= 1024 * 1024
+            paths.append(path)
+
+        def upload(path):
+            with open(path, 'rb') as stream:
+                return save_image(FileStorage(stream=stream, filename='scan.jpg', content_type='image/jpeg'))
+
+        peak_rss = baseline_rss = _rss_bytes()
+        sampling = True
+
+        def sample():
+            nonlocal peak_rss
+            while sampling:
+                peak_rss = max(peak_rss, _rss_bytes())
+                time.sleep(0.002)
+
+        fake = FakeSupabase(keep_objects=False)
+        with install_fake_supabase(fake), ThreadPoolExecutor(max_workers=concurrency) as pool:
+            sampler = threading.Thread(target=sample, daemon=True) if baseline_rss is not None else None
+            if sampler:
+                sampler.start()
+            tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                urls = list(pool.map(upload, paths))
+            finally:
+                elapsed = time.perf_counter() - start
+                _, traced_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                sampling = False
+                if sampler:
+                    sampler.join()
+
+    return {
+        'uploads': len(paths),
+        'failed': sum(1 for url in urls if url is None),
+        'seconds': elapsed,
+        'python_peak_mb': traced_peak / (1024 * 1024),
+        'rss_growth_mb': (peak_rss - baseline_rss) / (1024 * 1024) if baseline_rss is not None else None,
+        'buffered_mb': size_mb * concurrency
+    }
@@ -0,0 +1,242 @@
+# utils/cache.py
+# Read-through, per-process cache for single postcard lookups. Each Gunicorn
+# worker keeps its own copy; writes made through PostcardDB/TagDB invalidate the
+# local entry immediately, and entries in other workers expire after the TTL.
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._reset()
+        # A lock held by another thread at fork time would never be released in the child
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key):
+        """Return (found, value) for a key, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, generation=None):
+        """
+        Store a value, evicting the least recently used entries beyond maxsize
+
+        :param generation: Value of self.generation read before the value was loaded;
+                           the store is skipped if anything was invalidated since,
+                           so a slow read never re-caches a row that was just written
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def delete(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss; None is not cached"""
+        if not self.enabled:
+            return loader()
+
+        found, value = self.get(key)
+        if not found:
+            generation = self.generation
+            value = loader()
+            if value is not None:
+                self.set(key, value, generation)
+
+        # Hand out copies so callers can't mutate the cached row
+        return copy.deepcopy(value)
+
+    def stats(self):
+        """Counters for this worker process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+postcard_cache = TTLCache(maxsize=Config.POSTCARD_CACHE_SIZE, ttl=Config.POSTCARD_CACHE_TTL)
+
+# Cached read shapes of one postcard; all are dropped together on invalidation
+_VARIANTS = ('detail', 'with_tags')
+
+
+def invalidate_postcard(postcard_id):
+    """Drop every cached shape of a postcard"""
+    postcard_id = str(postcard_id)
+    postcard_cache.delete(*[(variant, postcard_id) for variant in _VARIANTS])
+
+
+def with_postcard_cache(postcard_db, tag_db):
+    """
+    Wrap a backend's PostcardDB and TagDB so single-postcard reads go through
+    postcard_cache and every write to a postcard or its tags invalidates it
+
+    Other workers may hold a copy for up to the TTL, so code that acts on a row
+    (checks its owner or status, releases its images) reads it with cached=False.
+    """
+
+    class CachedPostcardDB(postcard_db):
+        @staticmethod
+        def get_postcard(postcard_id, cached=True):
+            if not cached:
+                return postcard_db.get_postcard(postcard_id)
+            return postcard_cache.get_or_load(
+                ('detail', str(postcard_id)), lambda: postcard_db.get_postcard(postcard_id)
+            )
+
+        @staticmethod
+        def get_postcard_with_tags(postcard_id, cached=True):
+            if not cached:
+                return postcard_db.get_postcard_with_tags(postcard_id)
+            return postcard_cache.get_or_load(
+                ('with_tags', str(postcard_id)), lambda: postcard_db.get_postcard_with_tags(postcard_id)
+            )
+
+        @staticmethod
+        def update_postcard(postcard_id, postcard_data):
+            try:
+                return postcard_db.update_postcard(postcard_id, postcard_data)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def stage_postcard(postcard_id):
+            try:
+                return postcard_db.stage_postcard(postcard_id)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def review_postcard(postcard_id, status, review_notes=None):
+            try:
+                return postcard_db.review_postcard(postcard_id, status, review_notes)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def review_postcards(postcard_ids, status, notes=None, review_notes=None):
+            try:
+                return postcard_db.review_postcards(postcard_ids, status, notes, review_notes)
+            finally:
+                for postcard_id in postcard_ids or []:
+                    invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def review_staged_postcards(status, filters=None, review_notes=None):
+            changed = None
+            try:
+                changed = postcard_db.review_staged_postcards(status, filters, review_notes)
+                return changed
+            finally:
+                if changed is None:
+                    # Unknown which rows changed
+                    postcard_cache.clear()
+                else:
+                    for postcard_id in changed:
+                        invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def delete_postcard(postcard_id):
+            try:
+                return postcard_db.delete_postcard(postcard_id)
+            finally:
+                invalidate_postcard(postcard_id)
+
+    class CachedTagDB(tag_db):
+        @staticmethod
+        def link_tag_to_postcard(postcard_id, tag_id):
+            try:
+                return tag_db.link_tag_to_postcard(postcard_id, tag_id)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def link_tags_to_postcard(postcard_id, tag_ids):
+            try:
+                return tag_db.link_tags_to_postcard(postcard_id, tag_ids)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def link_tags_to_postcards(links):
+            try:
+                return tag_db.link_tags_to_postcards(links)
+            finally:
+                for postcard_id in {postcard_id for postcard_id, _ in links or []}:
+                    invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def unlink_tags_from_postcard(postcard_id, tag_ids):
+            try:
+                return tag_db.unlink_tags_from_postcard(postcard_id, tag_ids)
+            finally:
+                invalidate_postcard(postcard_id)
+
+        @staticmethod
+        def set_postcard_tags(postcard_id, names, current_tags=None):
+            try:
+                return tag_db.set_postcard_tags(postcard_id, names, current_tags)
+            finally:
+                invalidate_postcard(postcard_id)
+
+    CachedPostcardDB.__name__ = CachedPostcardDB.__qualname__ = 'PostcardDB'
+    CachedTagDB.__name__ = CachedTagDB.__qualname__ = 'TagDB'
+    return CachedPostcardDB, CachedTagDB
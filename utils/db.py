@@ -1,12 +1,30 @@
-from supabase import create_client
-from config import Config
+from utils.supabase_clients import LazyClient
+from utils.enums import POSTCARD_TYPES, POSTCARD_ERAS
+from utils.pagination import apply_supabase_page, order_page_rows, decode_rank_cursor
+from utils.tags import normalize_tag_names, diff_tag_ids
+from utils.projections import postcard_fields, UPLOADER_FIELD
 import uuid
 
-# Initialize regular Supabase client
-supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+# Regular Supabase client (built on first use by utils/supabase_clients.py)
+supabase = LazyClient('anon')
 
-# Initialize admin Supabase client with service role key
-admin_supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+# Admin Supabase client with service role key
+admin_supabase = LazyClient('service')
+
+def _select_clause(fields):
+    """PostgREST select string for a named postcard field set"""
+    columns = postcard_fields(fields)
+    select = [column for column in columns if column != UPLOADER_FIELD]
+    if UPLOADER_FIELD in columns:
+        select.append('users(username)')
+    return ','.join(select)
+
+def _flatten_uploader(rows):
+    """Replace the embedded users object with a flat 'username' key"""
+    for row in rows:
+        if 'users' in row:
+            row[UPLOADER_FIELD] = (row.pop('users') or {}).get('username')
+    return rows
 
 class PostcardDB:
 
@@ -14,10 +32,12 @@ class PostcardDB:
     def stage_postcard(postcard_id):
         """
         Move a draft postcard to staged status for admin review
+        
+        :return: The staged postcard, or None if it is not (or no longer) a draft
         """
         result = admin_supabase.table('postcards').update({
             'status': 'staged'
-        }).eq('id', postcard_id).execute()
+        }).eq('id', postcard_id).eq('status', 'draft').execute()
         
         return result.data[0] if result.data else None
     
@@ -42,40 +62,83 @@ class PostcardDB:
         return result.data[0] if result.data else None
     
     @staticmethod
-    def get_staged_postcards(limit=20, offset=0):
+    def review_postcards(postcard_ids, status, notes=None, review_notes=None):
         """
-        Fetch all staged postcards for admin review
+        Give many staged postcards the same review status in one UPDATE
+        
+        :param postcard_ids: IDs of the postcards to review
+        :param status: New status ('approved' or 'rejected')
+        :param notes: Optional per-card notes, parallel to postcard_ids (None entries allowed)
+        :param review_notes: Notes for cards without their own
+        :return: IDs of the postcards that changed
+        """
+        if not postcard_ids:
+            return []
+        
+        params = {
+            'postcard_ids': list(postcard_ids),
+            'new_status': status,
+            'notes': list(notes) if notes else None,
+            'shared_notes': review_notes
+        }
+        result = admin_supabase.rpc('review_postcards', params).execute()
+        return [row['id'] for row in result.data]
+    
+    @staticmethod
+    def review_staged_postcards(status, filters=None, review_notes=None):
         """
-        query = admin_supabase.table('postcards').select('*').eq('status', 'staged')
+        Give every staged postcard matching the filters the same review status
         
-        # Apply ordering
-        query = query.order('created_at', desc=True)
+        :return: IDs of the postcards that changed
+        """
+        params = {
+            'new_status': status,
+            'filters': {field: value for field, value in (filters or {}).items() if value},
+            'shared_notes': review_notes
+        }
+        result = admin_supabase.rpc('review_staged_postcards', params).execute()
+        return [row['id'] for row in result.data]
+    
+    @staticmethod
+    def get_staged_postcards(limit=20, offset=0, after=None, before=None, fields='detail', filters=None):
+        """
+        Fetch all staged postcards for admin review
         
-        # Apply limit
-        query = query.limit(limit)
+        :param after: Cursor token; fetch the page after it
+        :param before: Cursor token; fetch the page before it
+        :param fields: Named field set from utils/projections.py
+        :param filters: Same filter dict as get_all_postcards
+        """
+        query = admin_supabase.table('postcards').select(_select_clause(fields)).eq('status', 'staged')
         
-        # Handle pagination
-        if offset > 0:
-            start = offset
-            end = offset + limit - 1
-            query = query.range(start, end)
+        if filters:
+            for field, value in filters.items():
+                if value:
+                    query = query.eq(field, value)
+        
+        # Apply ordering and keyset (or legacy offset) pagination
+        query = apply_supabase_page(query, limit, offset, after, before)
         
         result = query.execute()
         
-        return result.data
+        return order_page_rows(_flatten_uploader(result.data), after, before)
 
     @staticmethod
-    def get_all_postcards(limit=20, offset=0, filters=None, user_id=None, status=None):
+    def get_all_postcards(limit=20, offset=0, filters=None, user_id=None, status=None, after=None, before=None,
+                          fields='detail'):
         """
         Fetch postcards with advanced filtering and optional status filtering
         
         :param limit: Number of records to return
-        :param offset: Pagination offset
+        :param offset: Pagination offset (fallback when no cursor is given)
         :param filters: Additional filters to apply
         :param user_id: Optionally filter by user ID
         :param status: Filter by postcard status (for admins)
+        :param after: Cursor token; fetch the page after it
+        :param before: Cursor token; fetch the page before it
+        :param fields: Named field set from utils/projections.py
         """
-        query = admin_supabase.table('postcards').select('*')
+        query = admin_supabase.table('postcards').select(_select_clause(fields))
         
         # Apply basic filters
         if filters:
@@ -94,31 +157,80 @@ class PostcardDB:
             # Default behavior for non-admin users
             query = query.eq('status', 'approved')
         
-        # Apply ordering
-        query = query.order('created_at', desc=True)
+        # Apply ordering and keyset (or legacy offset) pagination
+        query = apply_supabase_page(query, limit, offset, after, before)
         
-        # Apply limit
-        query = query.limit(limit)
+        result = query.execute()
         
-        # Handle pagination
-        if offset > 0:
-            start = offset
-            end = offset + limit - 1
-            query = query.range(start, end)
+        return order_page_rows(_flatten_uploader(result.data), after, before)
+    
+    @staticmethod
+    def search_postcards(search_query, filters=None, limit=20, after=None):
+        """
+        Ranked full-text search over approved postcards
         
-        result = query.execute()
+        :param search_query: Web-search style query ("quoted phrases", -exclusions, or)
+        :param filters: Same filter dict as get_all_postcards
+        :param after: Search cursor token from a previous page
+        :return: Card fields plus 'rank' and 'headline' (matches wrapped in U+27E6/U+27E7)
+        """
+        key = decode_rank_cursor(after)
+        params = {
+            'search_query': search_query,
+            'filters': {field: value for field, value in (filters or {}).items() if value},
+            'after_rank': key[0] if key else None,
+            'after_id': key[1] if key else None,
+            'page_size': limit
+        }
         
+        result = admin_supabase.rpc('search_postcards', params).execute()
         return result.data
     
+    @staticmethod
+    def get_postcard_facets(filters=None):
+        """
+        Count approved postcards per era, type, manufacturer and posted/written
+        
+        Each facet is counted under every filter except its own; see the
+        get_postcard_facets() database function.
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        result = admin_supabase.rpc('get_postcard_facets', {'filters': filters}).execute()
+        
+        if result.data:
+            return result.data[0]['facets']
+        return None
+    
     @staticmethod
     def get_postcard(postcard_id):
         """Fetch a single postcard by ID"""
-        result = admin_supabase.table('postcards').select('*').eq('id', postcard_id).execute()
+        result = admin_supabase.table('postcards').select(_select_clause('detail')).eq('id', postcard_id).execute()
         
         if result.data:
             return result.data[0]
         return None
     
+    @staticmethod
+    def get_postcard_with_tags(postcard_id):
+        """
+        Fetch a postcard with its tags and uploader username embedded, in one request
+        
+        The returned dict has 'tags' (list of tag rows) and 'username' keys added.
+        """
+        result = admin_supabase.table('postcards')\
+            .select(_select_clause('detail') + ',tags(*),users(username)')\
+            .eq('id', postcard_id)\
+            .execute()
+        
+        if not result.data:
+            return None
+        
+        postcard = result.data[0]
+        uploader = postcard.pop('users', None) or {}
+        postcard['username'] = uploader.get('username')
+        postcard['tags'] = sorted(postcard.get('tags') or [], key=lambda tag: tag['name'].lower())
+        return postcard
+    
     @staticmethod
     def create_postcard(postcard_data):
         """
@@ -138,6 +250,30 @@ class PostcardDB:
             return result.data[0]
         return None
     
+    @staticmethod
+    def create_postcards(postcard_rows):
+        """
+        Insert many postcards in one request
+        
+        Every row must have the same keys, including its own 'id'. Rows whose id
+        already exists are skipped, so re-sending a batch is harmless.
+        :return: IDs of the rows actually inserted
+        """
+        if not postcard_rows:
+            return []
+        
+        result = admin_supabase.table('postcards').upsert(postcard_rows, ignore_duplicates=True).execute()
+        return [row['id'] for row in result.data]
+    
+    @staticmethod
+    def existing_postcard_ids(postcard_ids):
+        """The subset of postcard_ids that already exist"""
+        if not postcard_ids:
+            return set()
+        
+        result = admin_supabase.table('postcards').select('id').in_('id', list(postcard_ids)).execute()
+        return {str(row['id']) for row in result.data}
+    
     @staticmethod
     def update_postcard(postcard_id, postcard_data):
         """Update an existing postcard"""
@@ -156,41 +292,25 @@ class PostcardDB:
     @staticmethod
     def get_postcard_types():
         """Get all postcard types"""
-        # For enums in Supabase, we need to query them differently
-        # This is a simplified version - you might need to adjust based on your Supabase setup
-        types = ['RPPC', 'Divided Back', 'Undivided Back', 'Linen', 'Chrome', 'Continental']
-        return types
+        # Enum values mirror the postcard_type type in database_scheme.sql
+        return list(POSTCARD_TYPES)
     
     @staticmethod
     def get_postcard_eras():
         """Get all postcard eras"""
-        eras = [
-            '1860s', '1870s', '1880s', '1890s', '1900s', '1910s', '1920s', 
-            '1930s', '1940s', '1950s', '1960s', '1970s', '1980s', '1990s', 
-            '2000s', '2010s', '2020s'
-        ]
-        return eras
+        return list(POSTCARD_ERAS)
 
     @staticmethod
-    def get_user_postcards(user_id, limit=20, offset=0):
+    def get_user_postcards(user_id, limit=20, offset=0, after=None, before=None, fields='detail'):
         """Fetch all postcards for a specific user"""
-        query = supabase.table('postcards').select('*').eq('user_id', user_id)
-        
-        # Apply ordering
-        query = query.order('created_at', desc=True)
-        
-        # Apply limit
-        query = query.limit(limit)
+        query = supabase.table('postcards').select(_select_clause(fields)).eq('user_id', user_id)
         
-        # Handle pagination
-        if offset > 0:
-            start = offset
-            end = offset + limit - 1
-            query = query.range(start, end)
+        # Apply ordering and keyset (or legacy offset) pagination
+        query = apply_supabase_page(query, limit, offset, after, before)
         
         result = query.execute()
         
-        return result.data
+        return order_page_rows(_flatten_uploader(result.data), after, before)
 
 class TagDB:
     @staticmethod
@@ -199,6 +319,15 @@ class TagDB:
         result = admin_supabase.table('tags').select('*').execute()
         return result.data
     
+    @staticmethod
+    def get_tags_version():
+        """Counter bumped by the database on every change to the tags table"""
+        result = admin_supabase.table('tags_version').select('version').execute()
+        
+        if result.data:
+            return result.data[0]['version']
+        return 0
+    
     @staticmethod
     def create_tag(name):
         """Create a new tag"""
@@ -219,6 +348,98 @@ class TagDB:
         
         return result.data
     
+    @staticmethod
+    def upsert_tags(names):
+        """
+        Resolve tag names to tag rows in one round trip, creating missing tags
+        
+        :param names: Tag names (normalized with normalize_tag_names)
+        """
+        names = normalize_tag_names(names)
+        if not names:
+            return []
+        
+        result = admin_supabase.rpc('upsert_tags', {'tag_names': names}).execute()
+        return result.data
+    
+    @staticmethod
+    def link_tags_to_postcard(postcard_id, tag_ids):
+        """Link several tags to a postcard in one batch insert"""
+        if not tag_ids:
+            return []
+        
+        rows = [{'postcard_id': postcard_id, 'tag_id': tag_id} for tag_id in tag_ids]
+        result = admin_supabase.table('postcard_tags').upsert(rows, ignore_duplicates=True).execute()
+        
+        return result.data
+    
+    @staticmethod
+    def link_tags_to_postcards(links):
+        """Insert many (postcard_id, tag_id) links in one request, skipping existing ones"""
+        if not links:
+            return 0
+        
+        rows = [{'postcard_id': postcard_id, 'tag_id': tag_id} for postcard_id, tag_id in links]
+        result = admin_supabase.table('postcard_tags').upsert(rows, ignore_duplicates=True).execute()
+        
+        return len(result.data)
+    
+    @staticmethod
+    def unlink_tags_from_postcard(postcard_id, tag_ids):
+        """Remove several tag links from a postcard in one request"""
+        if not tag_ids:
+            return []
+        
+        result = admin_supabase.table('postcard_tags')\
+            .delete()\
+            .eq('postcard_id', postcard_id)\
+            .in_('tag_id', list(tag_ids))\
+            .execute()
+        
+        return result.data
+    
+    @staticmethod
+    def set_postcard_tags(postcard_id, names, current_tags=None):
+        """
+        Make a postcard's tags match a list of names
+        
+        :param names: Comma-separated string or list of tag names
+        :param current_tags: Tags the postcard has now (omit for a new postcard)
+        :return: The postcard's tags after the update
+        """
+        tags = TagDB.upsert_tags(names)
+        to_link, to_unlink = diff_tag_ids(current_tags, tags)
+        
+        TagDB.link_tags_to_postcard(postcard_id, to_link)
+        TagDB.unlink_tags_from_postcard(postcard_id, to_unlink)
+        
+        return tags
+    
+    @staticmethod
+    def get_tags_for_postcards(postcard_ids):
+        """
+        Fetch the tags of many postcards in one request
+        
+        :return: Dict of postcard ID -> list of tag rows
+        """
+        tags_by_postcard = {postcard_id: [] for postcard_id in postcard_ids}
+        if not postcard_ids:
+            return tags_by_postcard
+        
+        result = admin_supabase.table('postcard_tags')\
+            .select('postcard_id, tags(*)')\
+            .in_('postcard_id', list(postcard_ids))\
+            .execute()
+        
+        for item in result.data:
+            if item.get('tags'):
+                tags_by_postcard.setdefault(item['postcard_id'], []).append(item['tags'])
+        
+        for tags in tags_by_postcard.values():
+            tags.sort(key=lambda tag: tag['name'].lower())
+        
+        return tags_by_postcard
+    
     @staticmethod
     def get_postcard_tags(postcard_id):
         """Get all tags for a postcard"""
@@ -233,4 +454,93 @@ class TagDB:
             if 'tags' in item and item['tags']:
                 tags.append(item['tags'])
         
-        return tags
\ No newline at end of file
+        return tags
+
+class ImageDB:
+    @staticmethod
+    def acquire_image(sha256, file_ext, byte_size=None):
+        """
+        Take a reference to a content-addressed image
+        
+        :return: (references now held, extension the image is stored under, whether its
+                 objects are all stored, derivative formats stored); until they are the
+                 caller uploads it and then calls mark_image_stored()
+        """
+        result = admin_supabase.rpc('acquire_image', {
+            'p_sha256': sha256, 'p_file_ext': file_ext, 'p_byte_size': byte_size
+        }).execute()
+        row = result.data[0]
+        return row['ref_count'], row['file_ext'], row['stored'], list(row.get('formats') or [])
+    
+    @staticmethod
+    def mark_image_stored(sha256, formats):
+        """Record that every object of an image has been uploaded, its derivatives in formats"""
+        result = admin_supabase.rpc('mark_image_stored', {'p_sha256': sha256, 'p_formats': list(formats)}).execute()
+        return bool(result.data)
+    
+    @staticmethod
+    def release_image(sha256, object_keys):
+        """Drop a reference to an image; returns the references left (at 0 object_keys are queued for deletion)"""
+        result = admin_supabase.rpc('release_image', {'p_sha256': sha256, 'p_object_keys': list(object_keys)}).execute()
+        return result.data or 0
+    
+    @staticmethod
+    def queue_deletion(object_keys):
+        """Queue storage objects that are not reference-counted (UUID-keyed uploads) for deletion"""
+        admin_supabase.table('image_deletions').insert({'object_keys': list(object_keys)}).execute()
+    
+    @staticmethod
+    def claim_deletions(limit, min_age, lease):
+        """Claim up to `limit` queued deletions at least `min_age` seconds old, hidden from other sweepers for `lease` seconds"""
+        result = admin_supabase.rpc('claim_image_deletions', {
+            'p_limit': limit, 'p_min_age': int(min_age), 'p_lease': int(lease)
+        }).execute()
+        return result.data or []
+    
+    @staticmethod
+    def finish_deletions(deletion_ids):
+        admin_supabase.table('image_deletions').delete().in_('id', list(deletion_ids)).execute()
+    
+    @staticmethod
+    def fail_deletions(deletion_ids, error):
+        """Record why a batch could not be removed; it is retried when its lease runs out"""
+        admin_supabase.table('image_deletions').update({'last_error': error}).in_('id', list(deletion_ids)).execute()
+    
+    @staticmethod
+    def pending_deletions():
+        result = admin_supabase.table('image_deletions').select('id', count='exact').limit(1).execute()
+        return result.count or 0
+    
+    @staticmethod
+    def list_image_urls(after_id=None, limit=1000):
+        """One page of postcards' image URLs ordered by ID (keyset: pass the last ID seen)"""
+        query = admin_supabase.table('postcards').select('id, front_image_url, back_image_url').order('id')
+        if after_id is not None:
+            query = query.gt('id', after_id)
+        return query.limit(limit).execute().data or []
+    
+    @staticmethod
+    def list_image_hashes(after=None, limit=1000):
+        """One page of the SHA-256s of referenced content-addressed images, in order"""
+        query = admin_supabase.table('image_objects').select('sha256').order('sha256')
+        if after is not None:
+            query = query.gt('sha256', after)
+        return [row['sha256'] for row in query.limit(limit).execute().data or []]
+    
+    @staticmethod
+    def held_images(hashes):
+        """The subset of `hashes` that are referenced right now"""
+        if not hashes:
+            return set()
+        result = admin_supabase.table('image_objects').select('sha256').in_('sha256', list(hashes)).execute()
+        return {row['sha256'] for row in result.data or []}
+
+class StatsDB:
+    @staticmethod
+    def get_catalog_stats(upload_days=30):
+        """Fetch aggregate counts computed by the get_catalog_stats() database function"""
+        result = admin_supabase.rpc('get_catalog_stats', {'upload_days': upload_days}).execute()
+        
+        if result.data:
+            return result.data[0]['stats']
+        return None
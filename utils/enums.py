@@ -0,0 +1,17 @@
+# utils/enums.py
+# Mirrors the enum types defined in database_scheme.sql so both data-access
+# backends (and anything validating user input) share one source of truth.
+
+POSTCARD_TYPES = ['RPPC', 'Divided Back', 'Undivided Back', 'Linen', 'Chrome', 'Continental']
+
+POSTCARD_ERAS = [
+    '1860s', '1870s', '1880s', '1890s', '1900s', '1910s', '1920s',
+    '1930s', '1940s', '1950s', '1960s', '1970s', '1980s', '1990s',
+    '2000s', '2010s', '2020s'
+]
+
+POSTCARD_STATUSES = ['staged', 'approved', 'rejected', 'draft']
+
+IMAGE_STATUSES = ['processing', 'ready', 'failed']
+
+USER_ROLES = ['admin', 'user']
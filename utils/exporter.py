@@ -0,0 +1,130 @@
+# utils/exporter.py
+# Streams the catalog as NDJSON or CSV. Rows are fetched in keyset-paged batches
+# and encoded one at a time, so memory use does not grow with the catalog.
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from utils.pagination import encode_cursor
+from utils.projections import POSTCARD_COLUMNS, UPLOADER_FIELD
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+EXPORT_COLUMNS = POSTCARD_COLUMNS + (UPLOADER_FIELD, 'tags')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Flush encoded output in chunks of roughly this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_postcards(postcard_db, tag_db, filters=None, status=None, batch_size=500):
+    """
+    Yield every matching postcard (full row, uploader username and tag names)
+
+    :param filters: Same filter dict as list_postcards
+    :param status: Postcard status to export (default: approved)
+    """
+    after = None
+    while True:
+        rows = postcard_db.get_all_postcards(
+            limit=batch_size, filters=filters, status=status, after=after, fields='export'
+        )
+        if not rows:
+            return
+
+        tags_by_postcard = tag_db.get_tags_for_postcards([row['id'] for row in rows])
+        for row in rows:
+            row['tags'] = sorted(tag['name'] for tag in tags_by_postcard.get(row['id'], []))
+            yield row
+
+        if len(rows) < batch_size:
+            return
+        after = encode_cursor(rows[-1])
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}, default=_json_default) + '\n'
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield flush()
+
+    for row in rows:
+        values = []
+        for column in EXPORT_COLUMNS:
+            value = row.get(column)
+            if column == 'tags':
+                value = ', '.join(value or [])
+            elif isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            values.append(value)
+        writer.writerow(values)
+        yield flush()
+
+
+def _chunked(lines, size=CHUNK_SIZE):
+    """Join encoded lines into ~size byte chunks"""
+    parts = []
+    length = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(parts)
+            parts = []
+            length = 0
+    if parts:
+        yield b''.join(parts)
+
+
+def _gzipped(chunks):
+    """Compress a byte stream into a single gzip member as it is produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(postcard_db, tag_db, export_format='ndjson', filters=None, status=None, gzip=False,
+                  batch_size=500):
+    """
+    Generator of encoded (optionally gzip-compressed) export bytes
+
+    :raises ValueError: for an unknown export_format
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    rows = iter_postcards(postcard_db, tag_db, filters=filters, status=status, batch_size=batch_size)
+    lines = ndjson_lines(rows) if export_format == 'ndjson' else csv_lines(rows)
+    chunks = _chunked(lines)
+    return _gzipped(chunks) if gzip else chunks
+
+
+def export_filename(export_format, gzip=False):
+    return f"postcards-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}{'.gz' if gzip else ''}"
@@ -0,0 +1,90 @@
+# utils/fanout.py
+# Runs independent data-access calls of one request concurrently on a shared,
+# per-process thread pool. Each call runs in a copy of the caller's context, so
+# Flask's request/app context and the request trace (utils/tracing.py) are
+# visible inside it.
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from config import Config
+
+# Set inside pool threads; a fan-out started from one runs inline instead of
+# queueing behind its own parent and deadlocking a saturated pool
+_in_fanout = contextvars.ContextVar('in_fanout', default=False)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _reset():
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+# The pool's threads do not survive a fork; let each Gunicorn worker build its own
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=Config.FANOUT_WORKERS, thread_name_prefix='fanout')
+    return _pool
+
+
+def _run(func):
+    _in_fanout.set(True)
+    return func()
+
+
+def gather(*calls, timeout=None, return_exceptions=False):
+    """
+    Run zero-argument callables concurrently and return their results in order
+
+    Total wall time is that of the slowest call. Calls already running inside a
+    fan-out, or a single call, run inline.
+
+    :param timeout: Seconds to wait for all calls (default Config.FANOUT_TIMEOUT);
+                    a call still running then raises concurrent.futures.TimeoutError
+                    (it is not interrupted, its result is discarded)
+    :param return_exceptions: Put a failed call's exception in its result slot
+                              instead of raising it
+    """
+    if timeout is None:
+        timeout = Config.FANOUT_TIMEOUT
+
+    if len(calls) <= 1 or _in_fanout.get() or Config.FANOUT_WORKERS < 2:
+        results = []
+        for call in calls:
+            try:
+                results.append(call())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    pool = get_pool()
+    futures = [pool.submit(contextvars.copy_context().run, _run, call) for call in calls]
+
+    deadline = time.monotonic() + timeout if timeout else None
+    results = []
+    for future in futures:
+        try:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            results.append(future.result(timeout=remaining))
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                future.cancel()
+            if not return_exceptions:
+                for other in futures:
+                    other.cancel()
+                raise
+            results.append(e)
+    return results
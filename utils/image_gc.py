@@ -0,0 +1,142 @@
+# utils/image_gc.py
+# Removal of image objects from storage. delete_image() only queues an image's
+# keys in the image_deletions table; sweep_deletions() (run by `flask image-worker`)
+# removes them in batches, one multi-key storage request per batch, once they are
+# IMAGE_DELETE_DELAY seconds old. collect_garbage() (`flask gc-images`) finds objects
+# nothing refers to, such as leftovers of failed deletes or of uploads whose
+# postcard was never saved, and removes them.
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from config import Config
+from utils.backend import ImageDB
+from utils.image_handler import get_storage
+from utils.image_variants import content_prefix
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_deletions(max_batches=None, batch_size=None):
+    """
+    Remove queued image deletions from storage, IMAGE_DELETE_BATCH images per request,
+    until none is ready (or max_batches have been sent)
+
+    :return: Number of images removed
+    """
+    batch_size = batch_size or Config.IMAGE_DELETE_BATCH
+    storage = get_storage()
+    removed = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        # Hidden from other sweepers for IMAGE_DELETE_LEASE seconds; retried after that if
+        # the removal fails or this process dies
+        deletions = ImageDB.claim_deletions(batch_size, Config.IMAGE_DELETE_DELAY, Config.IMAGE_DELETE_LEASE)
+        if not deletions:
+            break
+        batches += 1
+
+        deletion_ids = [deletion['id'] for deletion in deletions]
+        # An image uploaded again since its deletion was claimed is in use: keep its objects
+        held = ImageDB.held_images([deletion['sha256'] for deletion in deletions if deletion.get('sha256')])
+        keys = [key for deletion in deletions if deletion.get('sha256') not in held for key in deletion['object_keys']]
+        try:
+            if keys:
+                storage.remove(keys)
+        except Exception as e:
+            # Retried when the lease runs out
+            logger.error(f"Error removing {len(keys)} image objects: {str(e)}")
+            ImageDB.fail_deletions(deletion_ids, str(e)[:500])
+            break
+
+        ImageDB.finish_deletions(deletion_ids)
+        removed += len(deletions)
+        logger.info(f"Removed {len(keys)} objects of {len(deletions)} deleted images from {storage.name} storage")
+
+    return removed
+
+
+def _referenced_names(storage, page_size):
+    """Top-level storage names (upload prefixes or legacy keys) that postcards or image references use"""
+    names = set()
+
+    after_id = None
+    while True:
+        rows = ImageDB.list_image_urls(after_id, page_size)
+        for row in rows:
+            for url in (row.get('front_image_url'), row.get('back_image_url')):
+                if url:
+                    names.add(storage.key_from_url(url).split('/', 1)[0])
+        if len(rows) < page_size:
+            break
+        after_id = str(rows[-1]['id'])
+
+    # Images being uploaded or processed hold a reference before any postcard points at them
+    after = None
+    while True:
+        hashes = ImageDB.list_image_hashes(after, page_size)
+        names.update(hashes)
+        if len(hashes) < page_size:
+            break
+        after = hashes[-1]
+
+    return names
+
+
+def collect_garbage(min_age=86400, batch_size=100, rate=50.0, page_size=1000, dry_run=False):
+    """
+    Remove storage objects no postcard refers to
+
+    The bucket (or image directory) is listed page by page and each top-level
+    entry compared with the postcards' front_image_url/back_image_url and the
+    image_objects references. Unreferenced objects older than min_age seconds are
+    removed batch_size keys per request, at most `rate` keys per second.
+
+    :return: Dict of counts: scanned, orphaned, recent (skipped as younger than
+             min_age), removed (objects; would-be-removed with dry_run)
+    """
+    storage = get_storage()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=min_age)
+    referenced = _referenced_names(storage, page_size)
+    counts = {'scanned': 0, 'orphaned': 0, 'recent': 0, 'removed': 0}
+
+    # Listed in full before anything is removed, so removals do not shift the listing's pages
+    orphans = []
+    for name, modified in storage.list_names(page_size):
+        counts['scanned'] += 1
+        if name in referenced or name.startswith('.'):
+            continue
+        objects = [(name, modified)] if modified is not None else storage.list_objects(name)
+        if not objects:
+            continue
+        if any(modified is None or modified > cutoff for _, modified in objects):
+            counts['recent'] += 1
+            continue
+        orphans.append((name, [key for key, _ in objects]))
+    counts['orphaned'] = len(orphans)
+
+    started = time.monotonic()
+    batch = []
+    for index, orphan in enumerate(orphans):
+        batch.append(orphan)
+        if sum(len(keys) for _, keys in batch) < batch_size and index < len(orphans) - 1:
+            continue
+
+        # An image uploaded again since the scan began is referenced again
+        held = ImageDB.held_images([name for name, _ in batch if content_prefix(f'{name}/x')])
+        keys = [key for name, keys in batch if name not in held for key in keys]
+        batch = []
+        if not keys:
+            continue
+
+        if not dry_run:
+            storage.remove(keys)
+        counts['removed'] += len(keys)
+        logger.info(f"{'Would remove' if dry_run else 'Removed'} {len(keys)} unreferenced image objects")
+
+        # Stay under `rate` keys per second overall
+        delay = counts['removed'] / rate - (time.monotonic() - started)
+        if delay > 0 and not dry_run:
+            time.sleep(delay)
+
+    return counts
@@ -1,9 +1,19 @@
+import hashlib
 import os
-import uuid
-from PIL import Image
-from flask import current_app
-from supabase import create_client
+import re
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from functools import partial
 from config import Config
+from utils.supabase_clients import LazyClient
+from utils.fanout import gather
+from utils.backend import ImageDB
+from utils.image_variants import (
+    build_derivatives, original_key, variant_key, derivative_keys, variant_base, content_prefix,
+    normalize_extension, storage_etag, with_formats, CONTENT_TYPES
+)
 import logging
 from werkzeug.utils import secure_filename
 
@@ -11,55 +21,495 @@ from werkzeug.utils import secure_filename
 logger = logging.getLogger(__name__)
 
 # Initialize admin Supabase client with service role key
-admin_supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+admin_supabase = LazyClient('service')
 
 def allowed_file(filename):
     """Check if the file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
+class UploadRejected(Exception):
+    """An upload that is too large or not one of the allowed image types"""
+
+# Leading bytes of each image type an upload may be, and the type it is stored as
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpg', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'GIF87a', 'gif', 'image/gif'),
+    (b'GIF89a', 'gif', 'image/gif')
+)
+
+def sniff_image_type(head):
+    """(extension, content type) of an allowed image from its first bytes, or None"""
+    allowed = {normalize_extension(ext) for ext in Config.ALLOWED_EXTENSIONS}
+    for signature, file_ext, content_type in _SIGNATURES:
+        if head.startswith(signature) and file_ext in allowed:
+            return file_ext, content_type
+    return None
+
+class SpooledUpload:
+    """An upload copied to a local file, with its SHA-256, size and detected type"""
+
+    def __init__(self, path, sha256, size, file_ext, content_type):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.file_ext = file_ext
+        self.content_type = content_type
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def spool_upload(image_file, directory=None, max_bytes=None):
+    """
+    Copy an uploaded file to disk in UPLOAD_CHUNK_SIZE pieces, hashing and validating as it goes
+    
+    Memory use is one chunk whatever the file's size. The type comes from the file's
+    leading bytes, not its name or the browser's content type.
+    
+    :param directory: Where to write the file (default: the system temp directory)
+    :param max_bytes: Largest accepted file (default Config.MAX_IMAGE_BYTES)
+    :raises UploadRejected: If the file is empty, too large or not an allowed image type
+    """
+    max_bytes = Config.MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    stream = getattr(image_file, 'stream', image_file)
+    stream.seek(0)
+    
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    detected = None
+    
+    # Written under a temporary name and renamed once complete
+    fd, part_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(Config.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if detected is None:
+                    head += chunk
+                    if len(head) >= 16:
+                        detected = sniff_image_type(head)
+                        if detected is None:
+                            raise UploadRejected('Not a supported image type')
+                        head = b''
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"Larger than {max_bytes // (1024 * 1024)}MB")
+                digest.update(chunk)
+                out.write(chunk)
+        
+        if detected is None:
+            # Shorter than the sniffing window
+            detected = sniff_image_type(head) if head else None
+            if detected is None:
+                raise UploadRejected('Empty file' if not size else 'Not a supported image type')
+        
+        file_ext, content_type = detected
+        path = f'{part_path[:-len(".part")]}.{file_ext}'
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except FileNotFoundError:
+            pass
+        raise
+    
+    return SpooledUpload(path, digest.hexdigest(), size, file_ext, content_type)
+
+# Keys are content hashes (or unique per upload for older images) and objects are never
+# rewritten, so browsers and CDNs may cache them for a year
+CACHE_SECONDS = '31536000'
+
+def _is_duplicate(error):
+    """Whether a storage error says the object already exists"""
+    message = str(error).lower()
+    return 'duplicate' in message or 'already exists' in message
+
+def _is_bucket_missing(error):
+    """Whether a storage error says the bucket does not exist"""
+    return 'bucket not found' in str(error).lower()
+
+class SupabaseStorage:
+    """
+    Images in the public 'postcard-images' Supabase Storage bucket, served by Supabase
+    
+    The bucket is provisioned once (by `flask verify-storage`, the start-up check or
+    the first upload that finds it missing), not checked before every upload: an
+    upload is a single storage call. If one fails because the bucket is gone, the
+    bucket is created again and the upload retried once.
+    """
+    
+    name = 'supabase'
+    
+    def __init__(self, bucket_name='postcard-images'):
+        self.bucket_name = bucket_name
+        # Bumped each time the bucket is provisioned, so concurrent uploads that all hit a
+        # missing bucket provision it once between them
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def _provision(self, seen_generation):
+        """Create the bucket (public) unless another thread already did since seen_generation"""
+        with self._lock:
+            if self._generation != seen_generation:
+                return
+            try:
+                buckets = admin_supabase.storage.list_buckets()
+                if not any(bucket.name == self.bucket_name for bucket in buckets):
+                    logger.info(f"Creating bucket: {self.bucket_name}")
+                    admin_supabase.storage.create_bucket(self.bucket_name, options={'public': True})
+            except Exception as e:
+                logger.error(f"Error checking/creating bucket: {str(e)}")
+            self._generation += 1
+    
+    def upload(self, key, source, content_type):
+        """Store bytes or an open binary file under key; an object already stored under it is kept"""
+        generation = self._generation
+        try:
+            return self._upload(key, source, content_type)
+        except Exception as e:
+            if not _is_bucket_missing(e):
+                raise
+            logger.warning(f"Bucket {self.bucket_name} not found while uploading {key}; creating it and retrying")
+        
+        self._provision(generation)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return self._upload(key, source, content_type)
+    
+    def _upload(self, key, source, content_type):
+        try:
+            # An open file is sent as a streamed multipart body rather than read into memory
+            return admin_supabase.storage.from_(self.bucket_name).upload(
+                key,
+                source,
+                {"content-type": content_type, "cache-control": CACHE_SECONDS}
+            )
+        except Exception as e:
+            # Left in storage by an earlier upload of the same content (e.g. after its references were lost)
+            if not _is_duplicate(e):
+                raise
+            logger.info(f"Image {key} was already in storage")
+    
+    def remove(self, keys):
+        admin_supabase.storage.from_(self.bucket_name).remove(list(keys))
+    
+    def public_url(self, key):
+        return admin_supabase.storage.from_(self.bucket_name).get_public_url(key)
+    
+    def key_from_url(self, image_url):
+        """Object key of a stored image: <sha256 or uuid>/original.<ext>, or <uuid>.<ext> for older uploads"""
+        parts = image_url.split('?', 1)[0].split('/')
+        if variant_base(image_url):
+            return '/'.join(parts[-2:])
+        return parts[-1]
+    
+    def list_names(self, page_size=1000):
+        """
+        Yield (name, modified) for every top-level entry of the bucket, one listing page at a time
+        
+        Names are upload prefixes (modified None; see list_objects) or the keys of
+        UUID-keyed uploads stored before prefixes were used.
+        """
+        bucket = admin_supabase.storage.from_(self.bucket_name)
+        offset = 0
+        while True:
+            page = bucket.list('', {'limit': page_size, 'offset': offset, 'sortBy': {'column': 'name', 'order': 'asc'}})
+            for entry in page:
+                if entry.get('id') is None:
+                    yield entry['name'], None
+                else:
+                    yield entry['name'], _parse_time(entry.get('updated_at') or entry.get('created_at'))
+            if len(page) < page_size:
+                return
+            offset += page_size
+    
+    def list_objects(self, name):
+        """(key, modified) of every object under an upload prefix"""
+        entries = admin_supabase.storage.from_(self.bucket_name).list(name, {'limit': 1000})
+        return [(f"{name}/{entry['name']}", _parse_time(entry.get('updated_at') or entry.get('created_at')))
+                for entry in entries if entry.get('id') is not None]
+    
+    def verify(self):
+        with self._lock:
+            return _verify_bucket(self.bucket_name)
+
+class LocalStorage:
+    """
+    Images in a local directory, served at LOCAL_IMAGE_URL by this app or its front-end proxy
+    
+    An object <sha256>/<name> is stored as <root>/<ab>/<cd>/<sha256>/<name>, where ab and cd
+    are the first four hex digits of the hash, so no directory holds more than a few hundred
+    entries however large the collection grows. Only content-addressed keys are accepted.
+    """
+    
+    name = 'local'
+    
+    _KEY = re.compile(r'^(?P<prefix>[0-9a-f]{64})/(?P<name>[a-z]+\.[a-z0-9]+)$')
+    
+    # Served content types by extension (mimetypes has no AVIF before Python 3.13)
+    _CONTENT_TYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif',
+                      'webp': 'image/webp', 'avif': 'image/avif'}
+    
+    def __init__(self, root, url_prefix):
+        self.root = os.path.abspath(root)
+        self.url_prefix = url_prefix.rstrip('/')
+    
+    def relative_path(self, key):
+        """Sharded path of an object under the root; ValueError for keys this backend cannot hold"""
+        match = self._KEY.match(key or '')
+        if not match:
+            raise ValueError(f"Not a content-addressed image key: {key!r}")
+        prefix = match.group('prefix')
+        return os.path.join(prefix[:2], prefix[2:4], prefix, match.group('name'))
+    
+    def path(self, key):
+        return os.path.join(self.root, self.relative_path(key))
+    
+    def upload(self, key, source, content_type):
+        """
+        Write bytes or an open binary file under key
+        
+        The data goes to a temporary file in the target directory, is flushed to disk and
+        then renamed over the final name, so readers never see a partial file. Objects are
+        never rewritten: if the file already exists the upload is skipped.
+        """
+        path = self.path(key)
+        if os.path.exists(path):
+            logger.info(f"Image {key} was already in storage")
+            return
+        
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, part_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if isinstance(source, (bytes, bytearray)):
+                    out.write(source)
+                else:
+                    shutil.copyfileobj(source, out, Config.UPLOAD_CHUNK_SIZE)
+                out.flush()
+                os.fsync(out.fileno())
+            # mkstemp creates the file readable by its owner only; the proxy may run as another user
+            os.chmod(part_path, 0o644)
+            os.replace(part_path, path)
+        except BaseException:
+            try:
+                os.remove(part_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def remove(self, keys):
+        directories = set()
+        for key in keys:
+            try:
+                path = self.path(key)
+            except ValueError:
+                logger.warning(f"Not removing {key!r}: not a local image key")
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            directories.add(os.path.dirname(path))
+        
+        # Prune the object's directory and any shard directories it leaves empty
+        for directory in directories:
+            while directory != self.root and directory.startswith(self.root):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+    
+    def public_url(self, key):
+        return f"{self.url_prefix}/{key}"
+    
+    def list_names(self, page_size=1000):
+        """Yield (sha256, None) for every stored image, walking the shard directories in order"""
+        for shard in _sorted_dirs(self.root):
+            for subshard in _sorted_dirs(shard):
+                for prefix in _sorted_dirs(subshard):
+                    yield os.path.basename(prefix), None
+    
+    def list_objects(self, name):
+        """(key, modified) of every object stored under a content hash"""
+        directory = os.path.join(self.root, name[:2], name[2:4], name)
+        objects = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                key = f"{name}/{entry.name}"
+                # Skips temporary files of writes in progress
+                if self._KEY.match(key) and entry.is_file():
+                    objects.append((key, datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc)))
+        return objects
+    
+    def key_from_url(self, image_url):
+        return '/'.join(image_url.split('?', 1)[0].split('/')[-2:])
+    
+    def verify(self):
+        """Check the image directory exists and is writable"""
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            if not os.access(self.root, os.W_OK | os.X_OK):
+                logger.error(f"Image directory {self.root} is not writable")
+                return False
+            logger.info(f"Storing images in {self.root}")
+            return True
+        except Exception as e:
+            logger.error(f"Error verifying image directory {self.root}: {str(e)}")
+            return False
+    
+    def serve(self, key):
+        """
+        Response for GET <LOCAL_IMAGE_URL>/<key>, according to Config.LOCAL_IMAGE_SERVE
+        
+        'x-accel-redirect' (nginx) and 'x-sendfile' (Apache, lighttpd) send an empty
+        response with a header telling the proxy which file to send; 'send_file' sends
+        it from the worker through wsgi.file_wrapper, which Gunicorn and uWSGI turn into
+        sendfile(2) so the bytes are never copied through Python.
+        """
+        from flask import Response, abort, send_file
+        
+        try:
+            relative = self.relative_path(key)
+        except ValueError:
+            abort(404)
+        path = os.path.join(self.root, relative)
+        if not os.path.isfile(path):
+            abort(404)
+        
+        content_type = self._CONTENT_TYPES.get(key.rsplit('.', 1)[-1], 'application/octet-stream')
+        etag = storage_etag(key).strip('"')
+        mode = Config.LOCAL_IMAGE_SERVE
+        
+        if mode == 'x-accel-redirect':
+            response = Response(mimetype=content_type)
+            # An internal nginx location aliased to the image directory
+            response.headers['X-Accel-Redirect'] = f"{Config.LOCAL_IMAGE_ACCEL_PREFIX.rstrip('/')}/{relative.replace(os.sep, '/')}"
+            response.set_etag(etag)
+        elif mode == 'x-sendfile':
+            response = Response(mimetype=content_type)
+            response.headers['X-Sendfile'] = path
+            response.set_etag(etag)
+        else:
+            response = send_file(path, mimetype=content_type, conditional=True, etag=etag, max_age=int(CACHE_SECONDS))
+        
+        # Same headers Supabase sends for its objects: stored content never changes
+        response.cache_control.public = True
+        response.cache_control.max_age = int(CACHE_SECONDS)
+        response.cache_control.immutable = True
+        return response
+
+def _parse_time(value):
+    """Timestamp from a Storage API listing (ISO 8601, 'Z' for UTC)"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+def _sorted_dirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.path for entry in entries if entry.is_dir())
+    except FileNotFoundError:
+        return []
+
+STORAGE_BACKENDS = {'supabase': SupabaseStorage, 'local': LocalStorage}
+
+_storage = None
+
+def get_storage():
+    """The image storage backend named by Config.IMAGE_STORAGE"""
+    global _storage
+    if _storage is None:
+        if Config.IMAGE_STORAGE == 'local':
+            _storage = LocalStorage(Config.LOCAL_IMAGE_DIR, Config.LOCAL_IMAGE_URL)
+        elif Config.IMAGE_STORAGE == 'supabase':
+            _storage = SupabaseStorage()
+        else:
+            raise ValueError(f"Unknown IMAGE_STORAGE {Config.IMAGE_STORAGE!r}; expected one of {sorted(STORAGE_BACKENDS)}")
+    return _storage
+
+def _upload_derivatives(storage, prefix, source):
+    """
+    Encode and upload the thumb/card/detail sizes of an image (bytes or a file path)
+    
+    :return: The formats every size was stored in, preferred first; [] if none were built
+    :raises Exception: If any upload fails (no format is then known to be complete)
+    """
+    try:
+        derivatives = build_derivatives(source)
+    except Exception as e:
+        # Not decodable (or an unsupported format): the original is still served
+        logger.warning(f"Could not build derivatives for {prefix}: {str(e)}")
+        return []
+    
+    # Uploaded concurrently (inline when save_image itself runs inside a fan-out)
+    gather(*[
+        partial(storage.upload, variant_key(prefix, variant, fmt), data, CONTENT_TYPES[fmt])
+        for variant, fmt, data in derivatives
+    ])
+    return list(dict.fromkeys(fmt for _, fmt, _ in derivatives))
+
 def save_image(image_file):
-    """Save an image file to storage and return the URL"""
+    """
+    Save an image file to storage and return the URL of the original
+    
+    The original is stored as-is under <sha256>/original.<ext>; resized WebP/AVIF and
+    JPEG derivatives are stored next to it (see utils/image_variants.py).
+    """
     if not image_file or not image_file.filename:
         logger.info("No image file provided or empty filename")
         return None
-        
+    
     try:
-        # Generate a unique filename
-        original_filename = secure_filename(image_file.filename)
-        file_ext = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else 'png'
-        filename = f"{uuid.uuid4()}.{file_ext}"
-        logger.info(f"Generated filename: {filename}")
+        upload = spool_upload(image_file)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {image_file.filename}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Error reading upload {image_file.filename}: {str(e)}")
+        return None
+    
+    try:
+        return store_upload(upload)
+    finally:
+        upload.discard()
+
+def store_upload(upload):
+    """
+    Upload a spooled image and its derivatives to storage; returns the original's public URL or None
+    
+    Images are keyed by their SHA-256. If the same bytes are already stored, this only
+    takes another reference to them and nothing is transferred. An image another
+    request is still uploading is uploaded here as well (the bytes are identical), so
+    this URL never depends on an upload that may yet fail. The original is streamed
+    from disk, so memory use does not grow with its size.
+    """
+    try:
+        storage = get_storage()
         
-        # Get the file content - rewind the file first to ensure we read from the beginning
-        image_file.seek(0)
-        file_content = image_file.read()
+        references, file_ext, stored, formats = ImageDB.acquire_image(upload.sha256, upload.file_ext, upload.size)
+        filename = original_key(upload.sha256, file_ext)
         
-        # Upload to Supabase Storage
-        bucket_name = 'postcard-images'  # Use the correct bucket name
+        if stored:
+            logger.info(f"Image {filename} already stored ({references} references); skipping upload")
+        else:
+            logger.info(f"Uploading image: {filename} ({upload.size} bytes, {references} references)")
+            try:
+                formats = _upload_objects(storage, upload, filename)
+            except Exception:
+                # Nothing points at a half-uploaded image; the next upload of it starts over
+                ImageDB.release_image(upload.sha256, image_keys(filename))
+                raise
         
-        # Check if the bucket exists, create if not
-        try:
-            buckets = admin_supabase.storage.list_buckets()
-            bucket_exists = any(bucket.name == bucket_name for bucket in buckets)
-            
-            if not bucket_exists:
-                logger.info(f"Creating bucket: {bucket_name}")
-                # Create bucket without the public option for now
-                admin_supabase.storage.create_bucket(bucket_name)
-        except Exception as e:
-            logger.error(f"Error checking/creating bucket: {str(e)}")
-        
-        # Upload the file - use content-type but remove the upsert option
-        storage_response = admin_supabase.storage.from_(bucket_name).upload(
-            filename,
-            file_content,
-            {"content-type": image_file.mimetype}  # Fix: removed upsert option
-        )
-        logger.info(f"Storage response: {storage_response}")
-        
-        # Generate the public URL
-        image_url = admin_supabase.storage.from_(bucket_name).get_public_url(filename)
+        # Generate the public URL; it lists the derivative formats stored, which are all pages offer
+        image_url = with_formats(storage.public_url(filename), formats)
         logger.info(f"Generated public URL: {image_url}")
         
         return image_url
@@ -69,20 +519,52 @@ def save_image(image_file):
         logger.error(traceback.format_exc())
         return None
 
+def _upload_objects(storage, upload, filename):
+    """Upload an image's original and derivatives and record it as stored; returns the derivative formats"""
+    with open(upload.path, 'rb') as file_stream:
+        storage.upload(filename, file_stream, upload.content_type)
+    formats = _upload_derivatives(storage, upload.sha256, upload.path)
+    if not ImageDB.mark_image_stored(upload.sha256, formats):
+        # A deletion sweep claimed these objects before this reference was taken and may
+        # remove them after they were written. Waiting for it would hold up the request
+        # for up to IMAGE_DELETE_LEASE; the upload fails and can be retried once it is done.
+        raise RuntimeError(f"Image {filename} is being deleted from storage; upload it again shortly")
+    return formats
+
+def image_keys(filename):
+    """Storage keys of an original and all of its derivatives"""
+    keys = [filename]
+    if '/' in filename:
+        keys += derivative_keys(filename.split('/', 1)[0])
+    return keys
+
 def delete_image(image_url):
-    """Delete an image from storage"""
+    """
+    Release an image; its objects are queued for deletion once no postcard uses it
+    
+    Nothing is removed from storage here: the image worker removes queued objects in
+    batches after IMAGE_DELETE_DELAY (see utils/image_gc.py), so deleting or editing a
+    postcard costs one database call.
+    """
     if not image_url:
         return False
         
     try:
-        # Extract filename from the URL
-        filename = image_url.split('/')[-1]
-        bucket_name = 'postcard-images'  # Use the correct bucket name
+        # The original and all of its derivatives
+        filename = get_storage().key_from_url(image_url)
+        keys = image_keys(filename)
         
-        # Delete from Supabase Storage
-        admin_supabase.storage.from_(bucket_name).remove(filename)
-        logger.info(f"Deleted image: {filename} from bucket: {bucket_name}")
+        # Content-addressed images stay in storage while other postcards still use them
+        prefix = content_prefix(image_url)
+        if prefix is not None:
+            remaining = ImageDB.release_image(prefix, keys)
+            if remaining > 0:
+                logger.info(f"Image {filename} still has {remaining} references; kept in storage")
+                return True
+        else:
+            ImageDB.queue_deletion(keys)
         
+        logger.info(f"Queued image {filename} for deletion")
         return True
     except Exception as e:
         logger.error(f"Error deleting image: {str(e)}")
@@ -91,9 +573,12 @@ def delete_image(image_url):
         return False
 
 def verify_storage_settings():
+    """Verify the configured image storage is set up so images load properly"""
+    return get_storage().verify()
+
+def _verify_bucket(bucket_name):
     """Verify and update storage settings to ensure images load properly"""
     try:
-        bucket_name = 'postcard-images'
         logger.info(f"Verifying storage settings for bucket: {bucket_name}")
         
         # Get bucket details (this checks if bucket exists)
@@ -157,4 +642,22 @@ def verify_storage_settings():
         logger.error(f"Error verifying storage settings: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
-        return False
\ No newline at end of file
+        return False
+
+def start_storage_check(app):
+    """Run verify_storage_settings() in a background thread once per worker, after its first request"""
+    state = {'started': False, 'pid': None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def _start_storage_check():
+        # Checked per process: a worker forked from a master that already ran it runs it again
+        if state['started'] and state['pid'] == os.getpid():
+            return
+        with lock:
+            if state['started'] and state['pid'] == os.getpid():
+                return
+            state['started'], state['pid'] = True, os.getpid()
+
+        thread = threading.Thread(target=verify_storage_settings, name='storage-check', daemon=True)
+        thread.start()
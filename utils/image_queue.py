@@ -0,0 +1,475 @@
+# utils/image_queue.py
+# Local job queue for image processing. Upload requests only spool the raw file
+# to IMAGE_QUEUE_DIR and add a row to a SQLite database there; `flask image-worker`
+# decodes, builds derivatives, uploads and points the postcard at the new image
+# from a pool of worker processes. Web workers and the image worker must run on
+# the same host (or share IMAGE_QUEUE_DIR). No external broker is needed.
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from config import Config
+from utils.percentile import percentile
+
+logger = logging.getLogger(__name__)
+
+SIDES = ('front', 'back')
+
+# Job states; 'superseded' jobs were replaced by a newer upload of the same side
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'superseded')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    postcard_id TEXT NOT NULL,
+    side TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_ext TEXT NOT NULL,
+    content_type TEXT,
+    sha256 TEXT,
+    byte_size INTEGER,
+    image_url TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_image_jobs_status ON image_jobs(status, id);
+CREATE INDEX IF NOT EXISTS idx_image_jobs_postcard ON image_jobs(postcard_id, id);
+"""
+
+# Columns added after the first release of the table: (name, type)
+_ADDED_COLUMNS = (('sha256', 'TEXT'), ('byte_size', 'INTEGER'), ('image_url', 'TEXT'))
+
+# Database files whose schema this process has already created
+_initialized = set()
+
+
+def _spool_dir():
+    return os.path.join(Config.IMAGE_QUEUE_DIR, 'spool')
+
+
+@contextmanager
+def _db():
+    """Short-lived connection to the queue database (none stays open across a fork)"""
+    path = os.path.join(Config.IMAGE_QUEUE_DIR, 'queue.sqlite3')
+    if path not in _initialized:
+        os.makedirs(_spool_dir(), exist_ok=True)
+
+    # Autocommit; multi-statement changes use an explicit BEGIN IMMEDIATE
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        if path not in _initialized:
+            # WAL lets web workers enqueue while the image worker reads
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            existing = {row['name'] for row in conn.execute('PRAGMA table_info(image_jobs)')}
+            for column, column_type in _ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE image_jobs ADD COLUMN {column} {column_type}')
+            _initialized.add(path)
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _transaction(conn):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def _remove_spool(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def submitted_images(files):
+    """The non-empty front_image/back_image uploads of a request, by side"""
+    uploads = {}
+    for side in SIDES:
+        image_file = files.get(f'{side}_image')
+        if image_file and image_file.filename:
+            uploads[side] = image_file
+    return uploads
+
+
+def enqueue_image(postcard_id, side, image_file):
+    """
+    Spool an uploaded image to disk and queue it for the image worker
+
+    The file is copied, hashed and type-checked in fixed-size chunks
+    (utils.image_handler.spool_upload); the row is only added once it is complete.
+
+    :return: The job id
+    :raises utils.image_handler.UploadRejected: If the file is too large or not an allowed image
+    """
+    from utils.image_handler import spool_upload
+
+    if side not in SIDES:
+        raise ValueError(f"Unknown image side: {side!r} (expected one of {', '.join(SIDES)})")
+
+    with _db() as conn:
+        upload = spool_upload(image_file, _spool_dir())
+        now = time.time()
+        try:
+            cursor = conn.execute(
+                'INSERT INTO image_jobs (postcard_id, side, path, file_ext, content_type, sha256, byte_size, '
+                'enqueued_at, available_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(postcard_id), side, upload.path, upload.file_ext, upload.content_type, upload.sha256,
+                 upload.size, now, now)
+            )
+        except Exception:
+            upload.discard()
+            raise
+        return cursor.lastrowid
+
+
+def claim_jobs(limit):
+    """
+    Mark up to `limit` queued jobs as running and return them
+
+    Only one job per postcard side runs at a time, so uploads are applied in the
+    order they were made; older queued uploads of a side are superseded by the newest.
+    """
+    if limit <= 0:
+        return []
+
+    now = time.time()
+    claimed, superseded = [], []
+    with _db() as conn, _transaction(conn):
+        busy = {(row['postcard_id'], row['side']) for row in conn.execute(
+            "SELECT postcard_id, side FROM image_jobs WHERE status = 'running'"
+        )}
+        latest = {}
+        for row in conn.execute("SELECT * FROM image_jobs WHERE status = 'queued' ORDER BY id"):
+            key = (row['postcard_id'], row['side'])
+            if key in busy:
+                continue
+            if key in latest:
+                superseded.append(latest[key])
+            latest[key] = row
+
+        # The newest upload of a side waits out its retry delay; older ones are dropped regardless
+        latest = {key: row for key, row in latest.items() if row['available_at'] <= now}
+
+        for row in superseded:
+            conn.execute(
+                "UPDATE image_jobs SET status = 'superseded', finished_at = ? WHERE id = ?", (now, row['id'])
+            )
+        for row in sorted(latest.values(), key=lambda row: row['id'])[:limit]:
+            conn.execute(
+                "UPDATE image_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (now, row['id'])
+            )
+            claimed.append(dict(row, status='running', started_at=now, attempts=row['attempts'] + 1))
+
+    for row in superseded:
+        _remove_spool(row['path'])
+        _release_result(row)
+    return claimed
+
+
+def finish_job(job, error=None):
+    """
+    Record the outcome of a claimed job; failed jobs are retried up to IMAGE_JOB_ATTEMPTS
+    times, waiting 10s, 20s, 40s... between attempts
+
+    :return: The job's new status ('done', 'queued' or 'failed')
+    """
+    if error is None:
+        status = 'done'
+    elif job['attempts'] < Config.IMAGE_JOB_ATTEMPTS:
+        status = 'queued'
+    else:
+        status = 'failed'
+
+    now = time.time()
+    with _db() as conn:
+        conn.execute(
+            'UPDATE image_jobs SET status = ?, error = ?, finished_at = ?, available_at = ? WHERE id = ?',
+            (status, None if error is None else str(error), None if status == 'queued' else now,
+             now + 10 * 2 ** (job['attempts'] - 1), job['id'])
+        )
+    if status != 'queued':
+        _remove_spool(job['path'])
+    return status
+
+
+def release_jobs(jobs):
+    """Put claimed jobs back in the queue without counting the attempt (worker shutting down)"""
+    with _db() as conn:
+        conn.executemany(
+            "UPDATE image_jobs SET status = 'queued', attempts = attempts - 1 WHERE id = ? AND status = 'running'",
+            [(job['id'],) for job in jobs]
+        )
+
+
+def image_status(postcard_id, job_id=None, outcome=None):
+    """
+    The image_status a postcard should have given its jobs: 'processing' while any
+    is queued or running, 'failed' if the latest finished job of a side failed,
+    otherwise 'ready'
+
+    :param job_id: A running job to count as having finished with `outcome`
+    """
+    pending = False
+    latest = {}
+    with _db() as conn:
+        rows = conn.execute(
+            "SELECT id, side, status FROM image_jobs WHERE postcard_id = ? AND status != 'superseded' ORDER BY id",
+            (str(postcard_id),)
+        ).fetchall()
+
+    for row in rows:
+        status = outcome if row['id'] == job_id else row['status']
+        if status in ('queued', 'running'):
+            pending = True
+        else:
+            latest[row['side']] = status
+
+    if pending:
+        return 'processing'
+    return 'failed' if 'failed' in latest.values() else 'ready'
+
+
+def requeue_stale(timeout=None):
+    """Put back jobs left running by a worker that died; returns how many"""
+    timeout = Config.IMAGE_JOB_TIMEOUT if timeout is None else timeout
+    with _db() as conn:
+        cursor = conn.execute(
+            "UPDATE image_jobs SET status = 'queued' WHERE status = 'running' AND started_at < ?",
+            (time.time() - timeout,)
+        )
+        return cursor.rowcount
+
+
+def prune_jobs(retention=None):
+    """Delete finished jobs older than IMAGE_JOB_RETENTION seconds (failed jobs are kept)"""
+    retention = Config.IMAGE_JOB_RETENTION if retention is None else retention
+    with _db() as conn:
+        cursor = conn.execute(
+            "DELETE FROM image_jobs WHERE status IN ('done', 'superseded') AND finished_at < ?",
+            (time.time() - retention,)
+        )
+        return cursor.rowcount
+
+
+def queue_stats(window=3600):
+    """
+    Queue depth and job latency for the admin dashboard
+
+    wait is enqueue -> start, latency is enqueue -> finished, both in seconds over
+    jobs completed in the last `window` seconds.
+    """
+    now = time.time()
+    with _db() as conn:
+        counts = dict(conn.execute('SELECT status, COUNT(*) FROM image_jobs GROUP BY status').fetchall())
+        oldest = conn.execute("SELECT MIN(enqueued_at) FROM image_jobs WHERE status = 'queued'").fetchone()[0]
+        finished = conn.execute(
+            "SELECT enqueued_at, started_at, finished_at FROM image_jobs WHERE status = 'done' AND finished_at >= ?",
+            (now - window,)
+        ).fetchall()
+
+    waits = [row['started_at'] - row['enqueued_at'] for row in finished]
+    latencies = [row['finished_at'] - row['enqueued_at'] for row in finished]
+    return {
+        'queued': counts.get('queued', 0),
+        'running': counts.get('running', 0),
+        'failed': counts.get('failed', 0),
+        'oldest_queued_age': now - oldest if oldest is not None else 0.0,
+        'completed': len(finished),
+        'window': window,
+        'wait_p50': percentile(waits, 50),
+        'wait_p95': percentile(waits, 95),
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95)
+    }
+
+
+def process_job(job):
+    """Upload a spooled image and its derivatives; returns the original's URL (runs in a pool process)"""
+    from utils.image_handler import SpooledUpload, store_upload
+
+    if job.get('image_url'):
+        # Stored by an earlier attempt, which holds the image's reference
+        return job['image_url']
+
+    upload = SpooledUpload(job['path'], job['sha256'], job['byte_size'], job['file_ext'], job['content_type'])
+    if upload.sha256 is None:
+        # Queued before hashes were recorded
+        upload.sha256, upload.size = _hash_file(upload.path)
+    image_url = store_upload(upload)
+    if image_url is None:
+        raise RuntimeError('Image upload failed; see the log above')
+    return image_url
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(Config.UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _record_result(job, image_url):
+    """Keep a stored image's URL on its job, so a retry reuses it rather than taking another reference"""
+    with _db() as conn:
+        conn.execute('UPDATE image_jobs SET image_url = ? WHERE id = ?', (image_url, job['id']))
+    job['image_url'] = image_url
+
+
+def _release_result(job):
+    """Drop the reference held by a job's stored image that will not be attached"""
+    from utils.backend import PostcardDB
+    from utils.image_handler import delete_image
+
+    if not job['image_url']:
+        return
+    # An attempt that failed after updating the row left the image in use
+    postcard = PostcardDB.get_postcard(job['postcard_id'], cached=False)
+    if not postcard or postcard.get(f"{job['side']}_image_url") != job['image_url']:
+        delete_image(job['image_url'])
+
+
+def _attach_image(job, image_url):
+    """Point the postcard at its new image and delete the one it replaces"""
+    from utils.backend import PostcardDB
+    from utils.image_handler import delete_image
+
+    # Read the row as it is now, not this process's cached copy
+    postcard = PostcardDB.get_postcard(job['postcard_id'], cached=False)
+    if not postcard:
+        # Deleted while its image was queued
+        delete_image(image_url)
+        return
+
+    column = f"{job['side']}_image_url"
+    PostcardDB.update_postcard(job['postcard_id'], {
+        column: image_url,
+        'image_status': image_status(job['postcard_id'], job['id'], 'done')
+    })
+    # Already attached by an earlier attempt: the row no longer names the image it replaced
+    if postcard.get(column) and postcard[column] != image_url:
+        # Releases the old image's reference (only that, if the same scan was uploaded again)
+        delete_image(postcard[column])
+
+
+def complete_job(job, image_url=None, error=None):
+    """Apply a processed job's result to its postcard and record the outcome; returns the job status"""
+    from utils.backend import PostcardDB
+
+    if error is None:
+        try:
+            _record_result(job, image_url)
+            _attach_image(job, image_url)
+        except Exception as e:
+            error = e
+
+    status = finish_job(job, error)
+    elapsed = time.time() - job['enqueued_at']
+    if status == 'done':
+        logger.info(f"Image job {job['id']} ({job['side']} of {job['postcard_id']}) done {elapsed:.1f}s after upload")
+    elif status == 'queued':
+        logger.warning(f"Image job {job['id']} failed (attempt {job['attempts']}), will retry: {error}")
+    else:
+        logger.error(f"Image job {job['id']} failed after {job['attempts']} attempts: {error}")
+        try:
+            _release_result(job)
+            PostcardDB.update_postcard(job['postcard_id'], {'image_status': image_status(job['postcard_id'])})
+        except Exception as e:
+            logger.error(f"Error marking images of {job['postcard_id']} as failed: {str(e)}")
+    return status
+
+
+def run_worker(processes=None, poll_interval=1.0, once=False):
+    """
+    Process queued image jobs until interrupted (or, with once=True, until no job is ready to
+    run; jobs waiting to be retried stay queued)
+
+    Decoding, resizing and uploads run in `processes` worker processes (0 runs them
+    in this process); results are written to the database from this one.
+
+    :return: Number of jobs that finished (done or failed)
+    """
+    from utils.image_gc import sweep_deletions
+
+    processes = Config.IMAGE_WORKER_PROCESSES if processes is None else processes
+    executor = ProcessPoolExecutor(max_workers=processes) if processes > 0 else None
+    running = {}
+    finished = 0
+    last_maintenance = 0.0
+    last_sweep = 0.0
+
+    try:
+        while True:
+            if time.monotonic() - last_maintenance > 60:
+                requeue_stale()
+                prune_jobs()
+                last_maintenance = time.monotonic()
+
+            if time.monotonic() - last_sweep > Config.IMAGE_DELETE_INTERVAL:
+                try:
+                    # A few batches at a time so a long backlog does not hold up uploads
+                    sweep_deletions(max_batches=10)
+                except Exception as e:
+                    logger.error(f"Error sweeping image deletions: {str(e)}")
+                last_sweep = time.monotonic()
+
+            jobs = claim_jobs(max(processes, 1) - len(running))
+            for job in jobs:
+                if executor is None:
+                    try:
+                        image_url, error = process_job(job), None
+                    except Exception as e:
+                        image_url, error = None, e
+                    finished += complete_job(job, image_url, error) != 'queued'
+                else:
+                    running[executor.submit(process_job, job)] = job
+
+            if running:
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        image_url, error = future.result(), None
+                    except BrokenProcessPool as e:
+                        # A pool process died (e.g. out of memory on a huge scan)
+                        image_url, error, broken = None, e, True
+                    except Exception as e:
+                        image_url, error = None, e
+                    finished += complete_job(job, image_url, error) != 'queued'
+                if broken:
+                    for future, job in running.items():
+                        finished += complete_job(job, None, BrokenProcessPool('Worker process died')) != 'queued'
+                    running.clear()
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(max_workers=processes)
+            elif not jobs:
+                if once:
+                    return finished
+                time.sleep(poll_interval)
+    finally:
+        if running:
+            release_jobs(running.values())
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
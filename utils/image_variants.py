@@ -0,0 +1,177 @@
+# utils/image_variants.py
+# Resized derivatives of uploaded scans. Every upload is stored under its own
+# prefix: the untouched original as <id>/original.<ext> and one file per size and
+# format as <id>/<variant>.<ext>, so any URL can be derived from the original's.
+# The prefix is the SHA-256 of the original's bytes (older uploads used a random
+# UUID), so identical scans share one set of objects. The formats the derivatives
+# were stored in are recorded on image_objects and in the original's URL
+# (?formats=webp,jpeg); pages only offer those, and a plain <img> without it.
+import io
+import re
+from urllib.parse import parse_qs, urlsplit
+from config import Config
+
+# Variant name -> maximum width in pixels (smaller scans are not upscaled)
+VARIANTS = {
+    'thumb': 200,
+    'card': 400,
+    'detail': 1200
+}
+
+FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+CONTENT_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+SAVE_OPTIONS = {
+    'avif': {'quality': 55, 'speed': 8},
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True}
+}
+
+# URL of an original stored by save_image(): .../<prefix>/original.<ext>
+_ORIGINAL_URL = re.compile(r'^(?P<base>.+)/original\.[A-Za-z0-9]+$')
+
+# Prefix of a content-addressed upload
+_CONTENT_PREFIX = re.compile(r'^[0-9a-f]{64}$')
+
+# Spellings of one format, so the same bytes always get the same key
+_EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+
+def derivative_formats():
+    """Formats each variant is encoded in: Config.IMAGE_FORMATS, then the JPEG fallback"""
+    formats = [fmt for fmt in Config.IMAGE_FORMATS if fmt in FORMAT_EXTENSIONS and fmt != 'jpeg']
+    return formats + ['jpeg']
+
+
+def normalize_extension(ext):
+    ext = (ext or 'png').lower()
+    return _EXTENSION_ALIASES.get(ext, ext)
+
+
+def content_prefix(url_or_key):
+    """The SHA-256 prefix of a content-addressed image URL or key, or None for UUID-keyed uploads"""
+    parts = (url_or_key or '').split('?', 1)[0].split('/')
+    if len(parts) >= 2 and _CONTENT_PREFIX.match(parts[-2]):
+        return parts[-2]
+    return None
+
+
+def storage_etag(url_or_key):
+    """
+    Strong ETag for a content-addressed object (an original or one of its derivatives)
+
+    Objects under a content hash are written once and never replaced, so the hash
+    plus the object's name identifies its bytes exactly. None for other keys.
+    """
+    prefix = content_prefix(url_or_key)
+    if prefix is None:
+        return None
+    name = url_or_key.split('?', 1)[0].rsplit('/', 1)[-1]
+    return f'"{prefix}"' if name.startswith('original.') else f'"{prefix}-{name}"'
+
+
+def original_key(prefix, ext):
+    return f'{prefix}/original.{ext}'
+
+
+def variant_key(prefix, variant, fmt):
+    return f'{prefix}/{variant}.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def derivative_keys(prefix):
+    """Storage keys of every derivative of one upload"""
+    return [variant_key(prefix, variant, fmt) for variant in VARIANTS for fmt in FORMAT_EXTENSIONS]
+
+
+def with_formats(url, formats):
+    """An original's URL recording the derivative formats stored for it"""
+    if not formats:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}formats={','.join(formats)}"
+
+
+def stored_formats(url):
+    """Derivative formats recorded in an image URL by with_formats(), preferred first"""
+    formats = parse_qs(urlsplit(url or '').query).get('formats', [''])[0].split(',')
+    return [fmt for fmt in formats if fmt in FORMAT_EXTENSIONS]
+
+
+def variant_base(url):
+    """The URL prefix shared by an image's derivatives, or None for images stored before derivatives existed"""
+    match = _ORIGINAL_URL.match((url or '').split('?', 1)[0])
+    return match.group('base') if match else None
+
+
+def variant_url(url, variant, fmt='jpeg'):
+    """URL of one derivative of an original image URL (the original itself if it was not stored in fmt)"""
+    base = variant_base(url)
+    if base is None or variant == 'original' or fmt not in stored_formats(url):
+        return url
+    return f'{base}/{variant}.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def variant_srcset(url, fmt='jpeg'):
+    """srcset value listing every size of an image in one format; '' if it was not stored in fmt"""
+    base = variant_base(url)
+    if base is None or fmt not in stored_formats(url):
+        return ''
+    return ', '.join(f'{base}/{variant}.{FORMAT_EXTENSIONS[fmt]} {width}w' for variant, width in VARIANTS.items())
+
+
+def _prepare(image):
+    """Apply EXIF orientation and bring the image into a mode every output format accepts"""
+    from PIL import ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def _encode(image, fmt, icc_profile):
+    if fmt == 'jpeg' and image.mode == 'RGBA':
+        # JPEG has no alpha; flatten onto white
+        from PIL import Image
+        flattened = Image.new('RGB', image.size, (255, 255, 255))
+        flattened.paste(image, mask=image.getchannel('A'))
+        image = flattened
+
+    buffer = io.BytesIO()
+    options = dict(SAVE_OPTIONS[fmt])
+    if icc_profile:
+        # Keep the colour profile; EXIF, XMP and other metadata are not written
+        options['icc_profile'] = icc_profile
+    image.save(buffer, format=fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_derivatives(source):
+    """
+    Decode an uploaded image (bytes or a file path) and encode every variant in every derivative format
+
+    :return: List of (variant, format, bytes), largest variant first
+    :raises OSError: If the data is not an image Pillow can decode
+    """
+    from PIL import Image
+
+    formats = derivative_formats()
+    largest = max(VARIANTS.values())
+
+    # A path is read by the decoder as it goes rather than loaded up front
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as original:
+        # Let the JPEG decoder downscale while decoding; only the largest variant's size is needed
+        original.draft('RGB', (largest * 2, largest * 2))
+        icc_profile = original.info.get('icc_profile')
+        image = _prepare(original)
+
+    derivatives = []
+    for variant, width in sorted(VARIANTS.items(), key=lambda item: item[1], reverse=True):
+        if image.width > width:
+            # Resize from the previous (larger) step so each variant costs less than the last
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in formats:
+            derivatives.append((variant, fmt, _encode(image, fmt, icc_profile)))
+    return derivatives
@@ -0,0 +1,301 @@
+# utils/importer.py
+# Bulk ingest of postcards from a CSV or NDJSON manifest plus a directory of scans.
+# Manifest columns: title (required), description, era, type, manufacturer,
+# is_posted, is_written, tags (comma-separated or a JSON list), front_image and
+# back_image (paths relative to the image directory).
+import csv
+import json
+import logging
+import mimetypes
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.datastructures import FileStorage
+from utils.image_handler import save_image, delete_image, allowed_file
+from utils.tags import normalize_tag_names
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Postcard ids are derived from (manifest, line) so re-importing a batch after a
+# crash inserts nothing twice
+IMPORT_NAMESPACE = uuid.UUID('6f1c2e8a-3b0d-4f5e-9a7c-1d2e3f405162')
+
+IMAGE_FIELDS = ('front_image', 'back_image')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't', 'on'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n', 'f', 'off'}
+
+
+class ImportStats:
+    """Counters and throughput for one import run"""
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0  # already present from an earlier, interrupted run
+        self.failed = 0
+        self.image_bytes = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def report(self):
+        elapsed = self.elapsed or 1e-9
+        return (
+            f"Imported {self.imported} postcards ({self.skipped} already present, {self.failed} failed) "
+            f"in {elapsed:.1f}s: {self.imported / elapsed:.1f} cards/sec, "
+            f"{self.image_bytes / elapsed / (1024 * 1024):.2f} MB/sec of images"
+        )
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'image_bytes': self.image_bytes
+        }
+
+
+def read_manifest(path):
+    """Yield (line number, row dict) from a .csv or .ndjson/.jsonl manifest without loading it whole"""
+    ext = os.path.splitext(path)[1].lower()
+
+    with open(path, newline='', encoding='utf-8') as manifest:
+        if ext == '.csv':
+            reader = csv.DictReader(manifest)
+            for row in reader:
+                yield reader.line_num, row
+        elif ext in ('.ndjson', '.jsonl'):
+            for line_number, line in enumerate(manifest, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, {'_error': f"invalid JSON: {e}"}
+        else:
+            raise ValueError(f"Unsupported manifest type {ext!r} (expected .csv, .ndjson or .jsonl)")
+
+
+def _parse_bool(value, field):
+    if isinstance(value, bool):
+        return value
+    text = str(value if value is not None else '').strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"{field} must be true or false, got {value!r}")
+
+
+def _image_path(image_dir, relative, field):
+    """Resolve a manifest image path, refusing anything outside image_dir"""
+    root = os.path.realpath(image_dir)
+    path = os.path.realpath(os.path.join(root, relative))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{field} points outside the image directory: {relative!r}")
+    if not allowed_file(path):
+        raise ValueError(f"{field} has an unsupported file type: {relative!r}")
+    if not os.path.isfile(path):
+        raise ValueError(f"{field} not found: {relative!r}")
+    return path
+
+
+def validate_row(row, eras, types, image_dir):
+    """
+    Turn a manifest row into (postcard data, tag names, {image field: path})
+
+    :raises ValueError: With a message naming the offending field
+    """
+    if '_error' in row:
+        raise ValueError(row['_error'])
+
+    title = (row.get('title') or '').strip()
+    if not title:
+        raise ValueError("title is required")
+
+    era = (row.get('era') or '').strip() or None
+    if era and era not in eras:
+        raise ValueError(f"unknown era {era!r}")
+
+    postcard_type = (row.get('type') or '').strip() or None
+    if postcard_type and postcard_type not in types:
+        raise ValueError(f"unknown type {postcard_type!r}")
+
+    tags = row.get('tags') or []
+    postcard = {
+        'title': title[:255],
+        'description': (row.get('description') or '').strip() or None,
+        'era': era,
+        'type': postcard_type,
+        'manufacturer': ((row.get('manufacturer') or '').strip() or None),
+        'is_posted': _parse_bool(row.get('is_posted'), 'is_posted'),
+        'is_written': _parse_bool(row.get('is_written'), 'is_written')
+    }
+
+    images = {}
+    for field in IMAGE_FIELDS:
+        if row.get(field):
+            images[field] = _image_path(image_dir, row[field], field)
+
+    return postcard, normalize_tag_names(tags), images
+
+
+def _upload(path):
+    """Upload one scan through the normal storage path; returns (url, bytes)"""
+    with open(path, 'rb') as stream:
+        image = FileStorage(
+            stream=stream,
+            filename=os.path.basename(path),
+            content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        return save_image(image), os.path.getsize(path)
+
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def save_checkpoint(path, data):
+    """Write the checkpoint atomically so a crash never leaves it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _batches(rows, size):
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_postcards(manifest, image_dir, postcard_db, tag_db, status='staged', user_id=None,
+                     batch_size=200, workers=8, checkpoint_path=None, restart=False, echo=print):
+    """
+    Import every row of a manifest, batch by batch
+
+    Scans are uploaded concurrently (at most `workers` at a time) through
+    utils.image_handler.save_image; each batch's postcards and tag links are then
+    written with one multi-row insert each. After every batch the last manifest
+    line handled is saved to `checkpoint_path`, and a re-run resumes after it.
+    Rows of an interrupted batch that were inserted are skipped before their
+    scans are uploaded; the rest are uploaded again.
+
+    :return: ImportStats
+    """
+    manifest_key = os.path.abspath(manifest)
+    eras = set(postcard_db.get_postcard_eras())
+    types = set(postcard_db.get_postcard_types())
+
+    # Throughput is reported for this run; the checkpoint carries totals across runs
+    stats = ImportStats()
+    resume_after = 0
+    previous = {}
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint and checkpoint.get('manifest') == manifest_key:
+        resume_after = checkpoint['line']
+        previous = checkpoint.get('totals', {})
+        echo(f"Resuming after manifest line {resume_after}")
+
+    pending = ((line, row) for line, row in read_manifest(manifest) if line > resume_after)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in _batches(pending, batch_size):
+            # Validate first so bad rows never cost an upload
+            valid = []
+            for line, row in batch:
+                try:
+                    valid.append((line,) + validate_row(row, eras, types, image_dir))
+                except ValueError as e:
+                    stats.failed += 1
+                    stats.errors.append((line, str(e)))
+
+            # Rows inserted before an interruption keep the scans they were uploaded with
+            ids = {line: str(uuid.uuid5(IMPORT_NAMESPACE, f"{manifest_key}:{line}")) for line, *_ in valid}
+            existing = postcard_db.existing_postcard_ids(list(ids.values()))
+            stats.skipped += sum(ids[line] in existing for line, *_ in valid)
+            valid = [item for item in valid if ids[item[0]] not in existing]
+
+            uploads = {
+                (line, field): pool.submit(_upload, path)
+                for line, _, _, images in valid
+                for field, path in images.items()
+            }
+
+            postcards = []
+            links = []
+            for line, postcard, tag_names, images in valid:
+                # Every scan of the row is waited for, so one that failed can't hide another that was stored
+                results, errors = {}, []
+                for field in images:
+                    try:
+                        url, size = uploads[(line, field)].result()
+                    except Exception as e:
+                        errors.append(str(e))
+                        continue
+                    if url:
+                        results[field] = (url, size)
+                    else:
+                        errors.append(f"{field} upload failed")
+
+                if errors:
+                    # Don't leave the row's other scan behind in storage
+                    for url, _ in results.values():
+                        delete_image(url)
+                    stats.failed += 1
+                    stats.errors.append((line, '; '.join(errors)))
+                    continue
+
+                for field, (url, size) in results.items():
+                    postcard[f'{field}_url'] = url
+                    stats.image_bytes += size
+
+                postcard_id = ids[line]
+                postcards.append(dict(
+                    {'front_image_url': None, 'back_image_url': None}, id=postcard_id,
+                    user_id=user_id, status=status, **postcard
+                ))
+                links.extend((postcard_id, name) for name in tag_names)
+
+            inserted = set(postcard_db.create_postcards(postcards))
+            stats.imported += len(inserted)
+            stats.skipped += len(postcards) - len(inserted)
+
+            # Another run inserted these since the check: release the references just taken
+            for postcard in postcards:
+                if postcard['id'] not in inserted:
+                    for field in IMAGE_FIELDS:
+                        delete_image(postcard[f'{field}_url'])
+            links = [(postcard_id, name) for postcard_id, name in links if postcard_id in inserted]
+
+            # One upsert resolves every tag named in the batch, then one insert links them
+            if links:
+                tags = tag_db.upsert_tags(sorted({name for _, name in links}))
+                tag_ids = {tag['name'].lower(): tag['id'] for tag in tags}
+                tag_db.link_tags_to_postcards([
+                    (postcard_id, tag_ids[name.lower()])
+                    for postcard_id, name in links if name.lower() in tag_ids
+                ])
+
+            last_line = batch[-1][0]
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, {
+                    'manifest': manifest_key,
+                    'line': last_line,
+                    'totals': {key: previous.get(key, 0) + value for key, value in stats.to_dict().items()}
+                })
+            echo(f"Line {last_line}: {stats.imported} imported, {stats.failed} failed")
+
+    return stats
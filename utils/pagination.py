@@ -0,0 +1,157 @@
+# utils/pagination.py
+# Keyset (cursor) pagination over (created_at, id), newest first. Cursors are
+# opaque URL-safe tokens so links keep working whatever filters are applied.
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(row):
+    """Build an opaque cursor token from a row's (created_at, id)"""
+    created_at = row.get('created_at')
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+
+    raw = json.dumps([created_at, str(row.get('id'))], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (created_at, id) for a cursor token, or None if it is missing or malformed"""
+    if not token:
+        return None
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        # Validate both parts so they are safe to embed in a PostgREST filter
+        datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        return created_at, str(uuid.UUID(str(row_id)))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def encode_rank_cursor(row):
+    """Build a cursor token from a search result's (rank, id)"""
+    raw = json.dumps([float(row['rank']), str(row['id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_rank_cursor(token):
+    """Return (rank, id) for a search cursor token, or None if it is missing or malformed"""
+    if not token:
+        return None
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        rank, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return float(rank), str(uuid.UUID(str(row_id)))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _seek(after=None, before=None):
+    """Return (key, backwards) for the cursor in effect; 'after' wins if both are given"""
+    key = decode_cursor(after)
+    if key:
+        return key, False
+
+    key = decode_cursor(before)
+    return key, key is not None
+
+
+def apply_supabase_page(query, limit, offset=0, after=None, before=None):
+    """
+    Order a PostgREST query newest-first and restrict it to one page
+
+    :param after: Cursor token; return rows older than it
+    :param before: Cursor token; return rows newer than it (in ascending order,
+                   callers reverse them with order_page_rows)
+    :param offset: Fallback offset used only when no cursor is given
+    """
+    key, ascending = _seek(after, before)
+
+    if key:
+        created_at, row_id = key
+        op = 'gt' if ascending else 'lt'
+        # This postgrest client has no or_() helper, so add the filter parameter directly
+        query.params = query.params.add(
+            'or',
+            f'(created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{row_id}))'
+        )
+    elif offset > 0:
+        query.params = query.params.add('offset', offset)
+
+    # PostgREST takes a single comma-separated order parameter
+    direction = 'asc' if ascending else 'desc'
+    query.params = query.params.add('order', f'created_at.{direction},id.{direction}')
+    return query.limit(limit)
+
+
+def keyset_sql(after=None, before=None):
+    """
+    SQL equivalent of apply_supabase_page for the postgres backend
+
+    Returns (condition or None, params, order_by) for a (created_at, id) seek.
+    """
+    key, ascending = _seek(after, before)
+
+    direction = 'ASC' if ascending else 'DESC'
+    order_by = f'created_at {direction}, id {direction}'
+
+    if not key:
+        return None, [], order_by
+
+    op = '>' if ascending else '<'
+    return f'(created_at, id) {op} (%s::timestamptz, %s::uuid)', list(key), order_by
+
+
+def order_page_rows(rows, after=None, before=None):
+    """Put rows fetched for a 'before' cursor back into newest-first order"""
+    if _seek(after, before)[1]:
+        return list(reversed(rows))
+    return rows
+
+
+class Page:
+    """One page of rows plus the cursors for its neighbours"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def build_page(rows, per_page, after=None, before=None, page=1):
+    """
+    Turn rows fetched with limit=per_page + 1 into a Page
+
+    The extra row only signals that another page exists in the direction of travel.
+    """
+    has_more = len(rows) > per_page
+    key, backwards = _seek(after, before)
+
+    if backwards:
+        # Rows are newest-first; the surplus row is the newest one
+        items = rows[1:] if has_more else rows
+        has_prev, has_next = has_more, True
+    else:
+        items = rows[:per_page]
+        has_prev = key is not None or page > 1
+        has_next = has_more
+
+    if not items:
+        return Page(items)
+
+    return Page(
+        items,
+        next_cursor=encode_cursor(items[-1]) if has_next else None,
+        prev_cursor=encode_cursor(items[0]) if has_prev else None
+    )
@@ -0,0 +1,11 @@
+# utils/percentile.py
+# Shared by the benchmarks and the image queue's dashboard stats.
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,655 @@
+# utils/pg_db.py
+# Direct PostgreSQL implementation of the PostcardDB/TagDB/UserDB interface in
+# utils/db.py and utils/user_db.py, backed by the pooled engine in utils/pg_engine.py
+from werkzeug.security import generate_password_hash, check_password_hash
+from utils.enums import POSTCARD_TYPES, POSTCARD_ERAS
+from utils.pg_engine import get_engine
+from utils.pagination import keyset_sql, order_page_rows, decode_rank_cursor
+from utils.tags import normalize_tag_names, diff_tag_ids
+from utils.projections import postcard_fields, POSTCARD_COLUMNS, UPLOADER_FIELD
+import json
+import uuid
+import traceback
+
+# Columns callers may filter postcards on (filter keys come from query strings)
+POSTCARD_FILTER_COLUMNS = {'era', 'type', 'manufacturer', 'is_posted', 'is_written'}
+
+USER_LIST_COLUMNS = 'id, username, email, role, created_at'
+
+
+def _assignments(data):
+    """Build a "col = %s, ..." SET clause and its parameters from a dict"""
+    columns = list(data.keys())
+    clause = ', '.join(f'"{column}" = %s' for column in columns)
+    return clause, [data[column] for column in columns]
+
+
+def _insert(table, data, returning='*', conflict=''):
+    columns = list(data.keys())
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f'INSERT INTO {table} ({column_list}) VALUES ({placeholders}) {conflict} RETURNING {returning}'
+    return sql, [data[column] for column in columns]
+
+
+def _select_sql(fields):
+    """SELECT ... FROM postcards for a named postcard field set"""
+    columns = postcard_fields(fields)
+    select = [f'"{column}"' for column in columns if column != UPLOADER_FIELD]
+    if UPLOADER_FIELD in columns:
+        # Scalar subquery keeps unqualified column names in WHERE/ORDER BY unambiguous
+        select.append('(SELECT username FROM users WHERE users.id = postcards.user_id) AS username')
+    return f"SELECT {', '.join(select)} FROM postcards"
+
+
+def _fetch_page(select_sql, conditions, params, limit, offset=0, after=None, before=None):
+    """Run a newest-first keyset (or legacy offset) page query"""
+    seek, seek_params, order_by = keyset_sql(after, before)
+    if seek:
+        conditions = conditions + [seek]
+        params = params + seek_params
+        offset = 0
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    rows = get_engine().fetchall(
+        f'{select_sql}{where} ORDER BY {order_by} LIMIT %s OFFSET %s',
+        params + [limit, offset]
+    )
+    return order_page_rows(rows, after, before)
+
+
+class PostcardDB:
+
+    @staticmethod
+    def stage_postcard(postcard_id):
+        """
+        Move a draft postcard to staged status for admin review
+
+        :return: The staged postcard, or None if it is not (or no longer) a draft
+        """
+        return get_engine().fetchone(
+            "UPDATE postcards SET status = 'staged' WHERE id = %s AND status = 'draft' RETURNING *",
+            [postcard_id]
+        )
+
+    @staticmethod
+    def review_postcard(postcard_id, status, review_notes=None):
+        """
+        Admin review of a staged postcard
+
+        :param postcard_id: ID of the postcard to review
+        :param status: New status ('approved' or 'rejected')
+        :param review_notes: Optional admin comments
+        """
+        update_data = {
+            'status': status
+        }
+
+        if review_notes is not None:
+            update_data['review_notes'] = review_notes
+
+        clause, params = _assignments(update_data)
+        return get_engine().fetchone(
+            f'UPDATE postcards SET {clause} WHERE id = %s RETURNING *',
+            params + [postcard_id]
+        )
+
+    @staticmethod
+    def review_postcards(postcard_ids, status, notes=None, review_notes=None):
+        """
+        Give many staged postcards the same review status in one UPDATE
+
+        :param postcard_ids: IDs of the postcards to review
+        :param status: New status ('approved' or 'rejected')
+        :param notes: Optional per-card notes, parallel to postcard_ids (None entries allowed)
+        :param review_notes: Notes for cards without their own
+        :return: IDs of the postcards that changed
+        """
+        if not postcard_ids:
+            return []
+
+        rows = get_engine().fetchall(
+            'SELECT id FROM review_postcards(%s::text[]::uuid[], %s::postcard_status, %s::text[], %s)',
+            [list(postcard_ids), status, list(notes) if notes else None, review_notes]
+        )
+        return [str(row['id']) for row in rows]
+
+    @staticmethod
+    def review_staged_postcards(status, filters=None, review_notes=None):
+        """
+        Give every staged postcard matching the filters the same review status
+
+        :return: IDs of the postcards that changed
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        rows = get_engine().fetchall(
+            'SELECT id FROM review_staged_postcards(%s::postcard_status, %s::jsonb, %s)',
+            [status, json.dumps(filters), review_notes]
+        )
+        return [str(row['id']) for row in rows]
+
+    @staticmethod
+    def get_staged_postcards(limit=20, offset=0, after=None, before=None, fields='detail', filters=None):
+        """
+        Fetch all staged postcards for admin review
+
+        :param after: Cursor token; fetch the page after it
+        :param before: Cursor token; fetch the page before it
+        :param fields: Named field set from utils/projections.py
+        :param filters: Same filter dict as get_all_postcards
+        """
+        conditions = ["status = 'staged'"]
+        params = []
+        for field, value in (filters or {}).items():
+            if value and field in POSTCARD_FILTER_COLUMNS:
+                conditions.append(f'"{field}" = %s')
+                params.append(value)
+
+        return _fetch_page(
+            _select_sql(fields), conditions, params,
+            limit, offset, after, before
+        )
+
+    @staticmethod
+    def get_all_postcards(limit=20, offset=0, filters=None, user_id=None, status=None, after=None, before=None,
+                          fields='detail'):
+        """
+        Fetch postcards with advanced filtering and optional status filtering
+
+        :param limit: Number of records to return
+        :param offset: Pagination offset (fallback when no cursor is given)
+        :param filters: Additional filters to apply
+        :param user_id: Optionally filter by user ID
+        :param status: Filter by postcard status (for admins)
+        :param after: Cursor token; fetch the page after it
+        :param before: Cursor token; fetch the page before it
+        :param fields: Named field set from utils/projections.py
+        """
+        conditions = []
+        params = []
+
+        # Apply basic filters
+        if filters:
+            for field, value in filters.items():
+                if value and field in POSTCARD_FILTER_COLUMNS:
+                    conditions.append(f'"{field}" = %s')
+                    params.append(value)
+
+        # Filter by user ID if provided
+        if user_id:
+            conditions.append('user_id = %s')
+            params.append(user_id)
+
+        # Status filtering (for admins); non-admin callers only see approved cards
+        conditions.append('status = %s')
+        params.append(status or 'approved')
+
+        return _fetch_page(_select_sql(fields), conditions, params, limit, offset, after, before)
+
+    @staticmethod
+    def search_postcards(search_query, filters=None, limit=20, after=None):
+        """
+        Ranked full-text search over approved postcards
+
+        :param search_query: Web-search style query ("quoted phrases", -exclusions, or)
+        :param filters: Same filter dict as get_all_postcards
+        :param after: Search cursor token from a previous page
+        :return: Card fields plus 'rank' and 'headline' (matches wrapped in U+27E6/U+27E7)
+        """
+        key = decode_rank_cursor(after)
+        params = {
+            'search_query': search_query,
+            'filters': {field: value for field, value in (filters or {}).items() if value},
+            'after_rank': key[0] if key else None,
+            'after_id': key[1] if key else None,
+            'page_size': limit
+        }
+
+        return get_engine().fetchall(
+            'SELECT * FROM search_postcards(%s, %s::jsonb, %s::real, %s::uuid, %s)',
+            [params['search_query'], json.dumps(params['filters']), params['after_rank'],
+             params['after_id'], params['page_size']]
+        )
+
+    @staticmethod
+    def get_postcard_facets(filters=None):
+        """
+        Count approved postcards per era, type, manufacturer and posted/written
+
+        Each facet is counted under every filter except its own; see the
+        get_postcard_facets() database function.
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        row = get_engine().fetchone('SELECT facets FROM get_postcard_facets(%s::jsonb)', [json.dumps(filters)])
+        return row['facets'] if row else None
+
+    @staticmethod
+    def get_postcard(postcard_id):
+        """Fetch a single postcard by ID"""
+        return get_engine().fetchone(f"{_select_sql('detail')} WHERE id = %s", [postcard_id])
+
+    @staticmethod
+    def get_postcard_with_tags(postcard_id):
+        """
+        Fetch a postcard with its tags and uploader username embedded, in one query
+
+        The returned dict has 'tags' (list of tag rows) and 'username' keys added.
+        """
+        return get_engine().fetchone(
+            f"SELECT {', '.join('p.' + column for column in POSTCARD_COLUMNS)}, u.username, "
+            "COALESCE((SELECT json_agg(json_build_object('id', t.id, 'name', t.name) ORDER BY lower(t.name)) "
+            '          FROM postcard_tags pt JOIN tags t ON t.id = pt.tag_id '
+            "          WHERE pt.postcard_id = p.id), '[]'::json) AS tags "
+            'FROM postcards p LEFT JOIN users u ON u.id = p.user_id '
+            'WHERE p.id = %s',
+            [postcard_id]
+        )
+
+    @staticmethod
+    def create_postcard(postcard_data):
+        """
+        Create a new postcard with default draft status
+        """
+        # Ensure status is set to draft if not specified
+        if 'status' not in postcard_data:
+            postcard_data['status'] = 'draft'
+
+        # Generate UUID for the postcard
+        if 'id' not in postcard_data:
+            postcard_data['id'] = str(uuid.uuid4())
+
+        sql, params = _insert('postcards', postcard_data)
+        return get_engine().fetchone(sql, params)
+
+    @staticmethod
+    def create_postcards(postcard_rows):
+        """
+        Insert many postcards in one multi-row statement
+
+        Every row must have the same keys, including its own 'id'. Rows whose id
+        already exists are skipped, so re-sending a batch is harmless.
+        :return: IDs of the rows actually inserted
+        """
+        if not postcard_rows:
+            return []
+
+        columns = ', '.join(f'"{column}"' for column in postcard_rows[0])
+        rows = get_engine().fetchall(
+            f'INSERT INTO postcards ({columns}) '
+            f'SELECT {columns} FROM jsonb_populate_recordset(NULL::postcards, %s::jsonb) '
+            'ON CONFLICT (id) DO NOTHING RETURNING id',
+            [json.dumps(postcard_rows)]
+        )
+        return [str(row['id']) for row in rows]
+
+    @staticmethod
+    def existing_postcard_ids(postcard_ids):
+        """The subset of postcard_ids that already exist"""
+        if not postcard_ids:
+            return set()
+
+        rows = get_engine().fetchall('SELECT id FROM postcards WHERE id = ANY(%s::text[]::uuid[])', [list(postcard_ids)])
+        return {str(row['id']) for row in rows}
+
+    @staticmethod
+    def update_postcard(postcard_id, postcard_data):
+        """Update an existing postcard"""
+        clause, params = _assignments(postcard_data)
+        return get_engine().fetchone(
+            f'UPDATE postcards SET {clause} WHERE id = %s RETURNING *',
+            params + [postcard_id]
+        )
+
+    @staticmethod
+    def delete_postcard(postcard_id):
+        """Delete a postcard"""
+        return get_engine().fetchall('DELETE FROM postcards WHERE id = %s RETURNING *', [postcard_id])
+
+    @staticmethod
+    def get_postcard_types():
+        """Get all postcard types"""
+        return list(POSTCARD_TYPES)
+
+    @staticmethod
+    def get_postcard_eras():
+        """Get all postcard eras"""
+        return list(POSTCARD_ERAS)
+
+    @staticmethod
+    def get_user_postcards(user_id, limit=20, offset=0, after=None, before=None, fields='detail'):
+        """Fetch all postcards for a specific user"""
+        return _fetch_page(
+            _select_sql(fields), ['user_id = %s'], [user_id],
+            limit, offset, after, before
+        )
+
+class TagDB:
+    @staticmethod
+    def get_all_tags():
+        """Fetch all tags"""
+        return get_engine().fetchall('SELECT * FROM tags')
+
+    @staticmethod
+    def get_tags_version():
+        """Counter bumped by the database on every change to the tags table"""
+        row = get_engine().fetchone('SELECT version FROM tags_version')
+        return row['version'] if row else 0
+
+    @staticmethod
+    def create_tag(name):
+        """Create a new tag"""
+        return get_engine().fetchone(
+            'INSERT INTO tags (id, name) VALUES (%s, %s) RETURNING *',
+            [str(uuid.uuid4()), name]
+        )
+
+    @staticmethod
+    def link_tag_to_postcard(postcard_id, tag_id):
+        """Link a tag to a postcard"""
+        return get_engine().fetchall(
+            'INSERT INTO postcard_tags (postcard_id, tag_id) VALUES (%s, %s) RETURNING *',
+            [postcard_id, tag_id]
+        )
+
+    @staticmethod
+    def upsert_tags(names):
+        """
+        Resolve tag names to tag rows in one round trip, creating missing tags
+
+        :param names: Tag names (normalized with normalize_tag_names)
+        """
+        names = normalize_tag_names(names)
+        if not names:
+            return []
+
+        return get_engine().fetchall('SELECT * FROM upsert_tags(%s::text[])', [names])
+
+    @staticmethod
+    def link_tags_to_postcard(postcard_id, tag_ids):
+        """Link several tags to a postcard in one batch insert"""
+        if not tag_ids:
+            return []
+
+        return get_engine().fetchall(
+            'INSERT INTO postcard_tags (postcard_id, tag_id) '
+            'SELECT %s::uuid, unnest(%s::text[]::uuid[]) ON CONFLICT DO NOTHING RETURNING *',
+            [postcard_id, list(tag_ids)]
+        )
+
+    @staticmethod
+    def link_tags_to_postcards(links):
+        """Insert many (postcard_id, tag_id) links in one statement, skipping existing ones"""
+        if not links:
+            return 0
+
+        postcard_ids, tag_ids = zip(*links)
+        return get_engine().execute(
+            'INSERT INTO postcard_tags (postcard_id, tag_id) '
+            'SELECT * FROM unnest(%s::text[]::uuid[], %s::text[]::uuid[]) ON CONFLICT DO NOTHING',
+            [list(postcard_ids), list(tag_ids)]
+        )
+
+    @staticmethod
+    def unlink_tags_from_postcard(postcard_id, tag_ids):
+        """Remove several tag links from a postcard in one statement"""
+        if not tag_ids:
+            return []
+
+        return get_engine().fetchall(
+            'DELETE FROM postcard_tags WHERE postcard_id = %s AND tag_id = ANY(%s::text[]::uuid[]) RETURNING *',
+            [postcard_id, list(tag_ids)]
+        )
+
+    @staticmethod
+    def set_postcard_tags(postcard_id, names, current_tags=None):
+        """
+        Make a postcard's tags match a list of names
+
+        :param names: Comma-separated string or list of tag names
+        :param current_tags: Tags the postcard has now (omit for a new postcard)
+        :return: The postcard's tags after the update
+        """
+        tags = TagDB.upsert_tags(names)
+        to_link, to_unlink = diff_tag_ids(current_tags, tags)
+
+        TagDB.link_tags_to_postcard(postcard_id, to_link)
+        TagDB.unlink_tags_from_postcard(postcard_id, to_unlink)
+
+        return tags
+
+    @staticmethod
+    def get_tags_for_postcards(postcard_ids):
+        """
+        Fetch the tags of many postcards in one query
+
+        :return: Dict of postcard ID -> list of tag rows
+        """
+        tags_by_postcard = {postcard_id: [] for postcard_id in postcard_ids}
+        if not postcard_ids:
+            return tags_by_postcard
+
+        rows = get_engine().fetchall(
+            'SELECT pt.postcard_id, t.id, t.name FROM postcard_tags pt JOIN tags t ON t.id = pt.tag_id '
+            'WHERE pt.postcard_id = ANY(%s::text[]::uuid[]) ORDER BY lower(t.name)',
+            [list(postcard_ids)]
+        )
+
+        for row in rows:
+            tags_by_postcard.setdefault(row['postcard_id'], []).append({'id': row['id'], 'name': row['name']})
+
+        return tags_by_postcard
+
+    @staticmethod
+    def get_postcard_tags(postcard_id):
+        """Get all tags for a postcard"""
+        return get_engine().fetchall(
+            'SELECT t.* FROM postcard_tags pt JOIN tags t ON t.id = pt.tag_id '
+            'WHERE pt.postcard_id = %s',
+            [postcard_id]
+        )
+
+class ImageDB:
+    @staticmethod
+    def acquire_image(sha256, file_ext, byte_size=None):
+        """
+        Take a reference to a content-addressed image
+        
+        :return: (references now held, extension the image is stored under, whether its
+                 objects are all stored, derivative formats stored); until they are the
+                 caller uploads it and then calls mark_image_stored()
+        """
+        row = get_engine().fetchone('SELECT * FROM acquire_image(%s, %s, %s)', [sha256, file_ext, byte_size])
+        return row['ref_count'], row['file_ext'], row['stored'], list(row['formats'] or [])
+
+    @staticmethod
+    def mark_image_stored(sha256, formats):
+        """Record that every object of an image has been uploaded, its derivatives in formats"""
+        row = get_engine().fetchone('SELECT mark_image_stored(%s, %s::text[]) AS stored', [sha256, list(formats)])
+        return bool(row and row['stored'])
+
+    @staticmethod
+    def release_image(sha256, object_keys):
+        """Drop a reference to an image; returns the references left (at 0 object_keys are queued for deletion)"""
+        row = get_engine().fetchone('SELECT release_image(%s, %s::text[]) AS remaining', [sha256, list(object_keys)])
+        return row['remaining'] if row else 0
+
+    @staticmethod
+    def queue_deletion(object_keys):
+        """Queue storage objects that are not reference-counted (UUID-keyed uploads) for deletion"""
+        get_engine().execute('INSERT INTO image_deletions (object_keys) VALUES (%s::text[])', [list(object_keys)])
+
+    @staticmethod
+    def claim_deletions(limit, min_age, lease):
+        """Claim up to `limit` queued deletions at least `min_age` seconds old, hidden from other sweepers for `lease` seconds"""
+        return get_engine().fetchall('SELECT * FROM claim_image_deletions(%s, %s, %s)', [limit, int(min_age), int(lease)])
+
+    @staticmethod
+    def finish_deletions(deletion_ids):
+        get_engine().execute('DELETE FROM image_deletions WHERE id = ANY(%s::bigint[])', [list(deletion_ids)])
+
+    @staticmethod
+    def fail_deletions(deletion_ids, error):
+        """Record why a batch could not be removed; it is retried when its lease runs out"""
+        get_engine().execute('UPDATE image_deletions SET last_error = %s WHERE id = ANY(%s::bigint[])',
+                             [error, list(deletion_ids)])
+
+    @staticmethod
+    def pending_deletions():
+        row = get_engine().fetchone('SELECT count(*) AS pending FROM image_deletions')
+        return row['pending'] if row else 0
+
+    @staticmethod
+    def list_image_urls(after_id=None, limit=1000):
+        """One page of postcards' image URLs ordered by ID (keyset: pass the last ID seen)"""
+        if after_id is None:
+            return get_engine().fetchall(
+                'SELECT id, front_image_url, back_image_url FROM postcards ORDER BY id LIMIT %s', [limit]
+            )
+        return get_engine().fetchall(
+            'SELECT id, front_image_url, back_image_url FROM postcards WHERE id > %s::uuid ORDER BY id LIMIT %s',
+            [after_id, limit]
+        )
+
+    @staticmethod
+    def list_image_hashes(after=None, limit=1000):
+        """One page of the SHA-256s of referenced content-addressed images, in order"""
+        rows = get_engine().fetchall(
+            'SELECT sha256 FROM image_objects WHERE sha256 > %s ORDER BY sha256 LIMIT %s', [after or '', limit]
+        )
+        return [row['sha256'] for row in rows]
+
+    @staticmethod
+    def held_images(hashes):
+        """The subset of `hashes` that are referenced right now"""
+        if not hashes:
+            return set()
+        rows = get_engine().fetchall('SELECT sha256 FROM image_objects WHERE sha256 = ANY(%s::text[])', [list(hashes)])
+        return {row['sha256'] for row in rows}
+
+class StatsDB:
+    @staticmethod
+    def get_catalog_stats(upload_days=30):
+        """Fetch aggregate counts computed by the get_catalog_stats() database function"""
+        row = get_engine().fetchone('SELECT stats FROM get_catalog_stats(%s)', [upload_days])
+        return row['stats'] if row else None
+
+class UserDB:
+    @staticmethod
+    def get_user_by_id(user_id):
+        """Fetch a user by ID"""
+        try:
+            return get_engine().fetchone('SELECT * FROM users WHERE id = %s', [user_id])
+        except Exception as e:
+            print(f"Error fetching user by ID: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    @staticmethod
+    def get_user_by_email(email):
+        """Fetch a user by email"""
+        try:
+            return get_engine().fetchone('SELECT * FROM users WHERE email = %s', [email])
+        except Exception as e:
+            print(f"Error fetching user by email: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    @staticmethod
+    def get_user_by_username(username):
+        """Fetch a user by username"""
+        try:
+            return get_engine().fetchone('SELECT * FROM users WHERE username = %s', [username])
+        except Exception as e:
+            print(f"Error fetching user by username: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    @staticmethod
+    def create_user(username, email, password, role='user'):
+        """Create a new user"""
+        try:
+            user_data = {
+                'id': str(uuid.uuid4()),
+                'username': username,
+                'email': email,
+                'password_hash': generate_password_hash(password),
+                'role': role
+            }
+
+            sql, params = _insert('users', user_data)
+            return get_engine().fetchone(sql, params)
+        except Exception as e:
+            print(f"Error creating user: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    @staticmethod
+    def create_user_from_auth(user_data):
+        """Create a user from Supabase Auth data"""
+        try:
+            # Check if user already exists in database
+            existing_user = UserDB.get_user_by_id(user_data['id'])
+            if existing_user:
+                print(f"User already exists with ID: {user_data['id']}")
+                return existing_user
+
+            insert_data = {
+                'id': user_data['id'],
+                'email': user_data['email'],
+                'username': user_data['username'],
+                'role': user_data['role'],
+                'password_hash': user_data.get('password_hash', generate_password_hash(str(uuid.uuid4())))
+            }
+
+            # Upsert to handle a concurrent insert of the same auth user
+            clause = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in insert_data if column != 'id')
+            sql, params = _insert('users', insert_data, conflict=f'ON CONFLICT (id) DO UPDATE SET {clause}')
+            return get_engine().fetchone(sql, params)
+        except Exception as e:
+            print(f"Error creating user from auth: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    @staticmethod
+    def authenticate_user(email, password):
+        """Authenticate a user by email and password"""
+        user = UserDB.get_user_by_email(email)
+
+        if user and check_password_hash(user['password_hash'], password):
+            return user
+
+        return None
+
+    @staticmethod
+    def get_all_users(limit=100, offset=0, after=None, before=None):
+        """Get all users (for admin use)"""
+        try:
+            return _fetch_page(f'SELECT {USER_LIST_COLUMNS} FROM users', [], [], limit, offset, after, before)
+        except Exception as e:
+            print(f"Error getting users: {str(e)}")
+            print(traceback.format_exc())
+            return []
+
+    @staticmethod
+    def is_admin(user_id):
+        """Check if a user is an admin"""
+        user = UserDB.get_user_by_id(user_id)
+        return user and user['role'] == 'admin'
+
+    @staticmethod
+    def update_user(user_id, user_data):
+        """Update user information"""
+        try:
+            # If password is being updated, hash it
+            if 'password' in user_data:
+                user_data['password_hash'] = generate_password_hash(user_data.pop('password'))
+
+            clause, params = _assignments(user_data)
+            return get_engine().fetchone(
+                f'UPDATE users SET {clause} WHERE id = %s RETURNING *',
+                params + [user_id]
+            )
+        except Exception as e:
+            print(f"Error updating user: {str(e)}")
+            print(traceback.format_exc())
+            return None
@@ -0,0 +1,202 @@
+# utils/pg_engine.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from utils.tracing import record_sql
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+def _to_positional(sql):
+    """Rewrite psycopg2-style %s placeholders as PREPARE-style $n parameters"""
+    parts = sql.split('%s')
+    positional = parts[0]
+    for index, part in enumerate(parts[1:], start=1):
+        positional += f'${index}' + part
+    return positional, len(parts) - 1
+
+
+def _connection_factory():
+    """Connection class that remembers which statements it has prepared"""
+    import psycopg2.extensions
+
+    class PreparedConnection(psycopg2.extensions.connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
+
+    return PreparedConnection
+
+
+class PgSession:
+    """A checked-out pooled connection that runs statements as prepared statements"""
+
+    def __init__(self, engine, conn):
+        self.engine = engine
+        self.conn = conn
+
+    def _prepare(self, sql):
+        """Prepare the statement on this connection once and return its name"""
+        name = 'pcdb_' + hashlib.md5(sql.encode('utf-8')).hexdigest()[:16]
+
+        if name not in self.conn.prepared:
+            # Keep the per-connection statement cache bounded
+            if len(self.conn.prepared) >= self.engine.max_prepared:
+                with self.conn.cursor() as cur:
+                    cur.execute('DEALLOCATE ALL')
+                self.conn.prepared.clear()
+
+            positional, _ = _to_positional(sql)
+            with self.conn.cursor() as cur:
+                cur.execute(f'PREPARE {name} AS {positional}')
+            self.conn.prepared.add(name)
+
+        return name
+
+    def _execute(self, cur, sql, params):
+        started = time.perf_counter()
+        name = self._prepare(sql)
+        params = tuple(params or ())
+
+        if params:
+            placeholders = ', '.join(['%s'] * len(params))
+            cur.execute(f'EXECUTE {name} ({placeholders})', params)
+        else:
+            cur.execute(f'EXECUTE {name}')
+
+        record_sql(sql, started, cur.rowcount)
+
+    def fetchall(self, sql, params=None):
+        """Run a statement and return every row as a dict"""
+        from psycopg2.extras import RealDictCursor
+
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            self._execute(cur, sql, params)
+            return cur.fetchall() if cur.description else []
+
+    def fetchone(self, sql, params=None):
+        """Run a statement and return the first row as a dict (or None)"""
+        rows = self.fetchall(sql, params)
+        return rows[0] if rows else None
+
+    def execute(self, sql, params=None):
+        """Run a statement and return the affected row count"""
+        with self.conn.cursor() as cur:
+            self._execute(cur, sql, params)
+            return cur.rowcount
+
+
+class PgEngine:
+    """Bounded psycopg2 connection pool shared by the Postgres data-access backend
+
+    The pool is created lazily and re-created after a fork so Gunicorn workers
+    never share sockets with the master process.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=10, max_prepared=256):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_prepared = max_prepared
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._slots = None
+        # Pools inherited across a fork; kept referenced so their sockets are never
+        # closed (and the parent's sessions terminated) by garbage collection
+        self._inherited = []
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    from psycopg2.pool import ThreadedConnectionPool
+
+                    if self._pool is not None:
+                        self._inherited.append(self._pool)
+
+                    logger.info(f"Opening Postgres pool (min={self.minconn}, max={self.maxconn}) in pid {pid}")
+                    self._pool = ThreadedConnectionPool(
+                        self.minconn,
+                        self.maxconn,
+                        self.dsn,
+                        connection_factory=_connection_factory()
+                    )
+                    self._slots = threading.BoundedSemaphore(self.maxconn)
+                    self._pid = pid
+        return self._pool
+
+    @contextmanager
+    def session(self):
+        """Check out a connection for one unit of work, committing on success"""
+        pool = self._get_pool()
+        slots = self._slots
+
+        # ThreadedConnectionPool raises immediately when exhausted; wait instead
+        if not slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"No Postgres connection available after {self.timeout}s")
+
+        conn = None
+        try:
+            conn = pool.getconn()
+            yield PgSession(self, conn)
+            conn.commit()
+        except Exception:
+            if conn is not None and not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if conn is not None:
+                pool.putconn(conn, close=bool(conn.closed))
+            slots.release()
+
+    def fetchall(self, sql, params=None):
+        with self.session() as session:
+            return session.fetchall(sql, params)
+
+    def fetchone(self, sql, params=None):
+        with self.session() as session:
+            return session.fetchone(sql, params)
+
+    def execute(self, sql, params=None):
+        with self.session() as session:
+            return session.execute(sql, params)
+
+    def close(self):
+        """Close every pooled connection owned by this process"""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+            self._pid = None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the process-wide engine configured from Config"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if not Config.DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL must be set to use the postgres backend")
+                _engine = PgEngine(
+                    Config.DATABASE_URL,
+                    minconn=Config.DB_POOL_MIN,
+                    maxconn=Config.DB_POOL_MAX,
+                    timeout=Config.DB_POOL_TIMEOUT
+                )
+    return _engine
@@ -0,0 +1,42 @@
+# utils/projections.py
+# Named column sets for postcard queries, so each page fetches only what it renders.
+# 'id' and 'created_at' are always included because cursor pagination needs them.
+
+# Pseudo-field resolved from the users table rather than a postcards column
+UPLOADER_FIELD = 'username'
+
+# Every postcards column except the search_vector tsvector, which is only read in SQL
+POSTCARD_COLUMNS = (
+    'id', 'title', 'description', 'era', 'is_posted', 'is_written', 'manufacturer',
+    'type', 'front_image_url', 'back_image_url', 'image_status', 'user_id', 'status',
+    'review_notes', 'created_at', 'updated_at'
+)
+
+POSTCARD_FIELD_SETS = {
+    # Grid cards (postcards/list.html, index.html, auth/profile.html)
+    'card': (
+        'id', 'title', 'era', 'type', 'is_posted', 'is_written',
+        'front_image_url', 'image_status', 'created_at'
+    ),
+    # Staged review queue (admin/staged_postcards.html)
+    'admin_review': (
+        'id', 'title', 'era', 'type', 'front_image_url', 'image_status', 'user_id',
+        'status', 'review_notes', 'created_at', UPLOADER_FIELD
+    ),
+    # Full row (detail and edit pages)
+    'detail': POSTCARD_COLUMNS,
+    # Full row plus uploader (catalog export, utils/exporter.py)
+    'export': POSTCARD_COLUMNS + (UPLOADER_FIELD,)
+}
+
+
+def postcard_fields(name):
+    """
+    Return the columns for a named field set
+
+    :raises ValueError: if the field set does not exist
+    """
+    try:
+        return POSTCARD_FIELD_SETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown postcard field set: {name!r}")
@@ -0,0 +1,65 @@
+# utils/stats.py
+import logging
+import threading
+import time
+from config import Config
+from utils.backend import StatsDB
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_cache = {'value': None, 'expires_at': 0.0}
+_cache_lock = threading.Lock()
+
+EMPTY_STATS = {
+    'postcards_by_status': {},
+    'postcards_by_era': {},
+    'postcards_by_type': {},
+    'users_by_role': {},
+    'total_tags': 0,
+    'uploads_per_day': []
+}
+
+
+def _with_totals(stats):
+    """Add the headline totals derived from the per-group counts"""
+    stats = dict(EMPTY_STATS, **(stats or {}))
+    stats['total_postcards'] = sum(stats['postcards_by_status'].values())
+    stats['total_users'] = sum(stats['users_by_role'].values())
+    return stats
+
+
+def get_catalog_stats(force_refresh=False):
+    """
+    Return exact catalog counts for the admin dashboard
+
+    Counts are aggregated in the database and cached for Config.STATS_CACHE_TTL
+    seconds, so rendering the dashboard costs nothing between refreshes.
+    """
+    now = time.monotonic()
+    if not force_refresh and _cache['value'] is not None and now < _cache['expires_at']:
+        return _cache['value']
+
+    with _cache_lock:
+        # Another thread may have refreshed the cache while we waited
+        now = time.monotonic()
+        if not force_refresh and _cache['value'] is not None and now < _cache['expires_at']:
+            return _cache['value']
+
+        try:
+            stats = _with_totals(StatsDB.get_catalog_stats())
+        except Exception as e:
+            logger.error(f"Error fetching catalog stats: {str(e)}")
+            # Serve stale numbers rather than failing the dashboard
+            return _cache['value'] or _with_totals(None)
+
+        _cache['value'] = stats
+        _cache['expires_at'] = now + Config.STATS_CACHE_TTL
+        return stats
+
+
+def invalidate_catalog_stats():
+    """Drop cached stats so the next dashboard load recomputes them"""
+    with _cache_lock:
+        _cache['value'] = None
+        _cache['expires_at'] = 0.0
@@ -1,13 +1,12 @@
 # utils/supabase_auth.py
-from supabase import create_client
-from config import Config
-from utils.user_db import UserDB
+from utils.supabase_clients import LazyClient, auth_api_error
+from utils.backend import UserDB
 import traceback
 import uuid
-import gotrue
 
 # Initialize Supabase client
-supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+supabase = LazyClient('anon')
+admin_supabase = LazyClient('service')
 
 class SupabaseAuth:
     @staticmethod
@@ -94,7 +93,7 @@ class SupabaseAuth:
             # Get the current authenticated user from the session
             response = supabase.auth.get_user()
             return response
-        except gotrue.errors.AuthApiError as e:
+        except auth_api_error() as e:
             # If the token is invalid or user doesn't exist, return None instead of raising
             if "User from sub claim in JWT does not exist" in str(e):
                 print("Invalid session token detected")
@@ -127,7 +126,6 @@ class SupabaseAuth:
         """Delete a user from Supabase Auth"""
         try:
             # Note: This requires admin privileges via the service role key
-            admin_supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
             response = admin_supabase.auth.admin.delete_user(user_id)
             return response
         except Exception as e:
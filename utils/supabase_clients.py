@@ -0,0 +1,174 @@
+# utils/supabase_clients.py
+# One place that builds Supabase clients. The anon and service-role clients are
+# created on first use in each process (so Gunicorn workers never share sockets
+# opened before the fork) and all of their PostgREST, Storage and Auth traffic
+# goes through a single keep-alive connection pool with configurable limits.
+# httpx and supabase-py are imported on first use to keep worker start-up fast.
+import os
+import threading
+from config import Config
+from utils.tracing import instrument_supabase_client
+
+ROLES = ('anon', 'service')
+
+
+class PoolStats:
+    """Usage counters for the shared connection pool of this process"""
+
+    def __init__(self, max_connections):
+        self.max_connections = max_connections
+        self.in_flight = 0  # requests sent or waiting for a connection
+        self.peak = 0
+        self.requests = 0
+        self.saturated = 0  # requests that started with every connection busy
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.requests += 1
+            if self.max_connections and self.in_flight >= self.max_connections:
+                self.saturated += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'max_connections': self.max_connections,
+                'in_flight': self.in_flight,
+                'peak': self.peak,
+                'requests': self.requests,
+                'saturated': self.saturated,
+                'saturation_rate': self.saturated / self.requests if self.requests else 0.0
+            }
+
+
+def _pooled_transport(limits, stats):
+    """HTTP transport shared by every Supabase client, counting requests in flight"""
+    import httpx
+
+    class CountedStream(httpx.SyncByteStream):
+        # Response body that releases its slot in the counters when closed
+        def __init__(self, stream):
+            self._stream = stream
+            self._closed = False
+
+        def __iter__(self):
+            yield from self._stream
+
+        def close(self):
+            if not self._closed:
+                self._closed = True
+                stats.finished()
+            self._stream.close()
+
+    class PooledTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            stats.started()
+            try:
+                response = super().handle_request(request)
+            except BaseException:
+                stats.finished()
+                raise
+            response.stream = CountedStream(response.stream)
+            return response
+
+    return PooledTransport(limits=httpx.Limits(**limits))
+
+
+_clients = {}
+_transport = None
+_stats = None
+_lock = threading.Lock()
+
+
+def _reset():
+    global _clients, _transport, _stats, _lock
+    _clients = {}
+    _transport = None
+    _stats = None
+    _lock = threading.Lock()
+
+
+# Sockets and locks inherited from the parent are never used by the child
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def _get_transport():
+    global _transport, _stats
+    if _transport is None:
+        limits = {
+            'max_connections': Config.SUPABASE_POOL_MAX,
+            'max_keepalive_connections': Config.SUPABASE_POOL_KEEPALIVE,
+            'keepalive_expiry': Config.SUPABASE_KEEPALIVE_EXPIRY
+        }
+        _stats = PoolStats(Config.SUPABASE_POOL_MAX)
+        _transport = _pooled_transport(limits, _stats)
+    return _transport
+
+
+def _use_shared_pool(client, transport):
+    """Point the PostgREST, Storage and Auth HTTP clients of a Supabase client at one transport"""
+    import httpx
+
+    http_clients = [
+        getattr(getattr(client, 'postgrest', None), 'session', None),
+        getattr(getattr(client, 'storage', None), 'session', None),
+        getattr(getattr(client, 'auth', None), '_http_client', None)
+    ]
+    for http_client in http_clients:
+        if isinstance(http_client, httpx.Client):
+            # supabase-py builds its own httpx clients and takes no transport option
+            http_client._transport = transport
+
+
+def _create(role):
+    from supabase import create_client
+
+    key = Config.SUPABASE_SERVICE_KEY if role == 'service' else Config.SUPABASE_KEY
+    client = create_client(Config.SUPABASE_URL, key)
+    _use_shared_pool(client, _get_transport())
+    return instrument_supabase_client(client)
+
+
+def get_client(role='anon'):
+    """The process-wide Supabase client for a role ('anon' or 'service'), created on first use"""
+    if role not in ROLES:
+        raise ValueError(f"Unknown Supabase client role: {role!r} (expected one of {', '.join(ROLES)})")
+
+    client = _clients.get(role)
+    if client is None:
+        with _lock:
+            client = _clients.get(role)
+            if client is None:
+                client = _clients[role] = _create(role)
+    return client
+
+
+class LazyClient:
+    """Module-level stand-in that resolves to get_client(role) on each attribute access"""
+
+    def __init__(self, role):
+        self._role = role
+
+    def __getattr__(self, name):
+        return getattr(get_client(self._role), name)
+
+    def __repr__(self):
+        return f'<LazyClient {self._role}>'
+
+
+def auth_api_error():
+    """gotrue's AuthApiError, for except clauses (gotrue is loaded along with the first client)"""
+    from gotrue.errors import AuthApiError
+    return AuthApiError
+
+
+def pool_stats():
+    """Connection pool counters for this worker, or None before the first client is built"""
+    return _stats.to_dict() if _stats is not None else None
@@ -0,0 +1,764 @@
+# utils/supabase_fake.py
+# In-memory stand-in for the subset of the Supabase client this app uses, so the
+# Supabase backend can be exercised (and benchmarked) without a network. Query
+# builders record PostgREST-style parameters exactly as postgrest-py does, which
+# keeps helpers like apply_supabase_page working unchanged.
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from httpx import QueryParams
+
+# Primary (or upsert conflict) keys per table; everything else is keyed by 'id'
+PRIMARY_KEYS = {
+    'postcard_tags': ('postcard_id', 'tag_id'),
+    'tags_version': (),
+    'image_objects': ('sha256',)
+}
+
+# Column defaults applied on insert
+DEFAULTS = {
+    'postcards': {'status': 'draft', 'is_posted': False, 'is_written': False, 'review_notes': None,
+                  'description': None, 'era': None, 'type': None, 'manufacturer': None,
+                  'front_image_url': None, 'back_image_url': None, 'image_status': 'ready', 'user_id': None},
+    'users': {'role': 'user'},
+    'image_deletions': {'sha256': None, 'attempts': 0, 'last_error': None}
+}
+
+# Embeds: (table, embedded table) -> local column, remote column (to-one)
+TO_ONE = {
+    ('postcards', 'users'): ('user_id', 'id'),
+    ('postcard_tags', 'tags'): ('tag_id', 'id'),
+    ('postcard_tags', 'postcards'): ('postcard_id', 'id')
+}
+
+# (table, embedded table) -> junction table, junction column for table, junction column for embed
+TO_MANY = {
+    ('postcards', 'tags'): ('postcard_tags', 'postcard_id', 'tag_id')
+}
+
+FILTER_KEYS = ('era', 'type', 'manufacturer', 'is_posted', 'is_written')
+
+
+class FakeAPIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(text, sep=','):
+    """Split on sep outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _coerce(value, raw):
+    """Convert a PostgREST filter value to the type of the stored value"""
+    raw = raw.strip('"')
+    if isinstance(value, bool):
+        return raw.lower() in ('true', 't', '1')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return type(value)(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _compare(value, op, raw):
+    if op == 'is':
+        return value is None if raw.lower() == 'null' else value == (raw.lower() == 'true')
+    if op == 'in':
+        options = [option.strip().strip('"') for option in raw.strip('()').split(',')]
+        return str(value) in options or (isinstance(value, bool) and str(value).lower() in options)
+    if value is None:
+        return False
+
+    target = _coerce(value, raw)
+    value = str(value) if isinstance(target, str) else value
+    return {
+        'eq': lambda: value == target,
+        'neq': lambda: value != target,
+        'gt': lambda: value > target,
+        'gte': lambda: value >= target,
+        'lt': lambda: value < target,
+        'lte': lambda: value <= target,
+        'like': lambda: re.fullmatch(re.escape(target).replace('%', '.*').replace('\\*', '.*'), str(value)) is not None,
+        'ilike': lambda: re.fullmatch(re.escape(target).replace('%', '.*').replace('\\*', '.*'), str(value), re.I) is not None
+    }[op]()
+
+
+def _condition(row, expression):
+    """Evaluate one logic-tree term such as created_at.lt."..." or and(...)"""
+    for logic in ('and', 'or'):
+        if expression.startswith(f'{logic}(') and expression.endswith(')'):
+            terms = _split_top_level(expression[len(logic) + 1:-1])
+            results = (_condition(row, term) for term in terms)
+            return all(results) if logic == 'and' else any(results)
+
+    column, op, raw = expression.split('.', 2)
+    negate = False
+    if op == 'not':
+        negate = True
+        op, raw = raw.split('.', 1)
+    result = _compare(row.get(column), op, raw)
+    return not result if negate else result
+
+
+class FakeQuery:
+    """Chainable query over one FakeSupabase table"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.params = QueryParams()
+        self.headers = {}
+        self.method = 'GET'
+        self.payload = None
+        self.ignore_duplicates = False
+        self.merge = False
+
+    # --- statements
+    def select(self, *columns, count=None):
+        self.params = self.params.add('select', ','.join(columns) or '*')
+        return self
+
+    def insert(self, json, *, count=None, returning='representation', upsert=False):
+        self.method, self.payload, self.merge = 'POST', json, upsert
+        return self
+
+    def upsert(self, json, *, count=None, returning='representation', ignore_duplicates=False, on_conflict=''):
+        self.method, self.payload, self.merge = 'POST', json, True
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, *, count=None, returning='representation'):
+        self.method, self.payload = 'PATCH', json
+        return self
+
+    def delete(self, *, count=None, returning='representation'):
+        self.method = 'DELETE'
+        return self
+
+    # --- filters and modifiers
+    def filter(self, column, operator, criteria):
+        self.params = self.params.add(column, f'{operator}.{criteria}')
+        return self
+
+    def eq(self, column, value):
+        return self.filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self.filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self.filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self.filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self.filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self.filter(column, 'lte', value)
+
+    def is_(self, column, value):
+        return self.filter(column, 'is', value)
+
+    def in_(self, column, values):
+        return self.filter(column, 'in', f"({','.join(str(value) for value in values)})")
+
+    def order(self, column, *, desc=False, nullsfirst=False, foreign_table=None):
+        self.params = self.params.add('order', f"{column}{'.desc' if desc else ''}")
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self.params = self.params.add('limit', size)
+        return self
+
+    def range(self, start, end):
+        # Matches postgrest-py: the end is exclusive
+        self.headers['Range'] = f'{start}-{end - 1}'
+        return self
+
+    # --- execution
+    def _matching(self, rows):
+        for key, value in self.params.multi_items():
+            if key in ('select', 'order', 'limit', 'offset'):
+                continue
+            if key in ('or', 'and'):
+                rows = [row for row in rows if _condition(row, f'{key}{value}')]
+            else:
+                rows = [row for row in rows if _condition(row, f'{key}.{value}')]
+        return rows
+
+    def _ordered(self, rows):
+        orders = []
+        for value in self.params.get_list('order'):
+            orders.extend(value.split(','))
+        for term in reversed(orders):
+            column, _, direction = term.partition('.')
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=direction.startswith('desc'))
+            rows = present + missing
+        return rows
+
+    def _project(self, row, select):
+        result = {}
+        for item in _split_top_level(select or '*'):
+            match = re.fullmatch(r'(\w+)\((.*)\)', item, re.S)
+            if match:
+                embed, columns = match.groups()
+                result[embed] = self.client._embed(self.table, embed, row, columns)
+            elif item == '*':
+                result.update(row)
+            else:
+                result[item] = row.get(item)
+        return result
+
+    def execute(self):
+        self.client._sleep()
+        with self.client._lock:
+            if self.method == 'GET':
+                return FakeAPIResponse(self._select())
+            if self.method == 'POST':
+                return FakeAPIResponse(self.client._write(self.table, self.payload, self.merge, self.ignore_duplicates))
+            if self.method == 'PATCH':
+                return FakeAPIResponse(self.client._update(self.table, self._matching(self.client._rows(self.table)), self.payload))
+            return FakeAPIResponse(self.client._delete(self.table, self._matching(self.client._rows(self.table))))
+
+    def _select(self):
+        rows = self._ordered(self._matching(self.client._rows(self.table)))
+
+        offset = int(self.params.get('offset', 0))
+        limit = self.params.get('limit')
+        if 'Range' in self.headers:
+            start, end = (int(part) for part in self.headers['Range'].split('-'))
+            offset, limit = start, end - start + 1
+        rows = rows[offset:]
+        if limit is not None:
+            rows = rows[:int(limit)]
+
+        return [self._project(row, self.params.get('select')) for row in rows]
+
+
+class FakeRPC:
+    def __init__(self, client, fn, params):
+        self.client, self.fn, self.params = client, fn, params
+
+    def execute(self):
+        self.client._sleep()
+        handler = getattr(self.client, f'_rpc_{self.fn}', None)
+        if handler is None:
+            raise NotImplementedError(f"RPC {self.fn!r} is not implemented by the in-memory fake")
+        with self.client._lock:
+            return FakeAPIResponse(handler(**self.params))
+
+
+class FakeStorageError(Exception):
+    """Raised like storage3's StorageException, with the API's error body as its argument"""
+
+
+class FakeBucket:
+    def __init__(self, storage, name):
+        self.storage, self.name = storage, name
+
+    def upload(self, path, file, file_options=None):
+        self.storage.client._sleep()
+        if self.name not in self.storage.buckets:
+            raise FakeStorageError({'statusCode': 404, 'error': 'Bucket not found', 'message': 'Bucket not found'})
+        if isinstance(file, bytes):
+            data = file
+        else:
+            # Read the way an HTTP client streams a file body
+            chunks = iter(lambda: file.read(64 * 1024), b'')
+            data = b''.join(chunks) if self.storage.client.keep_objects else b''.join(chunk[:0] for chunk in chunks)
+        if not self.storage.client.keep_objects:
+            data = b''
+        with self.storage.client._lock:
+            self.storage.objects.setdefault(self.name, {})[path] = data
+            self.storage.updated.setdefault(self.name, {})[path] = _now()
+        return {'Key': f'{self.name}/{path}'}
+
+    def remove(self, paths):
+        self.storage.client._sleep()
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        with self.storage.client._lock:
+            bucket = self.storage.objects.setdefault(self.name, {})
+            updated = self.storage.updated.setdefault(self.name, {})
+            for path in paths:
+                updated.pop(path, None)
+            return [{'name': path} for path in paths if bucket.pop(path, None) is not None]
+
+    def list(self, path=None, options=None):
+        """Entries directly under a folder, as the Storage API lists them (folders have id None)"""
+        self.storage.client._sleep()
+        options = options or {}
+        prefix = f"{path.strip('/')}/" if path else ''
+        entries = {}
+        with self.storage.client._lock:
+            updated = self.storage.updated.get(self.name, {})
+            for key in self.storage.objects.get(self.name, {}):
+                if not key.startswith(prefix):
+                    continue
+                name, _, rest = key[len(prefix):].partition('/')
+                if rest:
+                    entries.setdefault(name, {'name': name, 'id': None, 'updated_at': None, 'created_at': None,
+                                              'metadata': None})
+                else:
+                    entries[name] = {'name': name, 'id': key, 'updated_at': updated.get(key),
+                                     'created_at': updated.get(key), 'metadata': {}}
+        offset = options.get('offset', 0)
+        return sorted(entries.values(), key=lambda entry: entry['name'])[offset:offset + options.get('limit', 100)]
+
+    def download(self, path):
+        self.storage.client._sleep()
+        return self.storage.objects.get(self.name, {})[path]
+
+    def get_public_url(self, path):
+        return f'{self.storage.client.url}/storage/v1/object/public/{self.name}/{path}'
+
+
+class FakeBucketInfo:
+    def __init__(self, name, public=False):
+        self.id = self.name = name
+        self.public = public
+
+
+class FakeStorage:
+    def __init__(self, client):
+        self.client = client
+        self.buckets = {}
+        self.objects = {}
+        self.updated = {}
+
+    def from_(self, name):
+        return FakeBucket(self, name)
+
+    def list_buckets(self):
+        self.client._sleep()
+        return list(self.buckets.values())
+
+    def get_bucket(self, name):
+        self.client._sleep()
+        return self.buckets[name]
+
+    def create_bucket(self, name, options=None):
+        self.client._sleep()
+        self.buckets.setdefault(name, FakeBucketInfo(name, bool((options or {}).get('public'))))
+        return {'name': name}
+
+    def update_bucket(self, name, options=None):
+        self.client._sleep()
+        self.buckets.setdefault(name, FakeBucketInfo(name)).public = bool((options or {}).get('public'))
+        return {'message': 'Successfully updated'}
+
+
+class FakeAuth:
+    """Auth is not simulated; sessions are established directly in tests and benchmarks"""
+
+    def set_session(self, access_token, refresh_token=None):
+        return None
+
+    def get_user(self, jwt=None):
+        return None
+
+    def sign_out(self):
+        return None
+
+    def __getattr__(self, name):
+        raise NotImplementedError(f"auth.{name} is not supported by the in-memory fake")
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client: tables, the app's RPC functions and storage
+
+    :param latency_ms: Delay added to every request, to model network round trips
+    :param jitter_ms: Random extra delay (uniform 0..jitter_ms) per request
+    :param keep_objects: Store uploaded bytes; when False uploads are read in chunks
+                         and dropped (b'' is stored), so memory measurements only see the app
+    """
+
+    def __init__(self, url='http://fake.supabase.local', latency_ms=0.0, jitter_ms=0.0, seed=None, keep_objects=True):
+        self.url = url
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.keep_objects = keep_objects
+        self.tables = {'tags_version': [{'version': 0}]}
+        self.storage = FakeStorage(self)
+        self.auth = FakeAuth()
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+    def _sleep(self):
+        self.requests += 1
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    # --- client API
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params):
+        return FakeRPC(self, fn, dict(params or {}))
+
+    # --- embeds
+    def _embed(self, table, embed, row, columns):
+        if (table, embed) in TO_ONE:
+            local, remote = TO_ONE[(table, embed)]
+            for other in self._rows(embed):
+                if other.get(remote) == row.get(local):
+                    return FakeQuery(self, embed)._project(other, columns)
+            return None
+
+        junction, own_column, embed_column = TO_MANY[(table, embed)]
+        ids = {link[embed_column] for link in self._rows(junction) if link[own_column] == row['id']}
+        return [FakeQuery(self, embed)._project(other, columns) for other in self._rows(embed) if other['id'] in ids]
+
+    # --- writes
+    def _key(self, table, row):
+        return tuple(row.get(column) for column in PRIMARY_KEYS.get(table, ('id',)))
+
+    def _write(self, table, payload, upsert=False, ignore_duplicates=False):
+        rows = self._rows(table)
+        by_key = {self._key(table, row): row for row in rows}
+        by_name = {row['name'].lower(): row for row in rows} if table == 'tags' else {}
+        written = []
+
+        for data in payload if isinstance(payload, list) else [payload]:
+            data = dict(data)
+            if PRIMARY_KEYS.get(table, ('id',)) == ('id',):
+                data.setdefault('id', str(uuid.uuid4()))
+
+            existing = by_key.get(self._key(table, data))
+            if table == 'tags' and existing is None and data['name'].lower() in by_name:
+                existing = by_name[data['name'].lower()]
+                if not upsert:
+                    raise ValueError("duplicate key value violates unique constraint \"tags_name_key\"")
+
+            if existing is not None:
+                if not upsert:
+                    raise ValueError(f"duplicate key value violates primary key of {table}")
+                if not ignore_duplicates:
+                    existing.update(data)
+                    existing['updated_at'] = _now()
+                    written.append(dict(existing))
+                continue
+
+            row = dict(DEFAULTS.get(table, {}))
+            if table in ('postcards', 'users'):
+                row.update(created_at=_now(), updated_at=_now())
+            elif table == 'image_deletions':
+                row.update(queued_at=_now(), available_at=_now())
+            row.update(data)
+            rows.append(row)
+            by_key[self._key(table, row)] = row
+            written.append(dict(row))
+
+        if table == 'tags' and written:
+            self._bump_tags_version()
+        return written
+
+    def _update(self, table, rows, data):
+        for row in rows:
+            row.update(data)
+            if 'updated_at' in row:
+                row['updated_at'] = _now()
+        if table == 'tags' and rows:
+            self._bump_tags_version()
+        return [dict(row) for row in rows]
+
+    def _delete(self, table, rows):
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self._rows(table) if id(row) not in doomed]
+
+        # ON DELETE CASCADE / SET NULL as in database_scheme.sql
+        if table == 'postcards':
+            ids = {row['id'] for row in rows}
+            self.tables['postcard_tags'] = [link for link in self._rows('postcard_tags') if link['postcard_id'] not in ids]
+        elif table == 'tags':
+            ids = {row['id'] for row in rows}
+            self.tables['postcard_tags'] = [link for link in self._rows('postcard_tags') if link['tag_id'] not in ids]
+            self._bump_tags_version()
+        elif table == 'users':
+            ids = {row['id'] for row in rows}
+            for postcard in self._rows('postcards'):
+                if postcard.get('user_id') in ids:
+                    postcard['user_id'] = None
+        return [dict(row) for row in rows]
+
+    def _bump_tags_version(self):
+        self._rows('tags_version')[0]['version'] += 1
+
+    # --- RPC functions mirroring database_scheme.sql
+    def _rpc_upsert_tags(self, tag_names):
+        by_name = {tag['name'].lower(): tag for tag in self._rows('tags')}
+        missing = []
+        for name in tag_names:
+            if name.lower() not in by_name and name.lower() not in {n.lower() for n in missing}:
+                missing.append(name)
+        if missing:
+            self._write('tags', [{'name': name} for name in missing])
+            by_name = {tag['name'].lower(): tag for tag in self._rows('tags')}
+        wanted = {name.lower() for name in tag_names}
+        return [dict(tag) for key, tag in by_name.items() if key in wanted]
+
+    def _rpc_acquire_image(self, p_sha256, p_file_ext, p_byte_size=None):
+        self._cancel_deletions(p_sha256)
+        for row in self._rows('image_objects'):
+            if row['sha256'] == p_sha256:
+                row['ref_count'] += 1
+                return [{'ref_count': row['ref_count'], 'file_ext': row['file_ext'], 'stored': row['stored'],
+                         'formats': list(row['formats'])}]
+        self._write('image_objects', {'sha256': p_sha256, 'file_ext': p_file_ext, 'byte_size': p_byte_size,
+                                      'ref_count': 1, 'stored': False, 'formats': []})
+        return [{'ref_count': 1, 'file_ext': p_file_ext, 'stored': False, 'formats': []}]
+
+    def _cancel_deletions(self, sha256):
+        """Drop deletions of an image that no sweeper holds; returns whether a claimed one is left"""
+        now = _now()
+        deletions = self._rows('image_deletions')
+        deletions[:] = [row for row in deletions if row['sha256'] != sha256 or row['available_at'] > now]
+        return any(row['sha256'] == sha256 for row in deletions)
+
+    def _rpc_mark_image_stored(self, p_sha256, p_formats=None):
+        if self._cancel_deletions(p_sha256):
+            return False
+        for row in self._rows('image_objects'):
+            if row['sha256'] == p_sha256:
+                row['stored'] = True
+                row['formats'] = list(p_formats or [])
+                return True
+        return False
+
+    def _rpc_release_image(self, p_sha256, p_object_keys=None):
+        rows = self._rows('image_objects')
+        for row in rows:
+            if row['sha256'] == p_sha256:
+                row['ref_count'] -= 1
+                if row['ref_count'] == 0:
+                    rows.remove(row)
+                    self._write('image_deletions', {'sha256': p_sha256, 'object_keys': list(p_object_keys or [])})
+                return row['ref_count']
+        return 0
+
+    def _rpc_claim_image_deletions(self, p_limit, p_min_age, p_lease):
+        now = datetime.now(timezone.utc)
+        queued_before = (now - timedelta(seconds=p_min_age)).isoformat()
+        ready = [row for row in self._rows('image_deletions')
+                 if row['available_at'] <= now.isoformat() and row['queued_at'] <= queued_before]
+        claimed = []
+        for row in sorted(ready, key=lambda row: row['available_at'])[:p_limit]:
+            row['available_at'] = (now + timedelta(seconds=p_lease)).isoformat()
+            row['attempts'] += 1
+            claimed.append({'id': row['id'], 'sha256': row['sha256'], 'object_keys': row['object_keys'],
+                            'attempts': row['attempts']})
+        return claimed
+
+    def _rpc_get_catalog_stats(self, upload_days=30):
+        def group(rows, column):
+            counts = {}
+            for row in rows:
+                key = row.get(column) or 'Unknown'
+                counts[key] = counts.get(key, 0) + 1
+            return counts
+
+        postcards = self._rows('postcards')
+        since = (datetime.now(timezone.utc) - timedelta(days=upload_days)).date().isoformat()
+        per_day = {}
+        for postcard in postcards:
+            day = postcard['created_at'][:10]
+            if day >= since:
+                per_day[day] = per_day.get(day, 0) + 1
+
+        return [{'stats': {
+            'postcards_by_status': group(postcards, 'status'),
+            'postcards_by_era': group(postcards, 'era'),
+            'postcards_by_type': group(postcards, 'type'),
+            'users_by_role': group(self._rows('users'), 'role'),
+            'total_tags': len(self._rows('tags')),
+            'uploads_per_day': [{'day': day, 'count': n} for day, n in sorted(per_day.items())]
+        }}]
+
+    @staticmethod
+    def _matches_filters(postcard, filters, skip=None):
+        for key in FILTER_KEYS:
+            if key == skip or filters.get(key) in (None, ''):
+                continue
+            value = filters[key]
+            if isinstance(postcard.get(key), bool):
+                value = str(value).lower() in ('true', '1')
+            if postcard.get(key) != value:
+                return False
+        return True
+
+    def _rpc_get_postcard_facets(self, filters=None, manufacturer_limit=50):
+        filters = filters or {}
+        approved = [p for p in self._rows('postcards') if p['status'] == 'approved']
+
+        def counts(column):
+            result = {}
+            for postcard in approved:
+                if postcard.get(column) and self._matches_filters(postcard, filters, skip=column):
+                    result[postcard[column]] = result.get(postcard[column], 0) + 1
+            return result
+
+        manufacturers = sorted(counts('manufacturer').items(), key=lambda item: (-item[1], item[0]))
+        return [{'facets': {
+            'total': sum(1 for p in approved if self._matches_filters(p, filters)),
+            'era': counts('era'),
+            'type': counts('type'),
+            'manufacturer': [list(item) for item in manufacturers[:manufacturer_limit]],
+            'is_posted': sum(1 for p in approved if p['is_posted'] and self._matches_filters(p, filters, 'is_posted')),
+            'is_written': sum(1 for p in approved if p['is_written'] and self._matches_filters(p, filters, 'is_written'))
+        }}]
+
+    def _rpc_search_postcards(self, search_query, filters=None, after_rank=None, after_id=None, page_size=20):
+        # Plain term counting stands in for ts_rank_cd; enough for paging and load
+        terms = [term.lower() for term in re.findall(r'\w+', search_query)]
+        tag_names = {}
+        tags = {tag['id']: tag['name'] for tag in self._rows('tags')}
+        for link in self._rows('postcard_tags'):
+            tag_names.setdefault(link['postcard_id'], []).append(tags.get(link['tag_id'], ''))
+
+        results = []
+        for postcard in self._rows('postcards'):
+            if postcard['status'] != 'approved' or not self._matches_filters(postcard, filters or {}):
+                continue
+            text = ' '.join([postcard.get('title') or '', postcard.get('description') or '',
+                             postcard.get('manufacturer') or ''] + tag_names.get(postcard['id'], [])).lower()
+            rank = float(sum(text.count(term) for term in terms))
+            if rank and (after_rank is None or (rank, postcard['id']) < (after_rank, after_id)):
+                results.append((rank, postcard))
+
+        results.sort(key=lambda item: (item[0], item[1]['id']), reverse=True)
+        return [
+            dict({key: postcard.get(key) for key in ('id', 'title', 'era', 'type', 'is_posted', 'is_written',
+                                                     'front_image_url', 'created_at')},
+                 rank=rank, headline=postcard.get('title'))
+            for rank, postcard in results[:page_size]
+        ]
+
+    def _review(self, postcards, new_status, notes_by_id, shared_notes):
+        if new_status not in ('approved', 'rejected'):
+            return []
+        changed = []
+        for postcard in postcards:
+            if postcard['status'] != 'staged':
+                continue
+            postcard['status'] = new_status
+            note = notes_by_id.get(postcard['id']) or shared_notes
+            if note is not None:
+                postcard['review_notes'] = note
+            postcard['updated_at'] = _now()
+            changed.append({'id': postcard['id']})
+        return changed
+
+    def _rpc_review_postcards(self, postcard_ids, new_status, notes=None, shared_notes=None):
+        notes_by_id = dict(zip(postcard_ids, notes or []))
+        wanted = set(postcard_ids)
+        return self._review([p for p in self._rows('postcards') if p['id'] in wanted], new_status, notes_by_id, shared_notes)
+
+    def _rpc_review_staged_postcards(self, new_status, filters=None, shared_notes=None):
+        postcards = [p for p in self._rows('postcards') if self._matches_filters(p, filters or {})]
+        return self._review(postcards, new_status, {}, shared_notes)
+
+
+# Modules holding Supabase clients, and the client attributes install_fake_supabase swaps
+CLIENT_MODULES = {
+    'utils.db': ('supabase', 'admin_supabase'),
+    'utils.user_db': ('supabase', 'admin_supabase'),
+    'utils.image_handler': ('admin_supabase',),
+    'utils.supabase_auth': ('supabase', 'admin_supabase'),
+    'utils.auth': ('supabase',)
+}
+
+
+@contextmanager
+def install_fake_supabase(fake):
+    """Point every module-level Supabase client at `fake`"""
+    import importlib
+
+    saved = []
+    try:
+        for module_name, attributes in CLIENT_MODULES.items():
+            module = importlib.import_module(module_name)
+            for attribute in attributes:
+                if hasattr(module, attribute):
+                    saved.append((module, attribute, getattr(module, attribute)))
+                    setattr(module, attribute, fake)
+        yield fake
+    finally:
+        for module, attribute, value in reversed(saved):
+            setattr(module, attribute, value)
+
+
+def seed_fake(fake, postcards=500, users=20, tags=40, staged=0, seed=42):
+    """Fill a FakeSupabase with synthetic users, tags and postcards; returns the admin user row"""
+    from werkzeug.security import generate_password_hash
+    from utils.enums import POSTCARD_ERAS, POSTCARD_TYPES
+    from utils.benchmark import SEED_WORDS
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash('benchmark')
+    user_rows = [{'username': f'user{i}', 'email': f'user{i}@example.com', 'role': 'admin' if i == 0 else 'user',
+                  'password_hash': password_hash} for i in range(users)]
+    user_rows = fake._write('users', user_rows)
+    tag_rows = fake._write('tags', [{'name': f'{word}-{i}'} for i, word in
+                                    ((i, SEED_WORDS[i % len(SEED_WORDS)]) for i in range(tags))])
+
+    start = datetime.now(timezone.utc) - timedelta(days=60)
+    postcard_rows = []
+    for i in range(postcards + staged):
+        postcard_rows.append({
+            'title': ' '.join(rng.choice(SEED_WORDS) for _ in range(3)).title(),
+            'description': ' '.join(rng.choice(SEED_WORDS) for _ in range(20)),
+            'era': rng.choice(POSTCARD_ERAS),
+            'type': rng.choice(POSTCARD_TYPES),
+            'manufacturer': rng.choice(['Curt Teich', 'Detroit Publishing', 'Tichnor', 'Dexter']),
+            'is_posted': rng.random() < 0.5,
+            'is_written': rng.random() < 0.5,
+            'user_id': rng.choice(user_rows)['id'],
+            'status': 'approved' if i < postcards else 'staged',
+            'created_at': (start + timedelta(minutes=i)).isoformat()
+        })
+    postcard_rows = fake._write('postcards', postcard_rows)
+
+    links = []
+    for postcard in postcard_rows:
+        for tag in rng.sample(tag_rows, min(3, len(tag_rows))):
+            links.append({'postcard_id': postcard['id'], 'tag_id': tag['id']})
+    fake._write('postcard_tags', links)
+
+    return user_rows[0]
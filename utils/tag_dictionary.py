@@ -0,0 +1,135 @@
+# utils/tag_dictionary.py
+# Process-local copy of the tags table. Lookups are dict accesses; the copy is
+# reloaded only when the tags_version counter in the database has moved.
+import logging
+import os
+import threading
+import time
+from config import Config
+from utils.tags import normalize_tag_names, diff_tag_ids
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class TagDictionary:
+    """name→tag and id→tag maps for every tag, with case-insensitive name lookup"""
+
+    def __init__(self, tag_db, check_interval=5):
+        self.tag_db = tag_db
+        self.check_interval = check_interval
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_name = {}
+        self._version = None
+        self._checked_at = 0.0
+
+    def _load(self, version):
+        tags = self.tag_db.get_all_tags()
+        self._by_id = {str(tag['id']): tag for tag in tags}
+        self._by_name = {tag['name'].lower(): tag for tag in tags}
+        self._version = version
+        logger.info(f"Loaded {len(tags)} tags (version {version})")
+
+    def refresh(self, force=False):
+        """Reload the maps if the database version has changed (checked at most every check_interval seconds)"""
+        now = time.monotonic()
+        if not force and self._version is not None and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if not force and self._version is not None and now - self._checked_at < self.check_interval:
+                return
+
+            try:
+                version = self.tag_db.get_tags_version()
+                if force or version != self._version:
+                    self._load(version)
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error refreshing tag dictionary: {str(e)}")
+                if self._version is None:
+                    raise
+
+    def add(self, tags):
+        """Record tags this process just created or resolved, without waiting for a reload"""
+        with self._lock:
+            for tag in tags or []:
+                if tag:
+                    self._by_id[str(tag['id'])] = tag
+                    self._by_name[tag['name'].lower()] = tag
+
+    def get(self, name):
+        """Case-insensitive lookup by name; None if the tag does not exist"""
+        self.refresh()
+        return self._by_name.get(' '.join(str(name).split()).lower())
+
+    def get_by_id(self, tag_id):
+        self.refresh()
+        return self._by_id.get(str(tag_id))
+
+    def all(self):
+        """Every tag, sorted by name"""
+        self.refresh()
+        return sorted(self._by_id.values(), key=lambda tag: tag['name'].lower())
+
+    def resolve(self, names):
+        """Split normalized names into (known tags, names not in the dictionary)"""
+        self.refresh()
+        known, missing = [], []
+        for name in normalize_tag_names(names):
+            tag = self._by_name.get(name.lower())
+            if tag:
+                known.append(tag)
+            else:
+                missing.append(name)
+        return known, missing
+
+
+def with_tag_dictionary(tag_db):
+    """
+    Wrap a backend's TagDB so tag reads come from a process-local TagDictionary
+    and only tag names it has never seen go to the database
+    """
+    dictionary = TagDictionary(tag_db, check_interval=Config.TAG_VERSION_CHECK_INTERVAL)
+
+    class DictionaryTagDB(tag_db):
+        tag_dictionary = dictionary
+
+        @staticmethod
+        def get_all_tags():
+            return dictionary.all()
+
+        @staticmethod
+        def create_tag(name):
+            tag = tag_db.create_tag(name)
+            dictionary.add([tag])
+            return tag
+
+        @staticmethod
+        def upsert_tags(names):
+            known, missing = dictionary.resolve(names)
+            if not missing:
+                return known
+
+            created = tag_db.upsert_tags(missing)
+            dictionary.add(created)
+            return known + created
+
+        @staticmethod
+        def set_postcard_tags(postcard_id, names, current_tags=None):
+            tags = DictionaryTagDB.upsert_tags(names)
+            to_link, to_unlink = diff_tag_ids(current_tags, tags)
+
+            tag_db.link_tags_to_postcard(postcard_id, to_link)
+            tag_db.unlink_tags_from_postcard(postcard_id, to_unlink)
+
+            return tags
+
+    DictionaryTagDB.__name__ = DictionaryTagDB.__qualname__ = 'TagDB'
+    return DictionaryTagDB
@@ -0,0 +1,36 @@
+# utils/tags.py
+# Backend-independent helpers for turning tag form input into tag rows
+
+
+# Matches tags.name VARCHAR(50) in database_scheme.sql
+MAX_TAG_LENGTH = 50
+
+
+def normalize_tag_names(raw):
+    """
+    Turn a comma-separated string (or list) of tag names into a clean list
+
+    Whitespace is collapsed, blanks dropped, names truncated to the column width and
+    duplicates removed case-insensitively, keeping the first spelling.
+    """
+    if isinstance(raw, str):
+        raw = raw.split(',')
+
+    names = []
+    seen = set()
+    for name in raw or []:
+        name = ' '.join(str(name).split())[:MAX_TAG_LENGTH].strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def diff_tag_ids(current_tags, desired_tags):
+    """Return (ids to link, ids to unlink) to move a postcard from current_tags to desired_tags"""
+    current_ids = {tag['id'] for tag in current_tags or []}
+    desired_ids = [tag['id'] for tag in desired_tags or []]
+
+    to_link = [tag_id for tag_id in desired_ids if tag_id not in current_ids]
+    to_unlink = [tag_id for tag_id in current_ids if tag_id not in set(desired_ids)]
+    return to_link, to_unlink
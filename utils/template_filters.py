@@ -1,5 +1,10 @@
 from datetime import datetime
-from flask import Markup
+from markupsafe import Markup
+from utils.image_variants import variant_url, variant_srcset, stored_formats, content_prefix, CONTENT_TYPES
+
+# Match delimiters emitted by search_postcards() in database_scheme.sql
+HIGHLIGHT_START = '\u27e6'
+HIGHLIGHT_STOP = '\u27e7'
 
 def register_filters(app):
     """Register custom template filters with the Flask app"""
@@ -31,6 +36,15 @@ def register_filters(app):
         
         return Markup(str(value).replace('\n', '<br>'))
     
+    @app.template_filter('highlight')
+    def highlight(value):
+        """Escape a search headline and turn its match delimiters into <mark> tags"""
+        if not value:
+            return ''
+        
+        escaped = str(Markup.escape(value))
+        return Markup(escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>'))
+    
     @app.template_filter('truncate_words')
     def truncate_words(value, length=30):
         """Truncate a string to a certain number of words"""
@@ -44,6 +58,31 @@ def register_filters(app):
         
         return ' '.join(words[:length]) + '...'
     
+    @app.template_filter('image_variant')
+    def image_variant(url, variant='card', fmt='jpeg'):
+        """URL of one size of an uploaded image (the image itself if it has no derivatives)"""
+        return variant_url(url, variant, fmt)
+    
+    @app.template_filter('srcset')
+    def srcset(url, fmt='jpeg'):
+        """srcset listing every stored size of an image in one format, or '' if there are none"""
+        return variant_srcset(url, fmt)
+    
+    @app.template_filter('image_sources')
+    def image_sources(url):
+        """(format, content type) of each stored derivative format for <picture> sources, JPEG fallback excluded"""
+        return [(fmt, CONTENT_TYPES[fmt]) for fmt in stored_formats(url) if fmt != 'jpeg']
+    
+    @app.template_filter('image_formats')
+    def image_formats(url):
+        """Derivative formats stored for an uploaded image, preferred first"""
+        return stored_formats(url)
+    
+    @app.template_filter('content_hash')
+    def content_hash(url):
+        """SHA-256 an uploaded image is stored under, or None for older UUID-keyed uploads"""
+        return content_prefix(url)
+    
     @app.context_processor
     def inject_now():
         """Inject the current datetime into templates"""
@@ -0,0 +1,254 @@
+# utils/tracing.py
+# Per-request tracing of data-access calls. Every Supabase HTTP call (PostgREST,
+# Storage, Auth) and every direct Postgres statement is recorded with its target,
+# operation, duration, rows and bytes; the totals go out in a Server-Timing header
+# and repeated query shapes (the N+1 pattern) are logged as warnings.
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from config import Config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar('request_trace', default=None)
+
+# Query-string parameters whose values are part of a PostgREST query's shape
+_SHAPE_PARAMS = {'select', 'order', 'on_conflict', 'columns'}
+# Parameters dropped from the shape entirely (they vary between pages)
+_PAGING_PARAMS = {'limit', 'offset'}
+
+_HTTP_OPERATIONS = {'GET': 'select', 'HEAD': 'count', 'POST': 'insert', 'PATCH': 'update', 'DELETE': 'delete'}
+
+_SQL_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+
+
+class TraceCall:
+    """One recorded data-access call"""
+
+    __slots__ = ('kind', 'target', 'operation', 'shape', 'duration_ms', 'rows', 'bytes')
+
+    def __init__(self, kind, target, operation, shape, duration_ms, rows=None, nbytes=None):
+        self.kind = kind
+        self.target = target
+        self.operation = operation
+        self.shape = shape
+        self.duration_ms = duration_ms
+        self.rows = rows
+        self.bytes = nbytes
+
+
+class RequestTrace:
+    """Every data-access call made while handling one request"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, call):
+        with self._lock:
+            self.calls.append(call)
+
+    def totals(self):
+        """{kind: (call count, total milliseconds)}"""
+        totals = {}
+        for call in self.calls:
+            count, duration = totals.get(call.kind, (0, 0.0))
+            totals[call.kind] = (count + 1, duration + call.duration_ms)
+        return totals
+
+    def repeated_shapes(self, threshold):
+        """Query shapes run more than `threshold` times, most frequent first"""
+        counts = Counter((call.kind, call.shape) for call in self.calls)
+        return [(kind, shape, count) for (kind, shape), count in counts.most_common() if count > threshold]
+
+    def server_timing(self):
+        """Value for the Server-Timing response header"""
+        parts = []
+        for kind, (count, duration) in sorted(self.totals().items()):
+            parts.append(f'{kind};dur={duration:.1f};desc="{count} call{"s" if count != 1 else ""}"')
+        parts.append(f'app;dur={(time.perf_counter() - self.started) * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def current_trace():
+    """The trace of the request being handled, or None outside a traced request"""
+    return _current_trace.get()
+
+
+def _record(kind, target, operation, shape, started, rows=None, nbytes=None):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(TraceCall(
+            kind, target, operation, shape, (time.perf_counter() - started) * 1000, rows, nbytes
+        ))
+
+
+# --- Postgres -----------------------------------------------------------------
+
+def record_sql(sql, started, rows=None):
+    """Record one statement run by utils/pg_engine.py; the parameterized SQL is its shape"""
+    if _current_trace.get() is None:
+        return
+    match = _SQL_TABLE.search(sql)
+    _record(
+        'db', match.group(1) if match else None, sql.split(None, 1)[0].lower(),
+        ' '.join(sql.split()), started, rows
+    )
+
+
+# --- Supabase (httpx) ---------------------------------------------------------
+
+def _describe(request):
+    """Return (kind, target, operation, shape) for a Supabase HTTP request"""
+    url = urlsplit(str(request.url))
+    segments = [segment for segment in url.path.split('/') if segment]
+    method = request.method
+
+    if segments[:2] == ['rest', 'v1'] and len(segments) > 2:
+        if segments[2] == 'rpc':
+            target, operation = segments[3] if len(segments) > 3 else None, 'rpc'
+        else:
+            target, operation = segments[2], _HTTP_OPERATIONS.get(method, method.lower())
+            if operation == 'insert' and 'resolution=' in request.headers.get('prefer', ''):
+                operation = 'upsert'
+
+        # Keep column names and filter operators, drop the values
+        shape_params = []
+        for key, value in request.url.params.multi_items():
+            if key in _PAGING_PARAMS:
+                continue
+            if key in _SHAPE_PARAMS:
+                shape_params.append(f'{key}={value}')
+            else:
+                shape_params.append(f"{key}={value.split('.', 1)[0]}")
+        shape = f"{method} {'/'.join(segments[2:])}?{'&'.join(sorted(shape_params))}"
+        return 'db', target, operation, shape
+
+    if segments[:2] == ['storage', 'v1']:
+        # /storage/v1/object/<bucket>/<name>: the object name is not part of the shape
+        target = segments[3] if len(segments) > 3 else None
+        operation = f"{segments[2] if len(segments) > 2 else ''} {method.lower()}".strip()
+        return 'storage', target, operation, f"{method} {'/'.join(segments[:4])}"
+
+    if segments[:2] == ['auth', 'v1']:
+        endpoint = '/'.join(segments[2:])
+        return 'auth', endpoint, method.lower(), f"{method} {endpoint}"
+
+    return 'http', url.netloc, method.lower(), f"{method} {url.path}"
+
+
+def _on_request(request):
+    request.extensions['trace_started'] = time.perf_counter()
+
+
+def _on_response(response):
+    started = response.request.extensions.get('trace_started')
+    if started is None or _current_trace.get() is None:
+        return
+
+    # Hooks run before the body is read; read it now so its size is known
+    response.read()
+
+    rows = None
+    content_range = response.headers.get('content-range', '')
+    match = re.match(r'(\d+)-(\d+)/', content_range)
+    if match:
+        rows = int(match.group(2)) - int(match.group(1)) + 1
+    elif content_range.startswith('*/'):
+        rows = 0
+
+    kind, target, operation, shape = _describe(response.request)
+    _record(kind, target, operation, shape, started, rows, len(response.content))
+
+
+def _hook(http_client):
+    hooks = http_client.event_hooks
+    if _on_request not in hooks['request']:
+        hooks['request'].append(_on_request)
+        hooks['response'].append(_on_response)
+        http_client.event_hooks = hooks
+
+
+def instrument_supabase_client(client):
+    """Attach tracing hooks to the PostgREST, Storage and Auth HTTP clients of a Supabase client"""
+    if not Config.QUERY_TRACING:
+        return client
+
+    import httpx
+
+    candidates = [
+        getattr(getattr(client, 'postgrest', None), 'session', None),
+        getattr(getattr(client, 'storage', None), 'session', None),
+        getattr(getattr(client, 'storage', None), '_client', None),
+        getattr(getattr(client, 'auth', None), '_http_client', None)
+    ]
+    for http_client in candidates:
+        if isinstance(http_client, httpx.Client):
+            _hook(http_client)
+    return client
+
+
+# --- Flask integration --------------------------------------------------------
+
+@contextmanager
+def traced_request():
+    """Collect calls made inside the block into a fresh RequestTrace"""
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def init_tracing(app):
+    """Trace every request: Server-Timing header, N+1 warnings and the debug panel"""
+    if not Config.QUERY_TRACING:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def start_request_trace():
+        g.request_trace = RequestTrace()
+        g.request_trace_token = _current_trace.set(g.request_trace)
+
+    @app.after_request
+    def finish_request_trace(response):
+        trace = g.get('request_trace')
+        if trace is None:
+            return response
+
+        response.headers['Server-Timing'] = trace.server_timing()
+
+        for kind, shape, count in trace.repeated_shapes(Config.QUERY_REPEAT_THRESHOLD):
+            logger.warning(
+                f"Possible N+1: {request.method} {request.path} ran the same {kind} query "
+                f"{count} times: {shape}"
+            )
+        return response
+
+    @app.teardown_request
+    def clear_request_trace(exc=None):
+        g.pop('request_trace', None)
+        token = g.pop('request_trace_token', None)
+        if token is not None:
+            try:
+                _current_trace.reset(token)
+            except ValueError:
+                # Set in a different context; just stop recording into it
+                _current_trace.set(None)
+
+    @app.context_processor
+    def inject_request_trace():
+        # The panel lists calls made before the template rendered
+        if Config.QUERY_TRACE_PANEL:
+            return {'request_trace': _current_trace.get()}
+        return {'request_trace': None}
@@ -1,12 +1,13 @@
 from werkzeug.security import generate_password_hash, check_password_hash
-from supabase import create_client
-from config import Config
+from utils.supabase_clients import LazyClient
+from utils.pagination import apply_supabase_page, order_page_rows
 import uuid
 from functools import wraps
 import traceback
 
 # Initialize Supabase client
-supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+supabase = LazyClient('anon')
+admin_supabase = LazyClient('service')
 
 class UserDB:
     @staticmethod
@@ -90,8 +91,6 @@ class UserDB:
             }
             
             # Make sure to use the correct service role key for Supabase
-            admin_supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
-            
             # Insert into database using upsert to handle potential conflicts
             result = admin_supabase.table('users').upsert(insert_data).execute()
             
@@ -112,26 +111,17 @@ class UserDB:
         return None
     
     @staticmethod
-    def get_all_users(limit=100, offset=0):
+    def get_all_users(limit=100, offset=0, after=None, before=None):
         """Get all users (for admin use)"""
         try:
             query = supabase.table('users').select('id, username, email, role, created_at')
             
-            # Apply ordering
-            query = query.order('created_at', desc=True)
-            
-            # Apply limit
-            query = query.limit(limit)
-            
-            # Handle pagination
-            if offset > 0:
-                start = offset
-                end = offset + limit - 1
-                query = query.range(start, end)
+            # Apply ordering and keyset (or legacy offset) pagination
+            query = apply_supabase_page(query, limit, offset, after, before)
             
             result = query.execute()
             
-            return result.data
+            return order_page_rows(result.data, after, before)
         except Exception as e:
             print(f"Error getting users: {str(e)}")
             print(traceback.format_exc())